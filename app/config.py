@@ -36,5 +36,65 @@ class Settings:
     # 앱 설정
     APP_NAME: str = os.getenv("APP_NAME", "Doctor API (Firebase)")
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
+    
+    # 인증 캐시 설정 (검증된 토큰 최대 보관 개수)
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+    # 카카오 사용자 정보 캐시 (액세스 토큰별, 보관 시간 초 / 0이면 사용 안 함)
+    KAKAO_PROFILE_CACHE_TTL: float = float(os.getenv("KAKAO_PROFILE_CACHE_TTL", "60"))
+    
+    # ML 추론 마이크로 배치 설정 (최대 배치 크기, 첫 요청 후 최대 대기 시간 ms)
+    # 배치는 최대 크기 이하의 2의 거듭제곱 크기로 채워 추론하며, 크기마다 인터프리터를 하나씩 둡니다
+    ML_MAX_BATCH_SIZE: int = int(os.getenv("ML_MAX_BATCH_SIZE", "8"))
+    ML_MAX_WAIT_MS: float = float(os.getenv("ML_MAX_WAIT_MS", "5"))
+    
+    # TFLite 인터프리터 패키지 (auto: ai-edge-litert → tflite-runtime → tensorflow 순으로 사용 가능한 것)
+    ML_INTERPRETER: str = os.getenv("ML_INTERPRETER", "auto")
+    
+    # uvicorn 워커 프로세스 수 (uvicorn --workers 의 기본값과 같은 환경변수)
+    WEB_CONCURRENCY: int = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    # ML 추론 워커 프로세스 수 (0이면 API 프로세스 안에서 추론)
+    # uvicorn 워커마다 풀을 따로 띄우므로 전체 추론 프로세스 수는 WEB_CONCURRENCY × ML_WORKERS 입니다.
+    # 기본값은 CPU 코어를 uvicorn 워커끼리 나눈 수(최소 1)이며, --workers 를 WEB_CONCURRENCY 없이 주면 직접 맞춰야 합니다
+    ML_WORKERS: int = int(os.getenv("ML_WORKERS", str(max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY))))
+    # 인터프리터당 연산 스레드 수 (미설정 시 워커 풀은 1, 단일 프로세스는 TFLite 기본값)
+    ML_NUM_THREADS: Optional[int] = int(os.getenv("ML_NUM_THREADS")) if os.getenv("ML_NUM_THREADS") else None
+    
+    # 음식 분류 결과 캐시 (최대 항목 수, 0이면 사용 안 함 / 보관 시간 초)
+    ML_PREDICTION_CACHE_SIZE: int = int(os.getenv("ML_PREDICTION_CACHE_SIZE", "1024"))
+    ML_PREDICTION_CACHE_TTL: float = float(os.getenv("ML_PREDICTION_CACHE_TTL", "3600"))
+    # 다시 인코딩된 같은 사진도 찾는 유사 이미지(dHash) 단계 사용 여부와 허용 해밍 거리 (64비트 중)
+    ML_PREDICTION_CACHE_SIMILAR: bool = os.getenv("ML_PREDICTION_CACHE_SIMILAR", "False").lower() == "true"
+    ML_PREDICTION_CACHE_MAX_DISTANCE: int = int(os.getenv("ML_PREDICTION_CACHE_MAX_DISTANCE", "4"))
+    
+    # 혈당 일괄 등록 최대 항목 수와 동시에 커밋할 Firestore 배치 수
+    BLOOD_SUGAR_BULK_MAX_ITEMS: int = int(os.getenv("BLOOD_SUGAR_BULK_MAX_ITEMS", "10000"))
+    BLOOD_SUGAR_BULK_CONCURRENCY: int = int(os.getenv("BLOOD_SUGAR_BULK_CONCURRENCY", "4"))
+    
+    # 업로드 파일 저장 디렉터리와 식단 사진 최대 크기(bytes)
+    BLOB_STORE_PATH: str = os.getenv("BLOB_STORE_PATH", "app/data/blobs")
+    MEAL_UPLOAD_MAX_BYTES: int = int(os.getenv("MEAL_UPLOAD_MAX_BYTES", str(15 * 1024 * 1024)))
+    # 업로드된 식단 사진을 분석하는 백그라운드 작업 수
+    MEAL_ANALYSIS_WORKERS: int = int(os.getenv("MEAL_ANALYSIS_WORKERS", "2"))
+    # 분석 중(analyzing)인 식단을 맡은 프로세스가 죽은 것으로 보고 다시 맡기까지의 시간(초)
+    # 이 간격마다 남은 pending 식단과 오래된 analyzing 식단을 다시 큐에 넣습니다
+    MEAL_ANALYSIS_CLAIM_TIMEOUT: float = float(os.getenv("MEAL_ANALYSIS_CLAIM_TIMEOUT", "300"))
+    
+    # 영양 정보 CSV 와 컴파일된 테이블 디렉터리 (python -m app.scripts.build_nutrition_table 로 생성)
+    NUTRITION_CSV_PATH: str = os.getenv("NUTRITION_CSV_PATH", "app/data/food_nutrition_1.csv")
+    NUTRITION_TABLE_PATH: str = os.getenv("NUTRITION_TABLE_PATH", "app/data/nutrition_table")
+    
+    # 문서 저장소 백엔드 (auto: DEV_MODE 면 memory, 아니면 firestore / firestore / memory)
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "auto").lower()
+    # memory 저장소를 보존할 SQLite 파일 경로 (비우면 프로세스 메모리에만 보관)
+    MEMORY_STORE_PATH: str = os.getenv("MEMORY_STORE_PATH", "")
+    
+    # 카카오/Google 외부 API 공용 HTTP 클라이언트 (h2 패키지가 있으면 HTTP/2 사용)
+    HTTP_CLIENT_HTTP2: bool = os.getenv("HTTP_CLIENT_HTTP2", "True").lower() == "true"
+    HTTP_CLIENT_MAX_CONNECTIONS: int = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", "100"))
+    HTTP_CLIENT_MAX_KEEPALIVE: int = int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE", "20"))
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY", "60"))
+    # 연결 수립 / 전체(읽기·쓰기·풀 대기) 제한 시간(초)
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT", "5"))
+    HTTP_CLIENT_TIMEOUT: float = float(os.getenv("HTTP_CLIENT_TIMEOUT", "10"))
 
 settings = Settings() 
\ No newline at end of file
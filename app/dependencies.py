@@ -0,0 +1,24 @@
+from fastapi import HTTPException, Header
+from app.config import settings
+
+# 개발 모드에서 토큰 없이 사용하는 사용자 ID
+DEV_USER_ID = "dev_user_123"
+
+async def get_current_user_id(authorization: str = Header(None)) -> str:
+    """현재 로그인한 사용자 ID 가져오기 (모든 라우터 공용 인증 의존성)"""
+    # 개발자 모드에서는 토큰 없이도 허용
+    if settings.DEV_MODE:
+        return DEV_USER_ID
+    
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="토큰이 필요합니다")
+    
+    try:
+        # 실제 Firebase 토큰 검증 (검증 결과는 캐시됨)
+        from app.services.firebase_auth_service import verify_user_token
+        token = authorization.split(" ")[1]
+        decoded_token = await verify_user_token(token)
+        # kakao_id를 우선 user_id로 사용, 없으면 uid 사용
+        return decoded_token.get("kakao_id") or decoded_token.get("uid")
+    except Exception as e:
+        raise HTTPException(status_code=401, detail=f"토큰 검증 실패: {str(e)}")
@@ -1,7 +1,9 @@
 import firebase_admin
-from firebase_admin import credentials, firestore, auth
+from firebase_admin import credentials, firestore, firestore_async, auth
 import os
+import time
 from app.config import settings
+from app.services.token_verifier import KeyUnavailable, verifier
 
 # Firebase 서비스 계정 키 파일 경로
 SERVICE_ACCOUNT_KEY = os.getenv("FIREBASE_SERVICE_ACCOUNT_KEY", "app/dang-doctor-firebase-adminsdk-fbsvc-062bcd6744.json")
@@ -25,12 +27,28 @@ def get_firestore_db():
     initialize_firebase()
     return firestore.client()
 
+def get_async_firestore_db():
+    """비동기 Firestore 클라이언트 반환 (이벤트 루프를 막지 않음)"""
+    initialize_firebase()
+    return firestore_async.client()
+
 def verify_firebase_token(id_token: str):
-    """Firebase ID 토큰 검증 (시계 오차 허용)"""
+    """Firebase ID 토큰 검증 (시계 오차 허용)
+
+    미리 받아 둔 Google 공개키로 로컬 검증하고, 키가 아직 없으면 firebase_admin 으로 검증합니다.
+    """
+    started = time.perf_counter()
     try:
         initialize_firebase()
-        # 시계 오차를 10초까지 허용
-        decoded_token = auth.verify_id_token(id_token, check_revoked=False, clock_skew_seconds=10)
+        try:
+            decoded_token = verifier.verify(id_token, firebase_admin.get_app().project_id)
+            verifier.local += 1
+        except KeyUnavailable:
+            verifier.fallback += 1
+            # 시계 오차를 10초까지 허용
+            decoded_token = auth.verify_id_token(id_token, check_revoked=False, clock_skew_seconds=10)
         return decoded_token
     except Exception as e:
-        raise ValueError(f"토큰 검증 실패: {str(e)}") 
\ No newline at end of file
+        raise ValueError(f"토큰 검증 실패: {str(e)}")
+    finally:
+        verifier.latency.observe((time.perf_counter() - started) * 1000)
\ No newline at end of file
@@ -1,8 +1,58 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import firebase_auth, blood_sugar, user_profile, meals, stats, foods, ml
+from firebase_admin import firestore
+from app.config import settings
+from app.routes import firebase_auth, blood_sugar, user_profile, meals, stats, foods, ml, export
+from app.dependencies import DEV_USER_ID
+from app.services import firestore_repository as repo
+from app.services import http_client, meal_analysis, storage, token_verifier
+from app.services.blob_store import get_blob_store
 
-app = FastAPI(title="Doctor API (Firebase)", version="1.0.0")
+async def _seed_dev_user() -> None:
+    """개발 모드 memory 저장소에 인증 없이 쓰는 개발용 사용자 프로필 생성 (이미 있으면 그대로)"""
+    if await repo.get_user(DEV_USER_ID) is not None:
+        return
+    await repo.set_user(DEV_USER_ID, {
+        "email": "dev@example.com",
+        "nickname": "개발자",
+        "profile_image": "https://example.com/profile.jpg",
+        "gender": "남자",
+        "height": 175.0,
+        "weight": 70.0,
+        "activity_level": "보통활동",
+        "carb_ratio": 50.0,
+        "protein_ratio": 25.0,
+        "fat_ratio": 25.0,
+        "created_at": firestore.SERVER_TIMESTAMP,
+        "updated_at": firestore.SERVER_TIMESTAMP
+    })
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 카카오/Google API 호출이 keep-alive 연결을 재사용하도록 공용 HTTP 클라이언트 생성
+    http_client.start()
+    # ID 토큰 검증이 요청 중에 인증서를 받지 않도록 Google 공개키를 미리 받고 백그라운드 갱신
+    if not settings.DEV_MODE:
+        await token_verifier.key_store.start()
+    # 영양 정보 인덱스는 요청마다 CSV 를 훑지 않도록 시작 시 한 번 생성
+    ml.load_nutrition_index()
+    # 개발 모드는 프로세스 내 저장소(storage 의 memory 백엔드)로 실제 라우트 코드를 실행
+    if settings.DEV_MODE and storage.backend_name() == "memory":
+        await _seed_dev_user()
+    # 업로드된 식단 사진 분석 작업
+    await meal_analysis.start(
+        ml.analyze_meal_image, get_blob_store(), settings.MEAL_ANALYSIS_WORKERS, settings.MEAL_ANALYSIS_CLAIM_TIMEOUT
+    )
+    yield
+    # 종료 시 식단 분석 작업과 추론 배처 워커 정리
+    await meal_analysis.stop()
+    await token_verifier.key_store.stop()
+    await ml.shutdown()
+    await http_client.close()
+    storage.close()
+
+app = FastAPI(title="Doctor API (Firebase)", version="1.0.0", lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -21,22 +71,39 @@ app.include_router(meals.router, prefix="/meals", tags=["식단"])
 app.include_router(stats.router, prefix="/stats", tags=["통계"])
 app.include_router(foods.router, prefix="/foods", tags=["음식"])
 app.include_router(ml.router, prefix="/ml", tags=["ML"])
+app.include_router(export.router, prefix="/export", tags=["내보내기"])
 
 @app.get("/")
 async def root():
     return {"message": "Firebase 기반 Doctor API에 오신 것을 환영합니다!"}
 
+@app.get("/metrics")
+async def metrics():
+    """프로세스 내 캐시/성능 지표"""
+    from app.services.firebase_auth_service import get_identity_cache_stats, get_kakao_login_stats
+    from app.services.metrics import snapshot_registry
+    return {
+        "auth_identity_cache": get_identity_cache_stats(),
+        "kakao_login": get_kakao_login_stats(),
+        "token_verification": token_verifier.get_stats(),
+        "stats_overview_phases": snapshot_registry(stats.overview_phase_stats),
+        "ml_food_batcher": ml.get_batcher_stats(),
+        "ml_food_workers": ml.get_worker_health(),
+        "ml_prediction_cache": ml.get_prediction_cache_stats(),
+        "meal_analysis": meal_analysis.get_stats(),
+        "http_client": http_client.get_stats(),
+        "storage": storage.get_stats()
+    }
+
 @app.get("/health")
 async def health_check():
     """Firebase 연결 상태 확인"""
     try:
-        from app.firebase_config import get_firestore_db
-        db = get_firestore_db()
         # 간단한 쿼리로 연결 테스트
-        test_query = db.collection("_health_check").limit(1).stream()
-        list(test_query)  # 쿼리 실행
+        await repo.ping()
         return {
             "status": "healthy",
+            "storage": storage.backend_name(),
             "firebase": "connected",
             "project_id": "dang-doctor",
             "message": "Firebase 연결 성공"
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime, date
-from app.firebase_config import get_firestore_db
 from app.config import settings
-import firebase_admin
+from app.dependencies import get_current_user_id
+from app.services import bulk_ingest
+from app.services import firestore_repository as repo
 from firebase_admin import firestore
 
 router = APIRouter()
@@ -23,169 +24,113 @@ class BloodSugarResponse(BaseModel):
     time: str
     created_at: str
 
-async def get_current_user_id(authorization: str = Header(None)):
-    """현재 로그인한 사용자 ID 가져오기"""
-    print(f"DEBUG: Authorization 헤더: {authorization}")
-    
-    # 개발자 모드에서는 토큰 없이도 허용
-    if settings.DEV_MODE:
-        return "dev_user_123"
-    
-    if not authorization or not authorization.startswith("Bearer "):
-        print(f"DEBUG: 토큰 형식 오류: {authorization}")
-        raise HTTPException(status_code=401, detail="토큰이 필요합니다")
-    
-    try:
-        # 실제 Firebase 토큰 검증
-        from app.services.firebase_auth_service import verify_user_token
-        token = authorization.split(" ")[1]
-        print(f"DEBUG: 토큰 검증 시도: {token[:20]}...")
-        decoded_token = await verify_user_token(token)
-        print(f"DEBUG: 토큰 검증 성공: {decoded_token}")
-        # kakao_id를 우선 user_id로 사용, 없으면 uid 사용
-        user_id = decoded_token.get("kakao_id") or decoded_token.get("uid")
-        print(f"DEBUG: 사용자 ID: {user_id}")
-        return user_id
-    except Exception as e:
-        print(f"DEBUG: 토큰 검증 실패: {str(e)}")
-        raise HTTPException(status_code=401, detail=f"토큰 검증 실패: {str(e)}")
+class BloodSugarPage(BaseModel):
+    items: List[BloodSugarResponse]
+    next_cursor: Optional[str] = None  # 다음 페이지가 없으면 None
+
+class BulkItemResult(BaseModel):
+    index: int  # 요청 본문에서의 순서 (0부터)
+    status: str  # created, invalid, failed
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    received: int
+    created: int
+    invalid: int
+    failed: int
+    results: List[BulkItemResult]
 
 @router.post("/", response_model=BloodSugarResponse)
 async def create_blood_sugar(data: BloodSugarData, user_id: str = Depends(get_current_user_id)):
     """혈당 데이터 등록"""
+    # 혈당 범위/식사 타입/날짜·시간 형식 검증 (일괄 등록과 같은 규칙)
+    error = bulk_ingest.reading_error(data.model_dump())
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    
+    # Firebase에 저장
+    blood_sugar_data = {
+        "user_id": user_id,
+        "blood_sugar": data.blood_sugar,
+        "meal_type": data.meal_type,
+        "date": data.date,
+        "time": data.time,
+        "created_at": firestore.SERVER_TIMESTAMP
+    }
+    
+    reading_id = await repo.add_reading(blood_sugar_data)
+    
+    return BloodSugarResponse(
+        id=reading_id,
+        blood_sugar=data.blood_sugar,
+        meal_type=data.meal_type,
+        date=data.date,
+        time=data.time,
+        created_at=datetime.now().isoformat()
+    )
+
+@router.post("/bulk", response_model=BulkResult)
+async def create_blood_sugar_bulk(request: Request, user_id: str = Depends(get_current_user_id)):
+    """혈당 데이터 일괄 등록 (기기/앱 동기화용)
+
+    본문: 기록 배열, {"readings": [...]} 또는 NDJSON (Content-Type: application/x-ndjson).
+    항목 형식과 검증 규칙(bulk_ingest.validate, 날짜/시간은 0을 채운 YYYY-MM-DD, HH:MM)은 POST /blood-sugar/ 와 같으며,
+    잘못된 항목만 제외하고 나머지를 저장합니다.
+    """
     try:
-        # 날짜 형식 검증
-        datetime.strptime(data.date, "%Y-%m-%d")
-        datetime.strptime(data.time, "%H:%M")
-        
-        # 식사 타입 검증
-        valid_meal_types = ["기상직후", "아침", "점심", "저녁"]
-        if data.meal_type not in valid_meal_types:
-            raise HTTPException(status_code=400, detail=f"잘못된 식사 타입입니다. 가능한 값: {valid_meal_types}")
-        
-        # 혈당 수치 검증
-        if data.blood_sugar < 0 or data.blood_sugar > 1000:
-            raise HTTPException(status_code=400, detail="혈당 수치는 0-1000 사이여야 합니다")
-        
-        # 개발자 모드에서는 더미 데이터 반환
-        if settings.DEV_MODE:
-            return BloodSugarResponse(
-                id="dev_blood_sugar_123",
-                blood_sugar=data.blood_sugar,
-                meal_type=data.meal_type,
-                date=data.date,
-                time=data.time,
-                created_at=datetime.now().isoformat()
-            )
-        
-        # Firebase에 저장
-        db = get_firestore_db()
-        blood_sugar_data = {
+        items, parse_errors = bulk_ingest.parse_body(await request.body(), request.headers.get("content-type"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(items) > settings.BLOOD_SUGAR_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {settings.BLOOD_SUGAR_BULK_MAX_ITEMS}건까지 등록할 수 있습니다")
+
+    readings, errors = bulk_ingest.validate(items, parse_errors)
+    results = [BulkItemResult(index=i, status="invalid", error=error) for i, error in errors.items()]
+
+    outcomes = await repo.add_readings([
+        {
             "user_id": user_id,
-            "blood_sugar": data.blood_sugar,
-            "meal_type": data.meal_type,
-            "date": data.date,
-            "time": data.time,
+            "blood_sugar": reading["blood_sugar"],
+            "meal_type": reading["meal_type"],
+            "date": reading["date"],
+            "time": reading["time"],
             "created_at": firestore.SERVER_TIMESTAMP
         }
-        
-        doc_ref = db.collection('blood_sugar').add(blood_sugar_data)
-        
-        return BloodSugarResponse(
-            id=doc_ref[1].id,
-            blood_sugar=data.blood_sugar,
-            meal_type=data.meal_type,
-            date=data.date,
-            time=data.time,
-            created_at=datetime.now().isoformat()
-        )
-        
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"날짜/시간 형식 오류: {str(e)}")
+        for reading in readings
+    ], concurrency=settings.BLOOD_SUGAR_BULK_CONCURRENCY)
 
-@router.get("/", response_model=List[BloodSugarResponse])
-async def get_blood_sugar_list(user_id: str = Depends(get_current_user_id)):
-    """사용자의 혈당 데이터 목록 조회"""
-    try:
-        # 개발자 모드에서는 더미 데이터 반환
-        if settings.DEV_MODE:
-            return [
-                BloodSugarResponse(
-                    id="dev_1",
-                    blood_sugar=120,
-                    meal_type="아침",
-                    date="2024-01-15",
-                    time="08:30",
-                    created_at="2024-01-15T08:30:00"
-                ),
-                BloodSugarResponse(
-                    id="dev_2",
-                    blood_sugar=95,
-                    meal_type="점심",
-                    date="2024-01-15",
-                    time="12:30",
-                    created_at="2024-01-15T12:30:00"
-                )
-            ]
-        
-        # Firebase에서 사용자의 혈당 데이터 조회
-        db = get_firestore_db()
-        blood_sugar_docs = db.collection('blood_sugar').where('user_id', '==', user_id).stream()
-        
-        blood_sugar_list = []
-        for doc in blood_sugar_docs:
-            data = doc.to_dict()
-            blood_sugar_list.append(BloodSugarResponse(
-                id=doc.id,
-                blood_sugar=data['blood_sugar'],
-                meal_type=data['meal_type'],
-                date=data['date'],
-                time=data['time'],
-                created_at=data['created_at'].isoformat() if hasattr(data['created_at'], 'isoformat') else str(data['created_at'])
-            ))
-        
-        return blood_sugar_list
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"혈당 데이터 조회 실패: {str(e)}")
+    for reading, outcome in zip(readings, outcomes):
+        if isinstance(outcome, Exception):
+            results.append(BulkItemResult(index=reading["index"], status="failed", error=f"저장 실패: {str(outcome)}"))
+        else:
+            results.append(BulkItemResult(index=reading["index"], status="created", id=outcome))
+    results.sort(key=lambda result: result.index)
+
+    created = sum(1 for result in results if result.status == "created")
+    return BulkResult(
+        received=len(items),
+        created=created,
+        invalid=len(errors),
+        failed=len(readings) - created,
+        results=results
+    )
 
 @router.get("/daily/{date}", response_model=List[BloodSugarResponse])
 async def get_blood_sugar_by_date(date: str, user_id: str = Depends(get_current_user_id)):
     """특정 날짜의 혈당 데이터 조회"""
     try:
-        # 날짜 형식 검증
-        datetime.strptime(date, "%Y-%m-%d")
-        
-        # 개발자 모드에서는 더미 데이터 반환
-        if settings.DEV_MODE:
-            return [
-                BloodSugarResponse(
-                    id="dev_1",
-                    blood_sugar=120,
-                    meal_type="아침",
-                    date=date,
-                    time="08:30",
-                    created_at=f"{date}T08:30:00"
-                ),
-                BloodSugarResponse(
-                    id="dev_2",
-                    blood_sugar=95,
-                    meal_type="점심",
-                    date=date,
-                    time="12:30",
-                    created_at=f"{date}T12:30:00"
-                )
-            ]
+        # 날짜 형식 검증 (저장할 때와 같은 형식)
+        if bulk_ingest.date_error(date):
+            raise ValueError(bulk_ingest.date_error(date))
         
         # Firebase에서 특정 날짜의 혈당 데이터 조회
-        db = get_firestore_db()
-        blood_sugar_docs = db.collection('blood_sugar').where('user_id', '==', user_id).where('date', '==', date).stream()
+        blood_sugar_docs = await repo.list_blood_sugar_for_user(user_id, date=date)
         
         blood_sugar_list = []
-        for doc in blood_sugar_docs:
-            data = doc.to_dict()
+        for data in blood_sugar_docs:
             blood_sugar_list.append(BloodSugarResponse(
-                id=doc.id,
+                id=data['id'],
                 blood_sugar=data['blood_sugar'],
                 meal_type=data['meal_type'],
                 date=data['date'],
@@ -212,53 +157,28 @@ async def blood_sugar_health():
         "message": "혈당 서비스가 정상적으로 작동 중입니다"
     }
 
-@router.get("/", response_model=List[BloodSugarResponse])
+@router.get("/", response_model=BloodSugarPage)
 async def get_blood_sugar_list(
     date: Optional[str] = None,
     meal_type: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200, description="페이지 크기"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
     user_id: str = Depends(get_current_user_id)
 ):
-    """혈당 데이터 조회"""
+    """혈당 데이터 조회 (최신순, 커서 기반 페이지네이션)"""
     try:
-        # 개발자 모드에서는 더미 데이터 반환
-        if settings.DEV_MODE:
-            dummy_data = [
-                BloodSugarResponse(
-                    id="dev_1",
-                    blood_sugar=120,
-                    meal_type="아침",
-                    date="2024-01-15",
-                    time="08:30",
-                    created_at="2024-01-15T08:30:00"
-                ),
-                BloodSugarResponse(
-                    id="dev_2",
-                    blood_sugar=95,
-                    meal_type="점심",
-                    date="2024-01-15",
-                    time="12:30",
-                    created_at="2024-01-15T12:30:00"
-                )
-            ]
-            return dummy_data
-        
-        # Firebase에서 조회
-        db = get_firestore_db()
-        query = db.collection('blood_sugar').where('user_id', '==', user_id)
-        
-        if date:
-            query = query.where('date', '==', date)
-        
-        if meal_type:
-            query = query.where('meal_type', '==', meal_type)
-        
-        docs = query.order_by('date', direction=firestore.Query.DESCENDING).order_by('time', direction=firestore.Query.DESCENDING).stream()
+        # Firebase에서 한 페이지 조회 (정렬/필터/커서 모두 서버 쿼리)
+        try:
+            docs, next_cursor = await repo.page_blood_sugar_for_user(
+                user_id, limit, cursor=cursor, date=date, meal_type=meal_type
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         blood_sugar_list = []
-        for doc in docs:
-            data = doc.to_dict()
+        for data in docs:
             blood_sugar_list.append(BloodSugarResponse(
-                id=doc.id,
+                id=data['id'],
                 blood_sugar=data['blood_sugar'],
                 meal_type=data['meal_type'],
                 date=data['date'],
@@ -266,8 +186,10 @@ async def get_blood_sugar_list(
                 created_at=data.get('created_at', '').isoformat() if hasattr(data.get('created_at'), 'isoformat') else str(data.get('created_at', ''))
             ))
         
-        return blood_sugar_list
+        return BloodSugarPage(items=blood_sugar_list, next_cursor=next_cursor)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"혈당 데이터 조회 실패: {str(e)}")
 
@@ -275,30 +197,17 @@ async def get_blood_sugar_list(
 async def get_blood_sugar_detail(blood_sugar_id: str, user_id: str = Depends(get_current_user_id)):
     """특정 혈당 데이터 조회"""
     try:
-        # 개발자 모드에서는 더미 데이터 반환
-        if settings.DEV_MODE:
-            return BloodSugarResponse(
-                id=blood_sugar_id,
-                blood_sugar=120,
-                meal_type="아침",
-                date="2024-01-15",
-                time="08:30",
-                created_at="2024-01-15T08:30:00"
-            )
-        
         # Firebase에서 조회
-        db = get_firestore_db()
-        doc = db.collection('blood_sugar').document(blood_sugar_id).get()
+        data = await repo.get_blood_sugar(blood_sugar_id)
         
-        if not doc.exists:
+        if data is None:
             raise HTTPException(status_code=404, detail="혈당 데이터를 찾을 수 없습니다")
         
-        data = doc.to_dict()
         if data['user_id'] != user_id:
             raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
         
         return BloodSugarResponse(
-            id=doc.id,
+            id=data['id'],
             blood_sugar=data['blood_sugar'],
             meal_type=data['meal_type'],
             date=data['date'],
@@ -319,42 +228,12 @@ async def update_blood_sugar(
 ):
     """혈당 데이터 수정"""
     try:
-        # 날짜 형식 검증
-        datetime.strptime(data.date, "%Y-%m-%d")
-        datetime.strptime(data.time, "%H:%M")
-        
-        # 식사 타입 검증
-        valid_meal_types = ["기상직후", "아침", "점심", "저녁"]
-        if data.meal_type not in valid_meal_types:
-            raise HTTPException(status_code=400, detail=f"잘못된 식사 타입입니다. 가능한 값: {valid_meal_types}")
-        
-        # 혈당 수치 검증
-        if data.blood_sugar < 0 or data.blood_sugar > 1000:
-            raise HTTPException(status_code=400, detail="혈당 수치는 0-1000 사이여야 합니다")
-        
-        # 개발자 모드에서는 더미 데이터 반환
-        if settings.DEV_MODE:
-            return BloodSugarResponse(
-                id=blood_sugar_id,
-                blood_sugar=data.blood_sugar,
-                meal_type=data.meal_type,
-                date=data.date,
-                time=data.time,
-                created_at=datetime.now().isoformat()
-            )
-        
-        # Firebase에서 수정
-        db = get_firestore_db()
-        doc_ref = db.collection('blood_sugar').document(blood_sugar_id)
-        doc = doc_ref.get()
-        
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="혈당 데이터를 찾을 수 없습니다")
-        
-        doc_data = doc.to_dict()
-        if doc_data['user_id'] != user_id:
-            raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
+        # 혈당 범위/식사 타입/날짜·시간 형식 검증 (일괄 등록과 같은 규칙)
+        error = bulk_ingest.reading_error(data.model_dump())
+        if error:
+            raise HTTPException(status_code=400, detail=error)
         
+        # Firebase에서 수정 (읽기/소유자 확인/일간 집계 갱신은 repo 에서 동시 수정과 충돌 없이 처리)
         update_data = {
             "blood_sugar": data.blood_sugar,
             "meal_type": data.meal_type,
@@ -363,7 +242,7 @@ async def update_blood_sugar(
             "updated_at": firestore.SERVER_TIMESTAMP
         }
         
-        doc_ref.update(update_data)
+        await repo.update_blood_sugar(blood_sugar_id, update_data, user_id=user_id)
         
         return BloodSugarResponse(
             id=blood_sugar_id,
@@ -374,10 +253,14 @@ async def update_blood_sugar(
             created_at=datetime.now().isoformat()
         )
         
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"날짜/시간 형식 오류: {str(e)}")
     except HTTPException:
         raise
+    except repo.RecordNotFound:
+        raise HTTPException(status_code=404, detail="혈당 데이터를 찾을 수 없습니다")
+    except PermissionError:
+        raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
+    except repo.WriteConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"혈당 데이터 수정 실패: {str(e)}")
 
@@ -385,27 +268,18 @@ async def update_blood_sugar(
 async def delete_blood_sugar(blood_sugar_id: str, user_id: str = Depends(get_current_user_id)):
     """혈당 데이터 삭제"""
     try:
-        # 개발자 모드에서는 더미 응답 반환
-        if settings.DEV_MODE:
-            return {"message": "혈당 데이터가 삭제되었습니다", "id": blood_sugar_id}
-        
-        # Firebase에서 삭제
-        db = get_firestore_db()
-        doc_ref = db.collection('blood_sugar').document(blood_sugar_id)
-        doc = doc_ref.get()
-        
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="혈당 데이터를 찾을 수 없습니다")
-        
-        doc_data = doc.to_dict()
-        if doc_data['user_id'] != user_id:
-            raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
-        
-        doc_ref.delete()
+        # Firebase에서 삭제 (이미 삭제된 기록이면 404 이므로 일간 집계에서 두 번 빠지지 않음)
+        await repo.delete_blood_sugar(blood_sugar_id, user_id=user_id)
         
         return {"message": "혈당 데이터가 삭제되었습니다", "id": blood_sugar_id}
         
     except HTTPException:
         raise
+    except repo.RecordNotFound:
+        raise HTTPException(status_code=404, detail="혈당 데이터를 찾을 수 없습니다")
+    except PermissionError:
+        raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
+    except repo.WriteConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"혈당 데이터 삭제 실패: {str(e)}")
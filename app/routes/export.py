@@ -0,0 +1,76 @@
+# app/routes/export.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, Optional
+from app.dependencies import get_current_user_id
+from app.services import bulk_ingest, export_stream, meal_analysis
+from app.services import firestore_repository as repo
+
+router = APIRouter()
+
+BLOOD_SUGAR_COLUMNS = ["id", "date", "time", "meal_type", "blood_sugar", "created_at"]
+MEAL_COLUMNS = [
+    "id", "date", "time", "analysis.name", "analysis.calories", "analysis.carbs", "analysis.protein", "analysis.fat",
+    "notes", "status", "image_filename", "created_at"
+]
+
+# 값이 비어 있을 때 채우는 기본값 (조회 API 와 같은 규칙, CSV/NDJSON 공통)
+MEAL_DEFAULTS = {"status": meal_analysis.COMPLETE}
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+def _validate_range(start_date: Optional[str], end_date: Optional[str]) -> None:
+    """기간 경계는 저장된 날짜와 문자열로 비교하므로 0을 채운 YYYY-MM-DD 만 허용"""
+    for value in (start_date, end_date):
+        if value and bulk_ingest.date_error(value):
+            raise HTTPException(status_code=400, detail=bulk_ingest.date_error(value))
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date 는 end_date 보다 이후일 수 없습니다")
+
+async def _with_defaults(records: AsyncIterator[Dict[str, Any]], defaults: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    async for record in records:
+        for field, value in defaults.items():
+            if not record.get(field):
+                record[field] = value
+        yield record
+
+def _export(collection: str, name: str, columns, user_id: str, format: str, start_date, end_date, gzip: bool, defaults=None):
+    _validate_range(start_date, end_date)
+    records = repo.iter_user_records(collection, user_id, start_date, end_date)
+    if defaults:
+        records = _with_defaults(records, defaults)
+    encode = export_stream.encode_csv if format == "csv" else export_stream.encode_ndjson
+    body = encode(records, columns)
+    period = f"_{start_date or ''}_{end_date or ''}" if start_date or end_date else ""
+    filename = f"{name}_{user_id}{period}.{format}"
+    media_type = MEDIA_TYPES[format]
+    if gzip:
+        body = export_stream.gzip_stream(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "no-store"
+    })
+
+@router.get("/blood-sugar")
+async def export_blood_sugar(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    start_date: Optional[str] = Query(None, description="YYYY-MM-DD (포함)"),
+    end_date: Optional[str] = Query(None, description="YYYY-MM-DD (포함)"),
+    gzip: bool = Query(False, description="gzip 압축 파일(.gz)로 내려받기"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """혈당 기록 전체 내보내기 (날짜/시간 순, 스트리밍)"""
+    return _export(repo.BLOOD_SUGAR, "blood_sugar", BLOOD_SUGAR_COLUMNS, user_id, format, start_date, end_date, gzip)
+
+@router.get("/meals")
+async def export_meals(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    start_date: Optional[str] = Query(None, description="YYYY-MM-DD (포함)"),
+    end_date: Optional[str] = Query(None, description="YYYY-MM-DD (포함)"),
+    gzip: bool = Query(False, description="gzip 압축 파일(.gz)로 내려받기"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """식단 기록 전체 내보내기 (날짜/시간 순, 스트리밍)"""
+    return _export(repo.MEALS, "meals", MEAL_COLUMNS, user_id, format, start_date, end_date, gzip, MEAL_DEFAULTS)
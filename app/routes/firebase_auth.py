@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Header, Request
 from fastapi.responses import JSONResponse, RedirectResponse, HTMLResponse
-from app.services.firebase_auth_service import kakao_login_with_firebase, verify_user_token, exchange_kakao_code_for_token
+from app.services.firebase_auth_service import kakao_login_with_firebase, kakao_login_from_code, verify_user_token, invalidate_user
 from app.firebase_config import initialize_firebase
+from app.services import firestore_repository as repo
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -34,10 +35,8 @@ async def kakao_callback(code: str = None, error: str = None):
         print(f"DEBUG: redirect_uri = {redirect_uri}")
         print(f"DEBUG: 새로운 인증 코드로 토큰 교환 시도")
         
-        access_token = await exchange_kakao_code_for_token(code, redirect_uri)
-        
-        # 2. 액세스 토큰으로 사용자 정보 가져오기
-        user_data = await kakao_login_with_firebase(access_token)
+        # 2. 액세스 토큰으로 사용자 정보 가져오기 (같은 코드로 동시에 들어온 요청은 한 번만 처리)
+        user_data = await kakao_login_from_code(code, redirect_uri)
         
         return JSONResponse(content={
             "success": True,
@@ -60,10 +59,8 @@ async def kakao_login_with_code(code: str, redirect_uri: str = None):
         if not redirect_uri:
             from app.config import settings
             redirect_uri = settings.KAKAO_REDIRECT_URI
-        access_token = await exchange_kakao_code_for_token(code, redirect_uri)
-        
-        # 2. 액세스 토큰으로 사용자 정보 가져오기
-        user_data = await kakao_login_with_firebase(access_token)
+        # 2. 액세스 토큰으로 사용자 정보 가져오기 (같은 코드로 동시에 들어온 요청은 한 번만 처리)
+        user_data = await kakao_login_from_code(code, redirect_uri)
         
         return JSONResponse(content={
             "success": True,
@@ -130,16 +127,11 @@ async def get_kakao_login_url():
 async def get_all_users():
     """모든 사용자 목록 조회"""
     try:
-        from app.firebase_config import get_firestore_db
-        
-        db = get_firestore_db()
-        users_ref = db.collection('users')
         users = []
         
-        for doc in users_ref.stream():
-            user_data = doc.to_dict()
+        for user_data in await repo.list_users():
             users.append({
-                "id": doc.id,
+                "id": user_data["id"],
                 "kakao_id": user_data.get("kakao_id"),
                 "email": user_data.get("email"),
                 "nickname": user_data.get("nickname"),
@@ -217,8 +209,8 @@ async def create_id_token(payload: IdTokenRequest):
     """kakao_id로 커스텀 토큰 생성 후 ID 토큰으로 교환하여 반환"""
     try:
         from firebase_admin import auth
-        import httpx
         from app.config import settings
+        from app.services import http_client
         
         if not settings.FIREBASE_WEB_API_KEY:
             raise HTTPException(status_code=500, detail="FIREBASE_WEB_API_KEY 미설정")
@@ -227,18 +219,17 @@ async def create_id_token(payload: IdTokenRequest):
         custom_token = auth.create_custom_token(payload.kakao_id).decode()
         
         exchange_url = f"https://identitytoolkit.googleapis.com/v1/accounts:signInWithCustomToken?key={settings.FIREBASE_WEB_API_KEY}"
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post(exchange_url, json={
-                "token": custom_token,
-                "returnSecureToken": True
-            })
-            if resp.status_code != 200:
-                return JSONResponse(content={
-                    "success": False,
-                    "error": resp.text,
-                    "message": "ID 토큰 교환 실패"
-                }, status_code=resp.status_code)
-            data = resp.json()
+        resp = await http_client.get_client().post(exchange_url, json={
+            "token": custom_token,
+            "returnSecureToken": True
+        })
+        if resp.status_code != 200:
+            return JSONResponse(content={
+                "success": False,
+                "error": resp.text,
+                "message": "ID 토큰 교환 실패"
+            }, status_code=resp.status_code)
+        data = resp.json()
         
         return {
             "success": True,
@@ -260,15 +251,10 @@ async def create_id_token(payload: IdTokenRequest):
 async def update_user_profile(kakao_id: str, profile_data: dict):
     """사용자 프로필 업데이트"""
     try:
-        from app.firebase_config import get_firestore_db
         from firebase_admin import firestore
         
-        db = get_firestore_db()
-        user_ref = db.collection('users').document(kakao_id)
-        
         # 사용자 존재 확인
-        user_doc = user_ref.get()
-        if not user_doc.exists:
+        if await repo.get_user(kakao_id) is None:
             return JSONResponse(content={
                 "success": False,
                 "error": "사용자를 찾을 수 없습니다",
@@ -287,12 +273,9 @@ async def update_user_profile(kakao_id: str, profile_data: dict):
         # updated_at 자동 설정
         update_data["updated_at"] = firestore.SERVER_TIMESTAMP
         
-        # 프로필 업데이트
-        user_ref.update(update_data)
-        
-        # 업데이트된 사용자 정보 반환
-        updated_doc = user_ref.get()
-        updated_data = updated_doc.to_dict()
+        # 프로필 업데이트 후 업데이트된 사용자 정보 반환
+        updated_data = await repo.update_user(kakao_id, update_data)
+        invalidate_user(kakao_id)
         
         return {
             "success": True,
@@ -317,20 +300,15 @@ async def update_user_profile(kakao_id: str, profile_data: dict):
 async def get_user_by_kakao_id(kakao_id: str):
     """kakao_id로 특정 사용자 조회"""
     try:
-        from app.firebase_config import get_firestore_db
-        
-        db = get_firestore_db()
-        user_ref = db.collection('users').document(kakao_id)
-        user_doc = user_ref.get()
+        user_data = await repo.get_user(kakao_id)
         
-        if not user_doc.exists:
+        if user_data is None:
             return JSONResponse(content={
                 "success": False,
                 "error": "사용자를 찾을 수 없습니다",
                 "message": f"kakao_id {kakao_id}에 해당하는 사용자가 없습니다"
             }, status_code=404)
         
-        user_data = user_doc.to_dict()
         return {
             "success": True,
             "user": {
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import BaseModel, TypeAdapter
+from typing import Dict, List, Optional
+from app.services.korean_search import SearchIndex
+from app.services.precompiled import PrecompiledResponse
 
 router = APIRouter()
 
@@ -23,6 +25,11 @@ class FoodResponse(BaseModel):
     good_foods: List[FoodCategory]
     bad_foods: List[FoodCategory]
 
+class CategoryFoodResponse(BaseModel):
+    category: str
+    good_foods: List[FoodItem]
+    bad_foods: List[FoodItem]
+
 # 당뇨에 좋은 음식 데이터 (GI < 55)
 GOOD_FOODS = {
     "음식": [
@@ -707,76 +714,80 @@ BAD_FOODS = {
     ]
 }
 
+CATEGORIES = ["음식", "간식", "음료", "과일"]
+
+def _categories(foods: Dict[str, List[FoodItem]]) -> List[FoodCategory]:
+    return [FoodCategory(category=cat, foods=items) for cat, items in foods.items()]
+
+# 카탈로그 데이터는 바뀌지 않으므로 엔드포인트/카테고리별 응답을 시작 시 한 번 직렬화+압축
+_category_list = TypeAdapter(List[FoodCategory])
+_all_response = PrecompiledResponse(
+    FoodResponse(good_foods=_categories(GOOD_FOODS), bad_foods=_categories(BAD_FOODS)).model_dump_json().encode()
+)
+_good_response = PrecompiledResponse(_category_list.dump_json(_categories(GOOD_FOODS)))
+_bad_response = PrecompiledResponse(_category_list.dump_json(_categories(BAD_FOODS)))
+_category_responses = {
+    name: PrecompiledResponse(CategoryFoodResponse(
+        category=name,
+        good_foods=GOOD_FOODS.get(name, []),
+        bad_foods=BAD_FOODS.get(name, [])
+    ).model_dump_json().encode())
+    for name in CATEGORIES
+}
+
 @router.get("/", response_model=FoodResponse)
-async def get_all_foods():
+async def get_all_foods(request: Request):
     """모든 음식 데이터 조회 (좋은 음식과 나쁜 음식 분류)"""
-    good_foods_categories = [
-        FoodCategory(category=cat, foods=foods) 
-        for cat, foods in GOOD_FOODS.items()
-    ]
-    
-    bad_foods_categories = [
-        FoodCategory(category=cat, foods=foods) 
-        for cat, foods in BAD_FOODS.items()
-    ]
-    
-    return FoodResponse(
-        good_foods=good_foods_categories,
-        bad_foods=bad_foods_categories
-    )
+    return _all_response.respond(request)
 
 @router.get("/good", response_model=List[FoodCategory])
-async def get_good_foods():
+async def get_good_foods(request: Request):
     """당뇨에 좋은 음식만 조회"""
-    return [
-        FoodCategory(category=cat, foods=foods) 
-        for cat, foods in GOOD_FOODS.items()
-    ]
+    return _good_response.respond(request)
 
 @router.get("/bad", response_model=List[FoodCategory])
-async def get_bad_foods():
+async def get_bad_foods(request: Request):
     """당뇨에 나쁜 음식만 조회"""
-    return [
-        FoodCategory(category=cat, foods=foods) 
-        for cat, foods in BAD_FOODS.items()
-    ]
+    return _bad_response.respond(request)
 
-@router.get("/category/{category_name}")
-async def get_foods_by_category(category_name: str):
+@router.get("/category/{category_name}", response_model=CategoryFoodResponse)
+async def get_foods_by_category(category_name: str, request: Request):
     """특정 카테고리의 음식 조회"""
-    if category_name not in ["음식", "간식", "음료", "과일"]:
+    response = _category_responses.get(category_name)
+    if response is None:
         raise HTTPException(status_code=400, detail="잘못된 카테고리입니다. '음식', '간식', '음료', '과일' 중 선택하세요.")
-    
-    good_foods = GOOD_FOODS.get(category_name, [])
-    bad_foods = BAD_FOODS.get(category_name, [])
-    
-    return {
-        "category": category_name,
-        "good_foods": good_foods,
-        "bad_foods": bad_foods
-    }
+    return response.respond(request)
+
+# 검색 인덱스 (이름/ID/설명, 초성·자모 포함) - 결과 번호는 _search_entries 의 번호
+_search_entries = [
+    (food, food_type, category)
+    for food_type, catalog in (("good", GOOD_FOODS), ("bad", BAD_FOODS))
+    for category, items in catalog.items()
+    for food in items
+]
+_search_index = SearchIndex([(food.name, food.id, food.description) for food, _, _ in _search_entries])
 
 @router.get("/search/{food_name}")
-async def search_food(food_name: str):
-    """음식 이름으로 검색"""
-    all_foods = []
-    
-    # 좋은 음식에서 검색
-    for category, foods in GOOD_FOODS.items():
-        for food in foods:
-            if food_name.lower() in food.name.lower():
-                all_foods.append({"food": food, "type": "good", "category": category})
+async def search_food(food_name: str, limit: int = Query(20, ge=1, le=100)):
+    """음식 검색 (이름/초성/입력 중인 글자/ID/설명, 관련도 순)"""
+    results = []
+    for doc, score, match in _search_index.search(food_name, limit):
+        food, food_type, category = _search_entries[doc]
+        results.append({"food": food, "type": food_type, "category": category, "match": match, "score": score})
     
-    # 나쁜 음식에서 검색
-    for category, foods in BAD_FOODS.items():
-        for food in foods:
-            if food_name.lower() in food.name.lower():
-                all_foods.append({"food": food, "type": "bad", "category": category})
-    
-    if not all_foods:
+    if not results:
         raise HTTPException(status_code=404, detail=f"'{food_name}'을(를) 찾을 수 없습니다.")
     
     return {
         "search_term": food_name,
-        "results": all_foods
+        "results": results
     }
+
+@router.get("/autocomplete")
+async def autocomplete_food(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    """음식 이름 자동완성 (접두어, 초성 "ㄱㄱㅁ", 입력 중인 글자 "곡" 지원)"""
+    suggestions = []
+    for doc, _, match in _search_index.autocomplete(q, limit):
+        food, food_type, category = _search_entries[doc]
+        suggestions.append({"id": food.id, "name": food.name, "type": food_type, "category": category, "match": match})
+    return {"query": q, "suggestions": suggestions}
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Header
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Query
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from app.firebase_config import get_firestore_db
 from app.config import settings
+from app.dependencies import get_current_user_id
+from app.services import bulk_ingest
+from app.services import firestore_repository as repo
+from app.services import meal_analysis
+from app.services.blob_store import BlobTooLarge, get_blob_store, iter_upload
 from firebase_admin import firestore
+import os
 import uuid
 
 router = APIRouter()
@@ -15,6 +20,7 @@ class MealAnalysis(BaseModel):
     carbs: Optional[float] = None
     protein: Optional[float] = None
     fat: Optional[float] = None
+    confidence: Optional[float] = None  # 사진 분석 시 분류 확률
 
 class MealResponse(BaseModel):
     id: str
@@ -26,8 +32,14 @@ class MealResponse(BaseModel):
     content_type: Optional[str] = None
     size_bytes: Optional[int] = None
     analysis: MealAnalysis
+    status: str = meal_analysis.COMPLETE  # 사진 업로드: pending → analyzing → complete / failed
+    analysis_error: Optional[str] = None
     created_at: str
 
+class MealHistoryPage(BaseModel):
+    items: List[MealResponse]
+    next_cursor: Optional[str] = None  # 다음 페이지가 없으면 None
+
 class ManualMealCreate(BaseModel):
     name: str
     calories: float
@@ -38,26 +50,11 @@ class ManualMealCreate(BaseModel):
     time: str  # HH:MM
     notes: Optional[str] = None
 
-async def get_current_user_id(authorization: str = Header(None)) -> str:
-    if settings.DEV_MODE:
-        return "dev_user_123"
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="토큰이 필요합니다")
-    try:
-        from app.services.firebase_auth_service import verify_user_token
-        token = authorization.split(" ")[1]
-        decoded_token = await verify_user_token(token)
-        # kakao_id를 user_id로 사용
-        return decoded_token.get("kakao_id") or decoded_token.get("uid")
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=f"토큰 검증 실패: {str(e)}")
-
 def _validate_date_time(date_str: str, time_str: str):
-    try:
-        datetime.strptime(date_str, "%Y-%m-%d")
-        datetime.strptime(time_str, "%H:%M")
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"날짜/시간 형식 오류: {str(e)}")
+    """혈당 기록과 같은 규칙 (0을 채운 YYYY-MM-DD, HH:MM) - 날짜/시간 범위 쿼리가 문자열로 비교함"""
+    error = bulk_ingest.date_error(date_str) or bulk_ingest.time_error(time_str)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
 
 @router.post("/upload", response_model=MealResponse)
 async def upload_meal_image(
@@ -67,101 +64,58 @@ async def upload_meal_image(
     notes: Optional[str] = Form(None),
     user_id: str = Depends(get_current_user_id)
 ):
-    """음식 이미지 업로드 (multipart/form-data)"""
-    _validate_date_time(date, time)
+    """음식 이미지 업로드 (multipart/form-data)
 
-    # 간단한 분석 더미/플레이스홀더
-    if settings.DEV_MODE:
-        analysis = MealAnalysis(
-            name="비빔밥",
-            calories=650.0,
-            carbs=85.0,
-            protein=20.0,
-            fat=20.0,
-        )
-    else:
-        analysis = MealAnalysis(name=None, calories=None, carbs=None, protein=None, fat=None)
+    사진을 저장하고 status="pending" 으로 식단을 만든 뒤 바로 응답합니다.
+    분류/영양 분석은 백그라운드에서 진행되며 GET /meals/{id} 로 결과(status="complete")를 확인합니다.
+    """
+    _validate_date_time(date, time)
+    if not image.content_type or not image.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="이미지 파일만 업로드 가능")
 
-    # Firestore 저장
-    if settings.DEV_MODE:
-        created_at_str = datetime.now().isoformat()
-        return MealResponse(
-            id=str(uuid.uuid4()),
-            user_id=user_id,
-            date=date,
-            time=time,
-            notes=notes,
-            image_filename=image.filename,
-            content_type=image.content_type,
-            size_bytes=0,
-            analysis=analysis,
-            created_at=created_at_str,
-        )
+    # 사진은 청크 단위로 저장소에 기록 (전체를 메모리에 올리지 않음)
+    store = get_blob_store()
+    extension = os.path.splitext(image.filename or "")[1].lower()[:10]
+    image_key = f"meals/{user_id}/{uuid.uuid4().hex}{extension}"
+    try:
+        size_bytes = await store.put_stream(image_key, iter_upload(image), max_bytes=settings.MEAL_UPLOAD_MAX_BYTES)
+    except BlobTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
-    db = get_firestore_db()
+    analysis = MealAnalysis()
     meal_doc = {
         "user_id": user_id,
         "date": date,
         "time": time,
         "notes": notes,
         "image_filename": image.filename,
+        "image_key": image_key,
         "content_type": image.content_type,
-        "size_bytes": None,
+        "size_bytes": size_bytes,
         "analysis": analysis.model_dump(),
+        "status": meal_analysis.PENDING,
         "created_at": firestore.SERVER_TIMESTAMP,
     }
-    doc_ref = db.collection("meals").add(meal_doc)
+    try:
+        meal_id = await repo.add_meal(meal_doc)
+    except Exception:
+        await store.delete(image_key)
+        raise
+    meal_analysis.enqueue(meal_id)
     return MealResponse(
-        id=doc_ref[1].id,
+        id=meal_id,
         user_id=user_id,
         date=date,
         time=time,
         notes=notes,
         image_filename=image.filename,
         content_type=image.content_type,
-        size_bytes=None,
+        size_bytes=size_bytes,
         analysis=analysis,
+        status=meal_analysis.PENDING,
         created_at=datetime.now().isoformat(),
     )
 
-@router.get("/{meal_id}", response_model=MealResponse)
-async def get_meal(meal_id: str, user_id: str = Depends(get_current_user_id)):
-    """분석 결과 조회 (예: 음식명, 칼로리, 탄단지 등)"""
-    if settings.DEV_MODE:
-        return MealResponse(
-            id=meal_id,
-            user_id=user_id,
-            date="2024-08-01",
-            time="12:15",
-            notes="개발 모드 더미",
-            image_filename="lunch.jpg",
-            content_type="image/jpeg",
-            size_bytes=123456,
-            analysis=MealAnalysis(name="치킨샐러드", calories=420.0, carbs=15.0, protein=35.0, fat=22.0),
-            created_at=datetime.now().isoformat(),
-        )
-
-    db = get_firestore_db()
-    doc = db.collection("meals").document(meal_id).get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="식단을 찾을 수 없습니다")
-    data = doc.to_dict()
-    if data.get("user_id") != user_id:
-        raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
-    analysis = MealAnalysis(**(data.get("analysis") or {}))
-    return MealResponse(
-        id=meal_id,
-        user_id=data["user_id"],
-        date=data["date"],
-        time=data["time"],
-        notes=data.get("notes"),
-        image_filename=data.get("image_filename"),
-        content_type=data.get("content_type"),
-        size_bytes=data.get("size_bytes"),
-        analysis=analysis,
-        created_at=(data.get("created_at").isoformat() if hasattr(data.get("created_at"), "isoformat") else str(data.get("created_at"))),
-    )
-
 @router.post("/manual", response_model=MealResponse)
 async def create_manual_meal(payload: ManualMealCreate, user_id: str = Depends(get_current_user_id)):
     """수동 식단 등록 (직접 입력)"""
@@ -175,21 +129,6 @@ async def create_manual_meal(payload: ManualMealCreate, user_id: str = Depends(g
         fat=payload.fat,
     )
 
-    if settings.DEV_MODE:
-        return MealResponse(
-            id=str(uuid.uuid4()),
-            user_id=user_id,
-            date=payload.date,
-            time=payload.time,
-            notes=payload.notes,
-            image_filename=None,
-            content_type=None,
-            size_bytes=None,
-            analysis=analysis,
-            created_at=datetime.now().isoformat(),
-        )
-
-    db = get_firestore_db()
     meal_doc = {
         "user_id": user_id,
         "date": payload.date,
@@ -201,9 +140,9 @@ async def create_manual_meal(payload: ManualMealCreate, user_id: str = Depends(g
         "analysis": analysis.model_dump(),
         "created_at": firestore.SERVER_TIMESTAMP,
     }
-    doc_ref = db.collection("meals").add(meal_doc)
+    meal_id = await repo.add_meal(meal_doc)
     return MealResponse(
-        id=doc_ref[1].id,
+        id=meal_id,
         user_id=user_id,
         date=payload.date,
         time=payload.time,
@@ -215,79 +154,36 @@ async def create_manual_meal(payload: ManualMealCreate, user_id: str = Depends(g
         created_at=datetime.now().isoformat(),
     )
 
-@router.get("/history", response_model=List[MealResponse])
+@router.get("/history", response_model=MealHistoryPage)
 async def get_meal_history(
     date: Optional[str] = None,
     start_time: Optional[str] = None,
     end_time: Optional[str] = None,
+    limit: int = Query(30, ge=1, le=100, description="페이지 크기"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
     user_id: str = Depends(get_current_user_id)
 ):
-    """식단 기록 전체 조회 (날짜/시간 필터 가능)"""
-    # 입력 검증 (있을 때만)
-    if date:
-        try:
-            datetime.strptime(date, "%Y-%m-%d")
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=f"날짜 형식 오류: {str(e)}")
-    if start_time:
-        try:
-            datetime.strptime(start_time, "%H:%M")
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=f"시간 형식 오류(start_time): {str(e)}")
-    if end_time:
-        try:
-            datetime.strptime(end_time, "%H:%M")
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=f"시간 형식 오류(end_time): {str(e)}")
-
-    if settings.DEV_MODE:
-        dummy = [
-            MealResponse(
-                id=str(uuid.uuid4()),
-                user_id=user_id,
-                date="2024-08-01",
-                time="08:15",
-                notes="아침",
-                image_filename="breakfast.jpg",
-                content_type="image/jpeg",
-                size_bytes=100000,
-                analysis=MealAnalysis(name="시리얼", calories=320, carbs=60, protein=8, fat=5),
-                created_at=datetime.now().isoformat(),
-            ),
-            MealResponse(
-                id=str(uuid.uuid4()),
-                user_id=user_id,
-                date="2024-08-01",
-                time="12:30",
-                notes="점심",
-                image_filename="lunch.jpg",
-                content_type="image/jpeg",
-                size_bytes=200000,
-                analysis=MealAnalysis(name="비빔밥", calories=650, carbs=85, protein=20, fat=20),
-                created_at=datetime.now().isoformat(),
-            ),
-        ]
-        # 간단 필터링
-        def match(item: MealResponse) -> bool:
-            if date and item.date != date:
-                return False
-            if start_time and item.time < start_time:
-                return False
-            if end_time and item.time > end_time:
-                return False
-            return True
-        return [m for m in dummy if match(m)]
-
-    db = get_firestore_db()
-    # 기본 쿼리: 사용자 기준
-    docs = db.collection("meals").where("user_id", "==", user_id).stream()
+    """식단 기록 조회 (최신순, 날짜/시간 필터, 커서 기반 페이지네이션)"""
+    # 입력 검증 (있을 때만, 저장할 때와 같은 형식)
+    if date and bulk_ingest.date_error(date):
+        raise HTTPException(status_code=400, detail=bulk_ingest.date_error(date))
+    for name, value in (("start_time", start_time), ("end_time", end_time)):
+        if value and bulk_ingest.time_error(value):
+            raise HTTPException(status_code=400, detail=f"{bulk_ingest.time_error(value)}: {name}")
+
+    # 사용자/날짜/시간 필터, 최신순 정렬, 커서 이후 limit개 조회는 Firestore 쿼리에서 처리
+    try:
+        docs, next_cursor = await repo.page_meals_for_user(
+            user_id, limit, cursor=cursor, date=date, start_time=start_time, end_time=end_time
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     meals: List[MealResponse] = []
-    for d in docs:
-        data = d.to_dict()
+    for data in docs:
         analysis = MealAnalysis(**(data.get("analysis") or {}))
         meal = MealResponse(
-            id=d.id,
+            id=data["id"],
             user_id=data["user_id"],
             date=data["date"],
             time=data["time"],
@@ -296,17 +192,34 @@ async def get_meal_history(
             content_type=data.get("content_type"),
             size_bytes=data.get("size_bytes"),
             analysis=analysis,
+            status=data.get("status") or meal_analysis.COMPLETE,
+            analysis_error=data.get("analysis_error"),
             created_at=(data.get("created_at").isoformat() if hasattr(data.get("created_at"), "isoformat") else str(data.get("created_at"))),
         )
         meals.append(meal)
 
-    # 정렬 및 필터링 (클라이언트측)
-    meals.sort(key=lambda x: (x.date, x.time), reverse=True)
-    if date:
-        meals = [m for m in meals if m.date == date]
-    if start_time:
-        meals = [m for m in meals if m.time >= start_time]
-    if end_time:
-        meals = [m for m in meals if m.time <= end_time]
+    return MealHistoryPage(items=meals, next_cursor=next_cursor)
 
-    return meals
+@router.get("/{meal_id}", response_model=MealResponse)
+async def get_meal(meal_id: str, user_id: str = Depends(get_current_user_id)):
+    """분석 결과 조회 (예: 음식명, 칼로리, 탄단지 등)"""
+    data = await repo.get_meal(meal_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="식단을 찾을 수 없습니다")
+    if data.get("user_id") != user_id:
+        raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
+    analysis = MealAnalysis(**(data.get("analysis") or {}))
+    return MealResponse(
+        id=meal_id,
+        user_id=data["user_id"],
+        date=data["date"],
+        time=data["time"],
+        notes=data.get("notes"),
+        image_filename=data.get("image_filename"),
+        content_type=data.get("content_type"),
+        size_bytes=data.get("size_bytes"),
+        analysis=analysis,
+        status=data.get("status") or meal_analysis.COMPLETE,
+        analysis_error=data.get("analysis_error"),
+        created_at=(data.get("created_at").isoformat() if hasattr(data.get("created_at"), "isoformat") else str(data.get("created_at"))),
+    )
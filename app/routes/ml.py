@@ -1,62 +1,216 @@
 # app/routes/ml.py
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query
-from app.services.tflite_service import TFLiteModel
-import csv
-import os
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Response
+from app.config import settings
+from app.services.inference_batcher import MicroBatcher
+from app.services.interpreter_pool import InterpreterPool
+from app.services import nutrition_index
+from app.services.nutrition_index import NutritionIndex
+from app.services.prediction_cache import PredictionCache, difference_hash, image_digest, model_version
+from app.services.tflite_service import TFLiteModel, format_prediction, load_class_names
+import asyncio
 
 router = APIRouter()
 
 # 모델은 서버 시작 시 바로 로드하지 않고, 첫 요청 시 지연 로드합니다.
+# ML_WORKERS > 0 이면 워커 프로세스마다 모델을 로드하고, 0이면 이 프로세스에서 로드합니다.
 _food_model = None
+_food_pool = None
+_food_class_names = None
+_class_nutrition = None
 _food_model_path = "models/kfood30_mnv3_fp16.tflite"
-_nutrition_csv_path = "app/data/food_nutrition_1.csv"
-_nutrition_cache = None
+_food_batcher = None
+_food_batcher_lock = asyncio.Lock()
+_prediction_cache = PredictionCache(
+    maxsize=settings.ML_PREDICTION_CACHE_SIZE,
+    ttl=settings.ML_PREDICTION_CACHE_TTL,
+    similar=settings.ML_PREDICTION_CACHE_SIMILAR,
+    max_distance=settings.ML_PREDICTION_CACHE_MAX_DISTANCE
+)
 
 def get_food_model() -> TFLiteModel:
     global _food_model
     if _food_model is None:
         try:
-            _food_model = TFLiteModel(_food_model_path)
+            _food_model = TFLiteModel(_food_model_path, num_threads=settings.ML_NUM_THREADS)
         except Exception as e:
             # 모델 로드 실패 시 503 반환
             raise HTTPException(503, f"TFLite 모델 로드 실패: {str(e)}")
     return _food_model
 
-def get_nutrition_rows() -> list:
-    global _nutrition_cache
-    if _nutrition_cache is None:
-        if not os.path.exists(_nutrition_csv_path):
-            raise HTTPException(500, f"영양 CSV 파일을 찾을 수 없습니다: {_nutrition_csv_path}")
-        rows = []
-        with open(_nutrition_csv_path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                rows.append(row)
-        _nutrition_cache = rows
-    return _nutrition_cache
+async def _start_food_pool() -> InterpreterPool:
+    pool = InterpreterPool(_food_model_path, settings.ML_WORKERS, num_threads=settings.ML_NUM_THREADS or 1)
+    try:
+        await pool.start()
+    except Exception as e:
+        # 모델 로드 실패 시 503 반환
+        raise HTTPException(503, f"TFLite 모델 로드 실패: {str(e)}")
+    return pool
+
+async def get_food_batcher() -> MicroBatcher:
+    """동시 요청을 모아 한 번에 추론하는 배처 (모델/워커 풀과 함께 지연 생성)"""
+    global _food_batcher, _food_pool, _food_class_names
+    if _food_batcher is not None:
+        return _food_batcher
+    async with _food_batcher_lock:
+        if _food_batcher is None:
+            if settings.ML_WORKERS > 0:
+                _food_pool = await _start_food_pool()
+                _food_class_names = load_class_names(_food_model_path)
+                infer, concurrency = _food_pool.infer_images, _food_pool.workers
+            else:
+                model = get_food_model()
+                _food_class_names = model.class_names
+                infer, concurrency = model.infer_images, 1
+            _food_batcher = MicroBatcher(
+                infer,
+                max_batch_size=settings.ML_MAX_BATCH_SIZE,
+                max_wait_ms=settings.ML_MAX_WAIT_MS,
+                name="food-inference",
+                concurrency=concurrency
+            )
+            # 클래스별 영양 정보는 모델 로드 시 미리 매핑 (실패하면 /food/nutrition 첫 요청 시 재시도)
+            try:
+                get_class_nutrition()
+            except HTTPException as e:
+                print(f"클래스 영양 정보 매핑 건너뜀: {e.detail}")
+    return _food_batcher
+
+def get_class_nutrition() -> dict:
+    """클래스 라벨 → 영양 정보 표 (모델 로드 후 첫 호출 시 한 번 생성)"""
+    global _class_nutrition
+    if _class_nutrition is None:
+        _class_nutrition = nutrition_index.map_labels(get_nutrition_index(), _food_class_names or [])
+        missing = [label for label, info in _class_nutrition.items() if info is None]
+        print(f"클래스 영양 정보 매핑 완료: {len(_class_nutrition) - len(missing)}/{len(_class_nutrition)}개"
+              + (f" (없음: {', '.join(missing)})" if missing else ""))
+    return _class_nutrition
+
+async def analyze_meal_image(image_data: bytes) -> dict:
+    """식단 사진 → MealAnalysis 필드 (가장 확률 높은 음식 + 해당 클래스의 영양 정보)"""
+    result, _ = await _classify(image_data)
+    try:
+        nutrition = get_class_nutrition().get(result["predicted_food"]) or {}
+    except HTTPException as e:
+        print(f"식단 영양 정보 조회 실패: {e.detail}")
+        nutrition = {}
+    return {
+        "name": result["predicted_food"],
+        "confidence": result["confidence"],
+        "calories": nutrition.get("energy_kcal"),
+        "carbs": nutrition.get("carbohydrate_g"),
+        "protein": nutrition.get("protein_g"),
+        "fat": nutrition.get("fat_g")
+    }
+
+def get_batcher_stats() -> dict:
+    return _food_batcher.stats() if _food_batcher is not None else {}
+
+def get_prediction_cache_stats() -> dict:
+    return _prediction_cache.stats()
+
+async def _classify(image_data: bytes) -> tuple:
+    """분류 결과와 캐시 상태 (exact / similar 적중, miss, 캐시 미사용이면 off)"""
+    batcher = await get_food_batcher()
+    if not _prediction_cache.enabled:
+        return format_prediction(await batcher.submit(image_data), _food_class_names), "off"
+
+    # 모델/라벨 파일이 바뀌었으면(워커 재시작 시 새 파일 로드) 이전 결과 폐기
+    _prediction_cache.set_version(model_version(_food_model_path))
+    # 해시/축소 디코딩은 이벤트 루프 밖에서 실행
+    digest = await asyncio.to_thread(image_digest, image_data)
+    cached = _prediction_cache.get(digest)
+    if cached is not None:
+        return cached, "exact"
+    dhash = None
+    if _prediction_cache.similar is not None:
+        dhash = await asyncio.to_thread(difference_hash, image_data)
+        similar = _prediction_cache.get_similar(dhash) if dhash is not None else None
+        if similar is not None:
+            return similar[0], "similar"
+
+    # 동시에 들어온 요청과 묶어 추론 (워커 풀 사용 시 전처리도 워커에서 수행)
+    result = format_prediction(await batcher.submit(image_data), _food_class_names)
+    _prediction_cache.set(digest, result, dhash)
+    return result, "miss"
+
+def get_worker_health() -> dict:
+    return _food_pool.health() if _food_pool is not None else {}
+
+async def shutdown():
+    if _food_batcher is not None:
+        await _food_batcher.stop()
+    if _food_pool is not None:
+        _food_pool.shutdown()
+
+def get_nutrition_index() -> NutritionIndex:
+    """영양 인덱스 (서버 시작 시 열기, 실패했으면 첫 요청 시 다시 시도)"""
+    try:
+        return nutrition_index.get_shared_index()
+    except (OSError, ValueError) as e:
+        raise HTTPException(500, f"영양 정보 로드 실패: {str(e)}")
+
+def load_nutrition_index() -> None:
+    """서버 시작 시 인덱스 미리 열기"""
+    try:
+        index = get_nutrition_index()
+        print(f"영양 인덱스 준비 완료: {len(index)}개 ({', '.join(index.source_names)})")
+    except HTTPException as e:
+        print(f"영양 인덱스 준비 건너뜀: {e.detail}")
 
 @router.post("/food")
-async def infer_food(file: UploadFile = File(...)):
+async def infer_food(response: Response, file: UploadFile = File(...)):
     """음식 이미지 분류 예측"""
     if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(400, "이미지 파일만 업로드 가능")
     
     try:
         img = await file.read()
-        model = get_food_model()
-        result = model.predict(img)
+        result, cache_status = await _classify(img)
+        response.headers["X-Prediction-Cache"] = cache_status
         
-        if result["success"]:
-            return {
-                "model": "kfood30_mnv3_fp16",
-                "predicted_food": result["predicted_food"],
-                "confidence": result["confidence"],
-                "confidence_percentage": result["confidence_percentage"],
-                "top_5_predictions": result["top_5_predictions"]
-            }
-        else:
-            raise HTTPException(500, f"예측 실패: {result['error']}")
+        return {
+            "model": "kfood30_mnv3_fp16",
+            "predicted_food": result["predicted_food"],
+            "confidence": result["confidence"],
+            "confidence_percentage": result["confidence_percentage"],
+            "top_5_predictions": result["top_5_predictions"]
+        }
+            
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"에러 발생: {str(e)}")
+        raise HTTPException(500, f"처리 오류: {str(e)}")
+
+@router.post("/food/nutrition")
+async def infer_food_with_nutrition(
+    response: Response,
+    file: UploadFile = File(...),
+    top_k: int = Query(5, ge=1, le=5, description="영양 정보를 붙일 상위 예측 개수")
+):
+    """음식 이미지 분류 + 상위 예측별 영양 정보를 한 번에 반환"""
+    if not file.content_type or not file.content_type.startswith("image/"):
+        raise HTTPException(400, "이미지 파일만 업로드 가능")
+    
+    try:
+        img = await file.read()
+        result, cache_status = await _classify(img)
+        response.headers["X-Prediction-Cache"] = cache_status
+        class_nutrition = get_class_nutrition()
+        
+        return {
+            "model": "kfood30_mnv3_fp16",
+            "predicted_food": result["predicted_food"],
+            "confidence": result["confidence"],
+            "confidence_percentage": result["confidence_percentage"],
+            "predictions": [
+                {**prediction, "nutrition": class_nutrition.get(prediction["food_name"])}
+                for prediction in result["top_5_predictions"][:top_k]
+            ]
+        }
             
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"에러 발생: {str(e)}")
         raise HTTPException(500, f"처리 오류: {str(e)}")
@@ -65,12 +219,21 @@ async def infer_food(file: UploadFile = File(...)):
 async def ml_health():
     """ML 서비스 상태 확인"""
     try:
-        model = get_food_model()
-        _ = getattr(model, 'input_details', None)
+        await get_food_batcher()
+        if _food_pool is not None:
+            healthy = await _food_pool.ping()
+            return {
+                "status": "healthy" if healthy else "degraded",
+                "service": "tflite-ml",
+                "model": _food_model_path,
+                "workers": _food_pool.health(),
+                "message": "추론 워커가 정상적으로 응답합니다" if healthy else "추론 워커가 응답하지 않습니다"
+            }
         return {
             "status": "healthy",
             "service": "tflite-ml",
             "model": _food_model_path,
+            "workers": {"mode": "in_process", "num_threads": settings.ML_NUM_THREADS},
             "message": "TFLite 모델이 정상적으로 로드되었습니다"
         }
     except HTTPException as e:
@@ -84,59 +247,29 @@ async def ml_health():
 @router.get("/nutrition")
 async def get_food_nutrition(food_name: str = Query(..., alias="food")):
     """선택한 음식명에 대한 영양정보(탄/단/당/지방, 칼로리) 반환"""
-    rows = get_nutrition_rows()
-    # 완전 일치 우선, 없으면 포함 검색
-    exact = [r for r in rows if r.get("식품명") == food_name]
-    candidates = exact if exact else [r for r in rows if food_name in r.get("식품명", "")]
-    if not candidates:
+    index = get_nutrition_index()
+    # 완전 일치 → 공백/괄호 무시 일치 → 포함 검색 → 유사 검색 순
+    match = index.lookup(food_name)
+    if match is None:
         raise HTTPException(404, f"CSV에서 음식을 찾지 못했습니다: {food_name}")
-    r = candidates[0]
-    def to_float(v):
-        try:
-            return float(v)
-        except Exception:
-            return None
+    row, match_type = match
     return {
-        "food_name": r.get("식품명"),
-        "energy_kcal": to_float(r.get("에너지(㎉)")),
-        "carbohydrate_g": to_float(r.get("탄수화물(g)")),
-        "protein_g": to_float(r.get("단백질(g)")),
-        "sugars_g": to_float(r.get("총당류(g)")),
-        "fat_g": to_float(r.get("지방(g)")),
-        "source": os.path.basename(_nutrition_csv_path)
+        **index.record(row),
+        "match": match_type,
+        "source": index.source_of(row)
     }
 
-
-def predict_with_nutrition(self, image_data: bytes):
-    """예측 + 영양 정보 반환"""
-    # 기존 예측 수행
-    prediction_result = self.predict(image_data)
-    
-    if prediction_result["success"]:
-        # 영양 정보 추가
-        nutrition_info = self.get_nutrition_info(prediction_result["predicted_food"])
-        
-        return {
-            **prediction_result,
-            "nutrition": nutrition_info
-        }
-    
-    return prediction_result
-
-def get_nutrition_info(self, food_name: str):
-    """음식명으로 영양 정보 조회"""
-    try:
-        df = pd.read_csv('nutrition_data.csv')
-        food_data = df[df['음식명'] == food_name]
-        
-        if not food_data.empty:
-            return {
-                "탄수화물": float(food_data.iloc[0]['탄수화물(g)']),
-                "단백질": float(food_data.iloc[0]['단백질(g)']),
-                "지방": float(food_data.iloc[0]['지방(g)']),
-                "칼로리": float(food_data.iloc[0]['칼로리(kcal)'])
-            }
-        else:
-            return None
-    except:
-        return None
\ No newline at end of file
+@router.get("/nutrition/search")
+async def search_food_nutrition(
+    q: str = Query(..., min_length=1, description="검색어"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """음식명 검색 (포함 검색 + 유사 검색, 순위순)"""
+    index = get_nutrition_index()
+    return {
+        "query": q,
+        "results": [
+            {**index.record(row), "match": match_type, "score": round(score, 3), "source": index.source_of(row)}
+            for row, match_type, score in index.search(q, limit)
+        ]
+    }
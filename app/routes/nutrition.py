@@ -1,29 +1,27 @@
 # app/routes/nutrition.py
-from fastapi import APIRouter, HTTPException
-import pandas as pd
-import os
+from fastapi import APIRouter, HTTPException, Query
+from app.services.nutrition_index import get_shared_index
 
 router = APIRouter()
 
-@router.get("/nutrition/foods")
-async def get_all_foods():
-    """모든 음식 영양 정보 조회"""
+def _index():
     try:
-        df = pd.read_csv('nutrition_data.csv')
-        return {"foods": df.to_dict('records')}
-    except Exception as e:
+        return get_shared_index()
+    except (OSError, ValueError) as e:
         raise HTTPException(500, f"영양 정보 로드 실패: {str(e)}")
 
+@router.get("/nutrition/foods")
+async def get_all_foods(offset: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
+    """음식 영양 정보 목록 조회 (페이지 단위)"""
+    index = _index()
+    rows = range(offset, min(offset + limit, len(index)))
+    return {"total": len(index), "foods": [index.record(row) for row in rows]}
+
 @router.get("/nutrition/food/{food_name}")
 async def get_food_nutrition(food_name: str):
-    """특정 음식 영양 정보 조회"""
-    try:
-        df = pd.read_csv('nutrition_data.csv')
-        food_data = df[df['음식명'] == food_name]
-        
-        if food_data.empty:
-            raise HTTPException(404, f"음식을 찾을 수 없음: {food_name}")
-        
-        return food_data.iloc[0].to_dict()
-    except Exception as e:
-        raise HTTPException(500, f"영양 정보 조회 실패: {str(e)}")
\ No newline at end of file
+    """특정 음식 영양 정보 조회 (완전 일치)"""
+    index = _index()
+    row = index.exact(food_name)
+    if row is None:
+        raise HTTPException(404, f"음식을 찾을 수 없음: {food_name}")
+    return index.record(row)
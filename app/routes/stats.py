@@ -1,10 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
-from app.firebase_config import get_firestore_db
-from app.config import settings
-from firebase_admin import firestore
+from app.dependencies import get_current_user_id
+from app.services import firestore_repository as repo
+from app.services import rollups, stats_engine
+from app.services.metrics import LatencyStats, PhaseTimer
 import calendar
 
 router = APIRouter()
@@ -42,28 +43,6 @@ class OverviewStats(BaseModel):
     blood_sugar_summary: BloodSugarStats
     combined_insights: List[str]
 
-async def get_current_user_id(authorization: str = Header(None)) -> str:
-    """현재 로그인한 사용자 ID 가져오기"""
-    print(f"DEBUG: Authorization 헤더: {authorization}")
-    
-    if not authorization or not authorization.startswith("Bearer "):
-        print(f"DEBUG: 토큰 형식 오류: {authorization}")
-        raise HTTPException(status_code=401, detail="토큰이 필요합니다")
-    
-    try:
-        # 실제 Firebase 토큰 검증
-        from app.services.firebase_auth_service import verify_user_token
-        token = authorization.split(" ")[1]
-        print(f"DEBUG: 토큰 검증 시도: {token[:50]}...")
-        decoded_token = await verify_user_token(token)
-        # kakao_id를 우선 user_id로 사용, 없으면 uid 사용
-        user_id = decoded_token.get("kakao_id") or decoded_token.get("uid")
-        print(f"DEBUG: 사용자 ID: {user_id}")
-        return user_id
-    except Exception as e:
-        print(f"DEBUG: 토큰 검증 실패: {str(e)}")
-        raise HTTPException(status_code=401, detail=f"토큰 검증 실패: {str(e)}")
-
 def get_date_range(period: str, start_date: Optional[str] = None) -> tuple:
     """기간에 따른 시작/종료 날짜 계산"""
     if start_date:
@@ -86,61 +65,18 @@ def get_date_range(period: str, start_date: Optional[str] = None) -> tuple:
     
     return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
 
-@router.get("/nutrition", response_model=NutritionStats)
-async def get_nutrition_stats(
-    period: str = Query(..., description="기간: weekly, monthly, daily"),
-    start_date: Optional[str] = Query(None, description="시작 날짜 (YYYY-MM-DD)"),
-    user_id: str = Depends(get_current_user_id)
-):
-    """주간/월간 탄단지 비율, 평균 칼로리"""
-    if period not in ["weekly", "monthly", "daily"]:
-        raise HTTPException(status_code=400, detail="기간은 weekly, monthly, daily 중 하나여야 합니다")
-    
-    start_date_str, end_date_str = get_date_range(period, start_date)
-    
-    if settings.DEV_MODE:
-        # 더미 데이터 반환
-        daily_averages = []
-        current_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-        end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-        
-        while current_date <= end_date:
-            daily_averages.append({
-                "date": current_date.strftime("%Y-%m-%d"),
-                "calories": 1800.0,
-                "carbs": 225.0,
-                "protein": 90.0,
-                "fat": 60.0
-            })
-            current_date += timedelta(days=1)
-        
-        return NutritionStats(
-            period=period,
-            start_date=start_date_str,
-            end_date=end_date_str,
-            total_meals=21 if period == "weekly" else 90 if period == "monthly" else 3,
-            average_calories=1800.0,
-            average_carbs=225.0,
-            average_protein=90.0,
-            average_fat=60.0,
-            carb_ratio=60.0,
-            protein_ratio=20.0,
-            fat_ratio=20.0,
-            daily_averages=daily_averages
-        )
-    
-    # Firebase에서 실제 데이터 조회
-    db = get_firestore_db()
-    meals_docs = db.collection("meals").where("user_id", "==", user_id).stream()
-    
-    meals_data = []
-    for doc in meals_docs:
-        data = doc.to_dict()
-        meal_date = data.get("date")
-        if start_date_str <= meal_date <= end_date_str:
-            meals_data.append(data)
+PERIODS = ["daily", "weekly", "monthly"]
+
+def _validate_period(period: str) -> None:
+    if period not in PERIODS:
+        raise HTTPException(status_code=400, detail="기간은 daily, weekly, monthly 중 하나여야 합니다")
+
+def summarize_nutrition(period: str, start_date_str: str, end_date_str: str, daily_rollups: List[Dict[str, Any]]) -> NutritionStats:
+    """일간 집계 문서(meals 필드)로 영양 통계 계산 (stats_engine 열 단위 집계)"""
+    summary = stats_engine.nutrition_summary(stats_engine.MealColumns.from_rollups(daily_rollups))
+    total_meals = summary["count"]
     
-    if not meals_data:
+    if not total_meals:
         return NutritionStats(
             period=period,
             start_date=start_date_str,
@@ -157,52 +93,26 @@ async def get_nutrition_stats(
         )
     
     # 통계 계산
-    total_calories = sum(m.get("analysis", {}).get("calories", 0) for m in meals_data)
-    total_carbs = sum(m.get("analysis", {}).get("carbs", 0) for m in meals_data)
-    total_protein = sum(m.get("analysis", {}).get("protein", 0) for m in meals_data)
-    total_fat = sum(m.get("analysis", {}).get("fat", 0) for m in meals_data)
-    
-    total_meals = len(meals_data)
-    average_calories = total_calories / total_meals
-    average_carbs = total_carbs / total_meals
-    average_protein = total_protein / total_meals
-    average_fat = total_fat / total_meals
+    totals = summary["totals"]
+    average_calories = totals["calories"] / total_meals
+    average_carbs = totals["carbs"] / total_meals
+    average_protein = totals["protein"] / total_meals
+    average_fat = totals["fat"] / total_meals
     
     # 비율 계산
-    total_macros = total_carbs + total_protein + total_fat
+    total_macros = totals["carbs"] + totals["protein"] + totals["fat"]
     if total_macros > 0:
-        carb_ratio = (total_carbs / total_macros) * 100
-        protein_ratio = (total_protein / total_macros) * 100
-        fat_ratio = (total_fat / total_macros) * 100
+        carb_ratio = (totals["carbs"] / total_macros) * 100
+        protein_ratio = (totals["protein"] / total_macros) * 100
+        fat_ratio = (totals["fat"] / total_macros) * 100
     else:
         carb_ratio = protein_ratio = fat_ratio = 0.0
     
-    # 일별 평균 계산
-    daily_totals = {}
-    for meal in meals_data:
-        date = meal.get("date")
-        if date not in daily_totals:
-            daily_totals[date] = {"calories": 0, "carbs": 0, "protein": 0, "fat": 0, "count": 0}
-        
-        analysis = meal.get("analysis", {})
-        daily_totals[date]["calories"] += analysis.get("calories", 0)
-        daily_totals[date]["carbs"] += analysis.get("carbs", 0)
-        daily_totals[date]["protein"] += analysis.get("protein", 0)
-        daily_totals[date]["fat"] += analysis.get("fat", 0)
-        daily_totals[date]["count"] += 1
-    
-    daily_averages = []
-    for date, totals in daily_totals.items():
-        count = totals["count"]
-        daily_averages.append({
-            "date": date,
-            "calories": totals["calories"] / count,
-            "carbs": totals["carbs"] / count,
-            "protein": totals["protein"] / count,
-            "fat": totals["fat"] / count
-        })
-    
-    daily_averages.sort(key=lambda x: x["date"])
+    # 일별 평균 (날짜순)
+    daily_averages = [
+        {"date": day["date"], **{nutrient: day[nutrient] / day["count"] for nutrient in rollups.NUTRIENTS}}
+        for day in summary["daily"]
+    ]
     
     return NutritionStats(
         period=period,
@@ -219,67 +129,12 @@ async def get_nutrition_stats(
         daily_averages=daily_averages
     )
 
-@router.get("/blood-sugar", response_model=BloodSugarStats)
-async def get_blood_sugar_stats(
-    period: str = Query(..., description="기간: weekly, monthly, daily"),
-    start_date: Optional[str] = Query(None, description="시작 날짜 (YYYY-MM-DD)"),
-    user_id: str = Depends(get_current_user_id)
-):
-    """공복/식전 혈당 통계, 시간대별 평균"""
-    if period not in ["weekly", "monthly", "daily"]:
-        raise HTTPException(status_code=400, detail="기간은 weekly, monthly, daily 중 하나여야 합니다")
+def summarize_blood_sugar(period: str, start_date_str: str, end_date_str: str, daily_rollups: List[Dict[str, Any]]) -> BloodSugarStats:
+    """일간 집계 문서(blood_sugar 필드)로 혈당 통계 계산"""
+    days = [(r["date"], r.get("blood_sugar") or {}) for r in daily_rollups]
+    days = [(date, bs) for date, bs in days if bs.get("count", 0) > 0]
     
-    start_date_str, end_date_str = get_date_range(period, start_date)
-    
-    if settings.DEV_MODE:
-        # 더미 데이터 반환
-        daily_trends = []
-        current_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-        end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-        
-        while current_date <= end_date:
-            daily_trends.append({
-                "date": current_date.strftime("%Y-%m-%d"),
-                "average": 120.0,
-                "count": 3
-            })
-            current_date += timedelta(days=1)
-        
-        return BloodSugarStats(
-            period=period,
-            start_date=start_date_str,
-            end_date=end_date_str,
-            total_records=21 if period == "weekly" else 90 if period == "monthly" else 3,
-            average_fasting=110.0,
-            average_before_meal=125.0,
-            time_period_averages={
-                "06:00-09:00": 105.0,
-                "09:00-12:00": 120.0,
-                "12:00-15:00": 130.0,
-                "15:00-18:00": 125.0,
-                "18:00-21:00": 135.0,
-                "21:00-24:00": 115.0
-            },
-            meal_type_averages={
-                "기상직후": 105.0,
-                "아침": 125.0,
-                "점심": 130.0,
-                "저녁": 135.0
-            },
-            daily_trends=daily_trends
-        )
-    
-    # Firebase에서 실제 데이터 조회
-    db = get_firestore_db()
-    blood_sugar_docs = db.collection("blood_sugar").where("user_id", "==", user_id).stream()
-    
-    blood_sugar_data = []
-    for doc in blood_sugar_docs:
-        data = doc.to_dict()
-        if start_date_str <= data.get("date") <= end_date_str:
-            blood_sugar_data.append(data)
-    
-    if not blood_sugar_data:
+    if not days:
         return BloodSugarStats(
             period=period,
             start_date=start_date_str,
@@ -293,78 +148,45 @@ async def get_blood_sugar_stats(
         )
     
     # 통계 계산
-    total_records = len(blood_sugar_data)
-    
-    # 공복/식전 혈당 구분 (간단한 로직)
-    fasting_data = [d for d in blood_sugar_data if d.get("meal_type") == "기상직후"]
-    before_meal_data = [d for d in blood_sugar_data if d.get("meal_type") in ["아침", "점심", "저녁"]]
+    total_records = sum(bs["count"] for _, bs in days)
     
-    average_fasting = sum(d.get("blood_sugar", 0) for d in fasting_data) / len(fasting_data) if fasting_data else 0
-    average_before_meal = sum(d.get("blood_sugar", 0) for d in before_meal_data) / len(before_meal_data) if before_meal_data else 0
+    # 시간대별/식사 타입별 합계와 개수 누적
+    time_period_totals: Dict[str, Dict[str, float]] = {}
+    meal_type_totals: Dict[str, Dict[str, float]] = {}
+    for _, bs in days:
+        rollups.merge_delta(time_period_totals, bs.get("time_periods") or {})
+        rollups.merge_delta(meal_type_totals, bs.get("meal_types") or {})
     
-    # 시간대별 평균
-    time_periods = {
-        "06:00-09:00": [],
-        "09:00-12:00": [],
-        "12:00-15:00": [],
-        "15:00-18:00": [],
-        "18:00-21:00": [],
-        "21:00-24:00": []
-    }
+    def bucket_average(buckets: Dict[str, Dict[str, float]], keys: List[str]) -> float:
+        count = sum(buckets.get(k, {}).get("count", 0) for k in keys)
+        total = sum(buckets.get(k, {}).get("sum", 0) for k in keys)
+        return total / count if count else 0
     
-    for data in blood_sugar_data:
-        time_str = data.get("time", "00:00")
-        hour = int(time_str.split(":")[0])
-        
-        if 6 <= hour < 9:
-            time_periods["06:00-09:00"].append(data.get("blood_sugar", 0))
-        elif 9 <= hour < 12:
-            time_periods["09:00-12:00"].append(data.get("blood_sugar", 0))
-        elif 12 <= hour < 15:
-            time_periods["12:00-15:00"].append(data.get("blood_sugar", 0))
-        elif 15 <= hour < 18:
-            time_periods["15:00-18:00"].append(data.get("blood_sugar", 0))
-        elif 18 <= hour < 21:
-            time_periods["18:00-21:00"].append(data.get("blood_sugar", 0))
-        else:
-            time_periods["21:00-24:00"].append(data.get("blood_sugar", 0))
+    # 공복/식전 혈당 구분 (간단한 로직)
+    average_fasting = bucket_average(meal_type_totals, ["기상직후"])
+    average_before_meal = bucket_average(meal_type_totals, ["아침", "점심", "저녁"])
     
+    # 시간대별 평균
     time_period_averages = {}
-    for period, values in time_periods.items():
-        if values:
-            time_period_averages[period] = round(sum(values) / len(values), 1)
+    for _, _, label in rollups.TIME_PERIODS:
+        if time_period_totals.get(label, {}).get("count", 0) > 0:
+            time_period_averages[label] = round(bucket_average(time_period_totals, [label]), 1)
     
     # 식사 타입별 평균
-    meal_type_totals = {"기상직후": [], "아침": [], "점심": [], "저녁": []}
-    for data in blood_sugar_data:
-        meal_type = data.get("meal_type")
-        if meal_type in meal_type_totals:
-            meal_type_totals[meal_type].append(data.get("blood_sugar", 0))
-    
     meal_type_averages = {}
-    for meal_type, values in meal_type_totals.items():
-        if values:
-            meal_type_averages[meal_type] = round(sum(values) / len(values), 1)
-    
-    # 일별 트렌드
-    daily_totals = {}
-    for data in blood_sugar_data:
-        date = data.get("date")
-        if date not in daily_totals:
-            daily_totals[date] = {"total": 0, "count": 0}
-        daily_totals[date]["total"] += data.get("blood_sugar", 0)
-        daily_totals[date]["count"] += 1
+    for meal_type in rollups.MEAL_TYPES:
+        if meal_type_totals.get(meal_type, {}).get("count", 0) > 0:
+            meal_type_averages[meal_type] = round(bucket_average(meal_type_totals, [meal_type]), 1)
     
+    # 일별 트렌드 (집계 문서가 날짜순으로 반환됨)
     daily_trends = []
-    for date, totals in daily_totals.items():
+    for date, bs in days:
         daily_trends.append({
             "date": date,
-            "average": round(totals["total"] / totals["count"], 1),
-            "count": totals["count"]
+            "average": round(bs.get("sum", 0) / bs["count"], 1),
+            "count": bs["count"]
         })
     
-    daily_trends.sort(key=lambda x: x["date"])
-    
     return BloodSugarStats(
         period=period,
         start_date=start_date_str,
@@ -377,53 +199,105 @@ async def get_blood_sugar_stats(
         daily_trends=daily_trends
     )
 
-@router.get("/overview", response_model=OverviewStats)
-async def get_overview_stats(
-    period: str = Query(..., description="기간: daily, weekly, monthly"),
-    start_date: Optional[str] = Query(None, description="시작 날짜 (YYYY-MM-DD)"),
-    user_id: str = Depends(get_current_user_id)
-):
-    """식단 + 혈당 종합 통계 요약"""
-    if period not in ["daily", "weekly", "monthly"]:
-        raise HTTPException(status_code=400, detail="기간은 daily, weekly, monthly 중 하나여야 합니다")
-    
-    # 영양 통계와 혈당 통계 조회
-    nutrition_stats = await get_nutrition_stats(period, start_date, user_id)
-    blood_sugar_stats = await get_blood_sugar_stats(period, start_date, user_id)
-    
-    # 종합 인사이트 생성
+def build_insights(nutrition: NutritionStats, blood_sugar: BloodSugarStats) -> List[str]:
+    """영양/혈당 통계로 종합 인사이트 생성"""
     combined_insights = []
     
     # 영양 관련 인사이트
-    if nutrition_stats.average_calories > 0:
-        if nutrition_stats.average_calories > 2000:
+    if nutrition.average_calories > 0:
+        if nutrition.average_calories > 2000:
             combined_insights.append("평균 칼로리 섭취가 높습니다. 식사량 조절을 고려해보세요.")
-        elif nutrition_stats.average_calories < 1200:
+        elif nutrition.average_calories < 1200:
             combined_insights.append("평균 칼로리 섭취가 낮습니다. 균형잡힌 식사를 권장합니다.")
         
-        if nutrition_stats.carb_ratio > 70:
+        if nutrition.carb_ratio > 70:
             combined_insights.append("탄수화물 비율이 높습니다. 단백질과 지방 섭취를 늘려보세요.")
-        elif nutrition_stats.protein_ratio < 15:
+        elif nutrition.protein_ratio < 15:
             combined_insights.append("단백질 섭취가 부족합니다. 단백질이 풍부한 식품을 추가해보세요.")
     
     # 혈당 관련 인사이트
-    if blood_sugar_stats.average_fasting > 0:
-        if blood_sugar_stats.average_fasting > 126:
+    if blood_sugar.average_fasting > 0:
+        if blood_sugar.average_fasting > 126:
             combined_insights.append("공복 혈당이 높습니다. 의료진과 상담을 권장합니다.")
-        elif blood_sugar_stats.average_fasting < 70:
+        elif blood_sugar.average_fasting < 70:
             combined_insights.append("공복 혈당이 낮습니다. 식사 간격을 조절해보세요.")
         
-        if blood_sugar_stats.average_before_meal > 140:
+        if blood_sugar.average_before_meal > 140:
             combined_insights.append("식전 혈당이 높습니다. 식사량과 탄수화물 섭취를 조절해보세요.")
     
     # 종합 권장사항
     if not combined_insights:
         combined_insights.append("현재 식단과 혈당 관리가 양호합니다. 꾸준히 유지해보세요.")
     
+    return combined_insights
+
+# 단계별 소요 시간 누적 (/metrics 에 노출)
+overview_phase_stats: Dict[str, LatencyStats] = {}
+
+@router.get("/nutrition", response_model=NutritionStats)
+async def get_nutrition_stats(
+    period: str = Query(..., description="기간: weekly, monthly, daily"),
+    start_date: Optional[str] = Query(None, description="시작 날짜 (YYYY-MM-DD)"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """주간/월간 탄단지 비율, 평균 칼로리"""
+    _validate_period(period)
+    start_date_str, end_date_str = get_date_range(period, start_date)
+    
+    # 기간 내 일간 집계 문서(최대 31개)만 조회
+    daily_rollups = await repo.get_daily_rollups(user_id, start_date_str, end_date_str, fields=["meals"])
+    return summarize_nutrition(period, start_date_str, end_date_str, daily_rollups)
+
+@router.get("/blood-sugar", response_model=BloodSugarStats)
+async def get_blood_sugar_stats(
+    period: str = Query(..., description="기간: weekly, monthly, daily"),
+    start_date: Optional[str] = Query(None, description="시작 날짜 (YYYY-MM-DD)"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """공복/식전 혈당 통계, 시간대별 평균"""
+    _validate_period(period)
+    start_date_str, end_date_str = get_date_range(period, start_date)
+    
+    # 기간 내 일간 집계 문서(최대 31개)만 조회
+    daily_rollups = await repo.get_daily_rollups(user_id, start_date_str, end_date_str, fields=["blood_sugar"])
+    return summarize_blood_sugar(period, start_date_str, end_date_str, daily_rollups)
+
+@router.get("/overview", response_model=OverviewStats)
+async def get_overview_stats(
+    response: Response,
+    period: str = Query(..., description="기간: daily, weekly, monthly"),
+    start_date: Optional[str] = Query(None, description="시작 날짜 (YYYY-MM-DD)"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """식단 + 혈당 종합 통계 요약
+
+    식단/혈당 집계는 같은 일간 문서에 있으므로 기간을 한 번만 조회해 두 요약을 함께 계산합니다.
+    단계별 소요 시간은 Server-Timing 응답 헤더와 /metrics 로 확인할 수 있습니다.
+    """
+    _validate_period(period)
+    start_date_str, end_date_str = get_date_range(period, start_date)
+    timer = PhaseTimer(overview_phase_stats)
+    
+    with timer.phase("fetch"):
+        daily_rollups = await repo.get_daily_rollups(
+            user_id, start_date_str, end_date_str, fields=["meals", "blood_sugar"]
+        )
+    
+    with timer.phase("nutrition"):
+        nutrition_stats = summarize_nutrition(period, start_date_str, end_date_str, daily_rollups)
+    
+    with timer.phase("blood_sugar"):
+        blood_sugar_stats = summarize_blood_sugar(period, start_date_str, end_date_str, daily_rollups)
+    
+    with timer.phase("insights"):
+        combined_insights = build_insights(nutrition_stats, blood_sugar_stats)
+    
+    response.headers["Server-Timing"] = timer.server_timing()
+    
     return OverviewStats(
         period=period,
-        start_date=nutrition_stats.start_date,
-        end_date=nutrition_stats.end_date,
+        start_date=start_date_str,
+        end_date=end_date_str,
         nutrition_summary=nutrition_stats,
         blood_sugar_summary=blood_sugar_stats,
         combined_insights=combined_insights
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
-from datetime import datetime
-from app.firebase_config import get_firestore_db
-from app.config import settings
-import firebase_admin
+from datetime import datetime, timedelta
+from app.dependencies import get_current_user_id
+from app.services import firestore_repository as repo
+from app.services import stats_engine
+from app.services.firebase_auth_service import invalidate_user
 from firebase_admin import firestore
 
 router = APIRouter()
@@ -60,34 +61,10 @@ class NutritionCalculationRequest(BaseModel):
     protein_ratio: float # 단백질 비율 (%)
     fat_ratio: float    # 지방 비율 (%)
 
-async def get_current_user_id(authorization: str = Header(None)):
-    """현재 로그인한 사용자 ID 가져오기"""
-    # 개발자 모드에서는 토큰 없이도 허용
-    if settings.DEV_MODE:
-        return "dev_user_123"
-    
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="토큰이 필요합니다")
-    
-    try:
-        # 실제 Firebase 토큰 검증
-        from app.services.firebase_auth_service import verify_user_token
-        token = authorization.split(" ")[1]
-        decoded_token = await verify_user_token(token)
-        return decoded_token.get("uid")
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=f"토큰 검증 실패: {str(e)}")
-
 async def get_user_by_kakao_id(kakao_id: str):
     """kakao_id로 사용자 정보 조회"""
     try:
-        db = get_firestore_db()
-        user_doc = db.collection('users').document(kakao_id).get()
-        
-        if not user_doc.exists:
-            return None
-        
-        return user_doc.to_dict()
+        return await repo.get_user(kakao_id)
     except Exception:
         return None
 
@@ -95,33 +72,12 @@ async def get_user_by_kakao_id(kakao_id: str):
 async def get_user_profile(user_id: str = Depends(get_current_user_id)):
     """사용자 프로필 조회"""
     try:
-        # 개발자 모드에서는 더미 데이터 반환
-        if settings.DEV_MODE:
-            return UserProfile(
-                user_id=user_id,
-                email="dev@example.com",
-                nickname="개발자",
-                profile_image="https://example.com/profile.jpg",
-                gender="남자",
-                height=175.0,
-                weight=70.0,
-                activity_level="보통활동",
-                carb_ratio=50.0,
-                protein_ratio=25.0,
-                fat_ratio=25.0,
-                created_at="2024-01-01T00:00:00",
-                updated_at="2024-01-15T12:00:00"
-            )
-        
         # Firebase에서 사용자 정보 조회
-        db = get_firestore_db()
-        user_doc = db.collection('users').document(user_id).get()
+        user_data = await repo.get_user(user_id)
         
-        if not user_doc.exists:
+        if user_data is None:
             raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
         
-        user_data = user_doc.to_dict()
-        
         return UserProfile(
             user_id=user_id,
             email=user_data.get('email'),
@@ -163,35 +119,12 @@ async def update_user_profile(
             if abs(total_ratio - 100.0) > 0.1:  # 0.1% 오차 허용
                 raise HTTPException(status_code=400, detail="탄단지 비율의 총합은 100%여야 합니다")
         
-        # 개발자 모드에서는 더미 데이터 반환
-        if settings.DEV_MODE:
-            return UserProfile(
-                user_id=user_id,
-                email="dev@example.com",
-                nickname=profile_data.nickname or "개발자",
-                profile_image="https://example.com/profile.jpg",
-                gender=profile_data.gender or "남자",
-                height=profile_data.height or 175.0,
-                weight=profile_data.weight or 70.0,
-                activity_level=profile_data.activity_level or "보통활동",
-                carb_ratio=profile_data.carb_ratio or 50.0,
-                protein_ratio=profile_data.protein_ratio or 25.0,
-                fat_ratio=profile_data.fat_ratio or 25.0,
-                created_at="2024-01-01T00:00:00",
-                updated_at=datetime.now().isoformat()
-            )
-        
         # Firebase에서 사용자 정보 업데이트
-        db = get_firestore_db()
-        user_ref = db.collection('users').document(user_id)
-        
         # 기존 데이터 조회
-        user_doc = user_ref.get()
-        if not user_doc.exists:
+        existing_data = await repo.get_user(user_id)
+        if existing_data is None:
             raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
         
-        existing_data = user_doc.to_dict()
-        
         # 업데이트할 데이터 준비
         update_data = {}
         if profile_data.nickname is not None:
@@ -213,12 +146,9 @@ async def update_user_profile(
         
         update_data['updated_at'] = firestore.SERVER_TIMESTAMP
         
-        # 데이터 업데이트
-        user_ref.update(update_data)
-        
-        # 업데이트된 데이터 조회
-        updated_doc = user_ref.get()
-        updated_data = updated_doc.to_dict()
+        # 데이터 업데이트 후 업데이트된 데이터 조회
+        updated_data = await repo.update_user(user_id, update_data)
+        invalidate_user(user_id)
         
         return UserProfile(
             user_id=user_id,
@@ -340,14 +270,11 @@ async def calculate_nutrition_from_profile(user_id: str = Depends(get_current_us
     """사용자 프로필 정보로 영양 요구량 계산"""
     try:
         # 사용자 프로필 정보 조회
-        db = get_firestore_db()
-        user_doc = db.collection('users').document(user_id).get()
+        user_data = await repo.get_user(user_id)
         
-        if not user_doc.exists:
+        if user_data is None:
             raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
         
-        user_data = user_doc.to_dict()
-        
         # 필수 정보 확인
         required_fields = ['height', 'gender', 'activity_level', 'carb_ratio', 'protein_ratio', 'fat_ratio']
         missing_fields = [field for field in required_fields if not user_data.get(field)]
@@ -379,62 +306,12 @@ async def calculate_nutrition_from_profile(user_id: str = Depends(get_current_us
 async def get_user_dashboard(user_id: str = Depends(get_current_user_id)):
     """사용자 대시보드 데이터 조회"""
     try:
-        # 개발자 모드에서는 더미 데이터 반환
-        if settings.DEV_MODE:
-            return UserDashboard(
-                user_profile=UserProfile(
-                    user_id=user_id,
-                    email="dev@example.com",
-                    nickname="개발자",
-                    profile_image="https://example.com/profile.jpg",
-                    gender="남자",
-                    height=175.0,
-                    weight=70.0,
-                    activity_level="보통활동",
-                    carb_ratio=50.0,
-                    protein_ratio=25.0,
-                    fat_ratio=25.0,
-                    created_at="2024-01-01T00:00:00",
-                    updated_at="2024-01-15T12:00:00"
-                ),
-                blood_sugar_summary=BloodSugarSummary(
-                    total_records=15,
-                    average_blood_sugar=118.5,
-                    meal_type_counts={
-                        "기상직후": 3,
-                        "아침": 5,
-                        "점심": 4,
-                        "저녁": 3
-                    },
-                    recent_records=[
-                        {
-                            "id": "dev_1",
-                            "blood_sugar": 120,
-                            "meal_type": "아침",
-                            "date": "2024-01-15",
-                            "time": "08:30"
-                        },
-                        {
-                            "id": "dev_2",
-                            "blood_sugar": 95,
-                            "meal_type": "점심",
-                            "date": "2024-01-15",
-                            "time": "12:30"
-                        }
-                    ]
-                ),
-                total_days=7
-            )
-        
         # Firebase에서 데이터 조회
-        db = get_firestore_db()
-        
         # 사용자 정보 조회
-        user_doc = db.collection('users').document(user_id).get()
-        if not user_doc.exists:
+        user_data = await repo.get_user(user_id)
+        if user_data is None:
             raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
         
-        user_data = user_doc.to_dict()
         user_profile = UserProfile(
             user_id=user_id,
             email=user_data.get('email'),
@@ -451,41 +328,30 @@ async def get_user_dashboard(user_id: str = Depends(get_current_user_id)):
             updated_at=user_data.get('updated_at', '').isoformat() if hasattr(user_data.get('updated_at'), 'isoformat') else str(user_data.get('updated_at', ''))
         )
         
-        # 혈당 데이터 조회
-        blood_sugar_docs = db.collection('blood_sugar').where('user_id', '==', user_id).stream()
-        
-        blood_sugar_records = []
-        meal_type_counts = {"기상직후": 0, "아침": 0, "점심": 0, "저녁": 0}
-        total_blood_sugar = 0
-        
-        for doc in blood_sugar_docs:
-            data = doc.to_dict()
-            blood_sugar_records.append({
-                "id": doc.id,
-                "blood_sugar": data['blood_sugar'],
-                "meal_type": data['meal_type'],
-                "date": data['date'],
-                "time": data['time']
-            })
-            
-            meal_type_counts[data['meal_type']] += 1
-            total_blood_sugar += data['blood_sugar']
+        # 혈당 데이터 조회 (요약에 필요한 필드만)
+        blood_sugar_docs = await repo.list_blood_sugar_for_user(
+            user_id, fields=["blood_sugar", "meal_type", "date", "time"]
+        )
         
-        # 최근 5개 기록만 반환
-        recent_records = sorted(blood_sugar_records, key=lambda x: (x['date'], x['time']), reverse=True)[:5]
+        # 열 단위로 한 번 변환한 뒤 벡터 연산으로 요약
+        cols = stats_engine.ReadingColumns.from_records(blood_sugar_docs)
+        meal_type_stats = stats_engine.meal_type_stats(cols)
         
-        average_blood_sugar = total_blood_sugar / len(blood_sugar_records) if blood_sugar_records else 0
+        # 최근 5개 기록만 반환
+        recent_records = [
+            {key: blood_sugar_docs[i].get(key) for key in ("id", "blood_sugar", "meal_type", "date", "time")}
+            for i in stats_engine.latest_indices(cols, 5)
+        ]
         
         blood_sugar_summary = BloodSugarSummary(
-            total_records=len(blood_sugar_records),
-            average_blood_sugar=round(average_blood_sugar, 1),
-            meal_type_counts=meal_type_counts,
+            total_records=len(cols),
+            average_blood_sugar=round(float(cols.values.mean()), 1) if len(cols) else 0,
+            meal_type_counts={meal_type: stats["count"] for meal_type, stats in meal_type_stats.items()},
             recent_records=recent_records
         )
         
         # 총 기록 일수 계산
-        unique_dates = set(record['date'] for record in blood_sugar_records)
-        total_days = len(unique_dates)
+        total_days = stats_engine.unique_day_count(cols)
         
         return UserDashboard(
             user_profile=user_profile,
@@ -502,43 +368,10 @@ async def get_user_dashboard(user_id: str = Depends(get_current_user_id)):
 async def get_blood_sugar_statistics(user_id: str = Depends(get_current_user_id)):
     """혈당 통계 데이터 조회"""
     try:
-        # 개발자 모드에서는 더미 데이터 반환
-        if settings.DEV_MODE:
-            return {
-                "total_records": 15,
-                "average_blood_sugar": 118.5,
-                "highest_blood_sugar": 150,
-                "lowest_blood_sugar": 85,
-                "meal_type_averages": {
-                    "기상직후": 110.0,
-                    "아침": 125.0,
-                    "점심": 115.0,
-                    "저녁": 120.0
-                },
-                "weekly_trend": [
-                    {"date": "2024-01-09", "average": 120},
-                    {"date": "2024-01-10", "average": 118},
-                    {"date": "2024-01-11", "average": 122},
-                    {"date": "2024-01-12", "average": 115},
-                    {"date": "2024-01-13", "average": 125},
-                    {"date": "2024-01-14", "average": 118},
-                    {"date": "2024-01-15", "average": 120}
-                ]
-            }
-        
-        # Firebase에서 통계 데이터 조회
-        db = get_firestore_db()
-        blood_sugar_docs = db.collection('blood_sugar').where('user_id', '==', user_id).stream()
-        
-        blood_sugar_records = []
-        meal_type_totals = {"기상직후": [], "아침": [], "점심": [], "저녁": []}
+        # Firebase에서 통계 데이터 조회 (수치, 식사 타입, 날짜만)
+        blood_sugar_docs = await repo.list_blood_sugar_for_user(user_id, fields=["blood_sugar", "meal_type", "date"])
         
-        for doc in blood_sugar_docs:
-            data = doc.to_dict()
-            blood_sugar_records.append(data['blood_sugar'])
-            meal_type_totals[data['meal_type']].append(data['blood_sugar'])
-        
-        if not blood_sugar_records:
+        if not blood_sugar_docs:
             return {
                 "total_records": 0,
                 "average_blood_sugar": 0,
@@ -549,22 +382,22 @@ async def get_blood_sugar_statistics(user_id: str = Depends(get_current_user_id)
             }
         
         # 통계 계산
-        total_records = len(blood_sugar_records)
-        average_blood_sugar = sum(blood_sugar_records) / total_records
-        highest_blood_sugar = max(blood_sugar_records)
-        lowest_blood_sugar = min(blood_sugar_records)
+        summary = stats_engine.summarize(stats_engine.ReadingColumns.from_records(blood_sugar_docs))
         
-        meal_type_averages = {}
-        for meal_type, values in meal_type_totals.items():
-            meal_type_averages[meal_type] = sum(values) / len(values) if values else 0
+        # 주간 트렌드: 최근 7일 중 기록이 있는 날의 일평균
+        week_start = (datetime.now() - timedelta(days=6)).strftime("%Y-%m-%d")
+        weekly_trend = [
+            {"date": day["date"], "average": round(day["average"], 1)}
+            for day in summary["daily"] if day["date"] >= week_start
+        ]
         
         return {
-            "total_records": total_records,
-            "average_blood_sugar": round(average_blood_sugar, 1),
-            "highest_blood_sugar": highest_blood_sugar,
-            "lowest_blood_sugar": lowest_blood_sugar,
-            "meal_type_averages": {k: round(v, 1) for k, v in meal_type_averages.items()},
-            "weekly_trend": []  # 주간 트렌드는 복잡하므로 생략
+            "total_records": summary["count"],
+            "average_blood_sugar": round(summary["average"], 1),
+            "highest_blood_sugar": int(summary["max"]),
+            "lowest_blood_sugar": int(summary["min"]),
+            "meal_type_averages": {k: round(v["average"], 1) for k, v in summary["meal_types"].items()},
+            "weekly_trend": weekly_trend
         }
         
     except Exception as e:
@@ -622,12 +455,8 @@ async def update_user_profile_by_kakao_id(
                 raise HTTPException(status_code=400, detail="탄단지 비율의 총합은 100%여야 합니다")
         
         # Firebase에서 사용자 정보 업데이트
-        db = get_firestore_db()
-        user_ref = db.collection('users').document(kakao_id)
-        
         # 기존 데이터 조회
-        user_doc = user_ref.get()
-        if not user_doc.exists:
+        if await repo.get_user(kakao_id) is None:
             raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
         
         # 업데이트할 데이터 준비
@@ -651,12 +480,9 @@ async def update_user_profile_by_kakao_id(
         
         update_data['updated_at'] = firestore.SERVER_TIMESTAMP
         
-        # 데이터 업데이트
-        user_ref.update(update_data)
-        
-        # 업데이트된 데이터 조회
-        updated_doc = user_ref.get()
-        updated_data = updated_doc.to_dict()
+        # 데이터 업데이트 후 업데이트된 데이터 조회
+        updated_data = await repo.update_user(kakao_id, update_data)
+        invalidate_user(kakao_id)
         
         return UserProfile(
             user_id=kakao_id,
@@ -0,0 +1,48 @@
+# app/scripts/backfill_rollups.py
+"""기존 혈당/식단 기록으로 daily_rollups 문서를 다시 만드는 백필 명령
+
+사용법:
+    python -m app.scripts.backfill_rollups              # 전체 사용자
+    python -m app.scripts.backfill_rollups --user 1234  # 특정 사용자만
+
+집계 문서는 누적이 아니라 덮어쓰기로 저장되므로 여러 번 실행해도 결과가 같습니다.
+기록이 하나도 남지 않은 날의 기존 집계 문서는 삭제합니다.
+백필 도중 들어온 쓰기는 덮어써질 수 있으니 트래픽이 적은 시간에 실행하세요.
+"""
+import argparse
+import asyncio
+from typing import Dict, Any, Optional, Tuple
+from app.services import firestore_repository as repo
+from app.services import rollups
+
+# 집계 계산에 필요한 필드만 전송받음
+BLOOD_SUGAR_FIELDS = ["user_id", "date", "time", "blood_sugar", "meal_type"]
+MEAL_FIELDS = ["user_id", "date", "analysis.calories", "analysis.carbs", "analysis.protein", "analysis.fat"]
+
+async def build_rollups(user_id: Optional[str] = None) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """원본 기록을 순회하며 (user_id, date)별 집계 값 계산"""
+    daily: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    async for reading in repo.stream_collection(repo.BLOOD_SUGAR, user_id, fields=BLOOD_SUGAR_FIELDS):
+        if reading.get("user_id") and reading.get("date"):
+            key = (reading["user_id"], reading["date"])
+            rollups.merge_delta(daily.setdefault(key, {}), rollups.blood_sugar_delta(reading))
+    async for meal in repo.stream_collection(repo.MEALS, user_id, fields=MEAL_FIELDS):
+        if meal.get("user_id") and meal.get("date"):
+            key = (meal["user_id"], meal["date"])
+            rollups.merge_delta(daily.setdefault(key, {}), rollups.meal_delta(meal))
+    return daily
+
+async def backfill(user_id: Optional[str] = None) -> Tuple[int, int]:
+    """집계를 다시 계산해 저장 → (저장한 문서 수, 삭제한 문서 수)"""
+    daily = await build_rollups(user_id)
+    return await repo.replace_daily_rollups(daily, user_id)
+
+def main():
+    parser = argparse.ArgumentParser(description="daily_rollups 백필")
+    parser.add_argument("--user", dest="user_id", default=None, help="특정 사용자(kakao_id)만 백필")
+    args = parser.parse_args()
+    written, deleted = asyncio.run(backfill(args.user_id))
+    print(f"daily_rollups 문서 {written}개 저장, {deleted}개 삭제 완료")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# app/scripts/build_nutrition_table.py
+"""영양 CSV 를 mmap 으로 열 수 있는 컬럼형 바이너리 테이블로 컴파일하는 명령
+
+사용법:
+    python -m app.scripts.build_nutrition_table
+    python -m app.scripts.build_nutrition_table app/data/food_nutrition_1.csv app/data/food_nutrition_2.csv
+    python -m app.scripts.build_nutrition_table --out /srv/nutrition_table
+
+출력 디렉터리에는 배열별 .npy 파일과 meta.json 이 생성되며, 서버는 meta.json 이
+CSV 보다 최신이면 CSV 대신 이 테이블을 읽기 전용 mmap 으로 엽니다.
+CSV 를 여러 개 주면 같은 이름은 앞 파일의 행이 우선합니다. CSV 를 고친 뒤에는 다시 실행하세요.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from app.config import settings
+from app.services.nutrition_index import NutritionIndex
+
+def build(csv_paths, out_dir: str) -> NutritionIndex:
+    """임시 디렉터리에 저장한 뒤 교체하므로 실행 중인 서버가 반쯤 쓰인 파일을 열지 않습니다"""
+    index = NutritionIndex.from_csv(*csv_paths)
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".nutrition_table.", dir=parent)
+    os.chmod(staging, 0o755)
+    index.save(staging)
+    # 이미 mmap 으로 열린 기존 파일은 삭제돼도 해당 프로세스에서 계속 유효
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    os.rename(staging, out_dir)
+    return index
+
+def main():
+    parser = argparse.ArgumentParser(description="영양 CSV → 컴파일된 테이블")
+    parser.add_argument("csv", nargs="*", default=[settings.NUTRITION_CSV_PATH], help="영양 CSV (기본: NUTRITION_CSV_PATH)")
+    parser.add_argument("--out", default=settings.NUTRITION_TABLE_PATH, help="출력 디렉터리 (기본: NUTRITION_TABLE_PATH)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = build(args.csv, args.out)
+    size = sum(os.path.getsize(os.path.join(args.out, name)) for name in os.listdir(args.out))
+    print(f"영양 테이블 생성 완료: {len(index)}개 행, {size / 1024:.1f} KiB, "
+          f"{(time.perf_counter() - started) * 1000:.0f} ms → {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# app/services/blob_store.py
+"""업로드 파일(식단 사진 등) 저장소
+
+BlobStore 는 키(예: "meals/1234/ab12.jpg") 단위로 바이트를 저장/조회하는 최소 인터페이스이며,
+기본 구현 LocalBlobStore 는 로컬 디렉터리에 파일로 저장합니다.
+다른 저장소(GCS, S3 등)는 추상 메서드를 모두 구현해 get_blob_store() 에서 바꿔 끼우면 됩니다
+(빠진 메서드가 있으면 첫 업로드가 아니라 생성 시점에 TypeError).
+"""
+import abc
+import asyncio
+import os
+import uuid
+from typing import AsyncIterator, Optional
+from app.config import settings
+
+class BlobTooLarge(ValueError):
+    """max_bytes 를 넘는 업로드"""
+
+class BlobStore(abc.ABC):
+    @abc.abstractmethod
+    async def put_stream(self, key: str, chunks: AsyncIterator[bytes], max_bytes: Optional[int] = None) -> int:
+        """청크를 순서대로 저장하고 전체 바이트 수 반환 (max_bytes 초과 시 BlobTooLarge, 저장 안 됨)"""
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> bytes:
+        """저장된 바이트 (없으면 FileNotFoundError)"""
+
+    @abc.abstractmethod
+    async def delete(self, key: str) -> None:
+        """저장된 바이트 삭제 (없으면 무시)"""
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(os.path.abspath(self.root) + os.sep):
+            raise ValueError(f"잘못된 저장소 키입니다: {key}")
+        return path
+
+    async def put_stream(self, key: str, chunks: AsyncIterator[bytes], max_bytes: Optional[int] = None) -> int:
+        path = self._path(key)
+        # 다 받은 뒤 이름을 바꾸므로 읽는 쪽이 쓰다 만 파일을 보지 않음
+        partial = f"{path}.{uuid.uuid4().hex}.part"
+        await asyncio.to_thread(os.makedirs, os.path.dirname(path), exist_ok=True)
+        f = await asyncio.to_thread(open, partial, "wb")
+        size = 0
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise BlobTooLarge(f"파일이 너무 큽니다 (최대 {max_bytes} bytes)")
+                await asyncio.to_thread(f.write, chunk)
+            await asyncio.to_thread(f.close)
+            await asyncio.to_thread(os.replace, partial, path)
+        except BaseException:
+            f.close()
+            await asyncio.to_thread(_remove, partial)
+            raise
+        return size
+
+    async def get(self, key: str) -> bytes:
+        def read() -> bytes:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        return await asyncio.to_thread(read)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(_remove, self._path(key))
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+async def iter_upload(upload, chunk_size: int = 1 << 20) -> AsyncIterator[bytes]:
+    """UploadFile 을 chunk_size 단위로 읽기 (전체를 메모리에 올리지 않음)"""
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+_store: Optional[BlobStore] = None
+
+def get_blob_store() -> BlobStore:
+    global _store
+    if _store is None:
+        _store = LocalBlobStore(settings.BLOB_STORE_PATH)
+    return _store
@@ -0,0 +1,151 @@
+# app/services/bulk_ingest.py
+"""혈당 기록 일괄 등록용 본문 파싱과 배열 단위 검증
+
+요청 본문(JSON 배열, {"readings": [...]} 또는 NDJSON)을 항목 목록으로 바꾼 뒤,
+필드를 열 배열로 모아 혈당 범위/식사 타입/날짜/시간 형식을 한 번에 검사합니다.
+POST/PUT /blood-sugar/ 도 reading_error() 로 같은 규칙을 사용합니다.
+날짜와 시간은 0을 채운 YYYY-MM-DD, HH:MM 만 허용합니다 ("2024-1-5", "8:30" 은 오류).
+범위/커서 쿼리가 문자열로 비교하므로 식단 등록/조회와 내보내기 기간도 date_error()/time_error() 로
+같은 형식을 요구합니다.
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.services import rollups
+
+MIN_BLOOD_SUGAR, MAX_BLOOD_SUGAR = 0, 1000
+
+DATE_ERROR = "날짜 형식 오류 (YYYY-MM-DD)"
+TIME_ERROR = "시간 형식 오류 (HH:MM)"
+
+# 날짜/시간 문자열에서 숫자여야 하는 위치와 구분자 위치
+_DATE_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9]
+_TIME_DIGITS = [0, 1, 3, 4]
+
+def parse_body(body: bytes, content_type: Optional[str]) -> Tuple[List[Any], Dict[int, str]]:
+    """본문 → (항목 목록, {번호: 파싱 오류})
+
+    NDJSON 은 줄 단위로 파싱하므로 잘못된 줄은 해당 항목만 오류가 됩니다.
+    JSON 본문 전체가 잘못되었으면 ValueError.
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"):
+        items: List[Any] = []
+        errors: Dict[int, str] = {}
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                errors[len(items)] = f"JSON 파싱 오류: {str(e)}"
+                items.append(None)
+        return items, errors
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise ValueError(f"JSON 파싱 오류: {str(e)}")
+    if isinstance(payload, dict):
+        payload = payload.get("readings")
+    if not isinstance(payload, list):
+        raise ValueError('본문은 기록 배열, {"readings": [...]} 또는 NDJSON 이어야 합니다')
+    return payload, {}
+
+def _as_number(value: Any) -> float:
+    """정수로 해석 가능한 값 → float, 아니면 NaN (bool 제외)"""
+    if isinstance(value, bool):
+        return float("nan")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(int(value.strip()))
+        except ValueError:
+            return float("nan")
+    return float("nan")
+
+def _fixed_ascii(values: List[Any], width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """문자열 목록 → (n, width) uint8 행렬과 길이/타입이 맞는지 마스크"""
+    ok = np.fromiter(
+        (isinstance(v, str) and len(v) == width and v.isascii() for v in values), dtype=bool, count=len(values)
+    )
+    raw = np.array([v if ok_i else "0" * width for v, ok_i in zip(values, ok)], dtype=f"S{width}")
+    return raw.view(np.uint8).reshape(-1, width).astype(np.int16) - ord("0"), ok
+
+def _valid_dates(values: List[Any]) -> np.ndarray:
+    chars, ok = _fixed_ascii(values, 10)
+    digits = chars[:, _DATE_DIGITS]
+    ok &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+    ok &= (chars[:, 4] == ord("-") - ord("0")) & (chars[:, 7] == ord("-") - ord("0"))
+    year = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    month = digits[:, 4] * 10 + digits[:, 5]
+    day = digits[:, 6] * 10 + digits[:, 7]
+    ok &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1)
+    # 해당 월의 일수 = 다음 달 1일 - 이번 달 1일
+    months = (np.where(ok, year, 1970).astype(np.int64) - 1970) * 12 + np.where(ok, month, 1) - 1
+    month_start = months.astype("datetime64[M]")
+    days_in_month = ((month_start + 1).astype("datetime64[D]") - month_start.astype("datetime64[D]")).astype(np.int64)
+    return ok & (day <= days_in_month)
+
+def _valid_times(values: List[Any]) -> np.ndarray:
+    chars, ok = _fixed_ascii(values, 5)
+    digits = chars[:, _TIME_DIGITS]
+    ok &= ((digits >= 0) & (digits <= 9)).all(axis=1) & (chars[:, 2] == ord(":") - ord("0"))
+    ok &= (digits[:, 0] * 10 + digits[:, 1] < 24) & (digits[:, 2] < 6)
+    return ok
+
+def validate(items: List[Any], errors: Optional[Dict[int, str]] = None) -> Tuple[List[Dict[str, Any]], Dict[int, str]]:
+    """항목 검증 → (유효한 기록 [{index, blood_sugar, meal_type, date, time}], {번호: 오류})"""
+    errors = dict(errors or {})
+    records = [item if isinstance(item, dict) else {} for item in items]
+    for i, item in enumerate(items):
+        if not isinstance(item, dict) and i not in errors:
+            errors[i] = "각 항목은 객체여야 합니다"
+
+    values = np.fromiter((_as_number(r.get("blood_sugar")) for r in records), dtype=np.float64, count=len(records))
+    meal_types = [r.get("meal_type") for r in records]
+    dates = [r.get("date") for r in records]
+    times = [r.get("time") for r in records]
+
+    with np.errstate(invalid="ignore"):
+        value_ok = np.isfinite(values) & (values == np.round(values))
+        range_ok = value_ok & (values >= MIN_BLOOD_SUGAR) & (values <= MAX_BLOOD_SUGAR)
+    meal_ok = np.fromiter((m in rollups.MEAL_TYPES for m in meal_types), dtype=bool, count=len(records))
+    date_ok = _valid_dates(dates)
+    time_ok = _valid_times(times)
+
+    valid = range_ok & meal_ok & date_ok & time_ok
+    # 오류 메시지는 잘못된 항목에 대해서만 만듦
+    for i in np.flatnonzero(~valid):
+        i = int(i)
+        if i in errors:
+            continue
+        if not value_ok[i]:
+            errors[i] = "혈당 수치는 정수여야 합니다"
+        elif not range_ok[i]:
+            errors[i] = f"혈당 수치는 {MIN_BLOOD_SUGAR}-{MAX_BLOOD_SUGAR} 사이여야 합니다"
+        elif not meal_ok[i]:
+            errors[i] = f"잘못된 식사 타입입니다. 가능한 값: {rollups.MEAL_TYPES}"
+        elif not date_ok[i]:
+            errors[i] = DATE_ERROR
+        else:
+            errors[i] = TIME_ERROR
+
+    readings = [
+        {"index": int(i), "blood_sugar": int(values[i]), "meal_type": meal_types[i], "date": dates[i], "time": times[i]}
+        for i in np.flatnonzero(valid) if int(i) not in errors
+    ]
+    return readings, errors
+
+def reading_error(item: Dict[str, Any]) -> Optional[str]:
+    """기록 한 건 검증 (단건 등록/수정용) → 오류 메시지 또는 None"""
+    _, errors = validate([item])
+    return errors.get(0)
+
+def date_error(value: Any) -> Optional[str]:
+    """0을 채운 YYYY-MM-DD 인지 검증 → 오류 메시지 또는 None"""
+    return None if _valid_dates([value])[0] else DATE_ERROR
+
+def time_error(value: Any) -> Optional[str]:
+    """0을 채운 HH:MM 인지 검증 → 오류 메시지 또는 None"""
+    return None if _valid_times([value])[0] else TIME_ERROR
@@ -0,0 +1,76 @@
+# app/services/export_stream.py
+"""기록 내보내기용 스트리밍 인코더 (CSV / NDJSON, 선택적 gzip)
+
+비동기 기록 이터레이터를 받아 chunk_rows 개 단위로 인코딩한 바이트 청크를 내보내므로
+StreamingResponse 에 바로 넘길 수 있고, 전체 결과를 메모리에 모으지 않습니다.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Sequence
+
+# 엑셀에서 한글이 깨지지 않도록 CSV 앞에 붙이는 UTF-8 BOM
+_BOM = "﻿"
+
+def _value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _flatten(record: Dict[str, Any], columns: Sequence[str]) -> List[Any]:
+    """columns 의 "analysis.calories" 같은 점 경로도 조회"""
+    row = []
+    for column in columns:
+        value: Any = record
+        for part in column.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        row.append(_value(value))
+    return row
+
+def _nest(record: Dict[str, Any], columns: Sequence[str]) -> Dict[str, Any]:
+    """columns 의 점 경로를 중첩 객체로 복원 ("analysis.calories" → {"analysis": {"calories": ...}})"""
+    obj: Dict[str, Any] = {}
+    for column, value in zip(columns, _flatten(record, columns)):
+        *parents, leaf = column.split(".")
+        target = obj
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = value
+    return obj
+
+async def encode_csv(records: AsyncIterator[Dict[str, Any]], columns: Sequence[str], chunk_rows: int = 500) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write(_BOM)
+    writer.writerow(columns)
+    rows = 0
+    async for record in records:
+        writer.writerow(["" if value is None else value for value in _flatten(record, columns)])
+        rows += 1
+        if rows % chunk_rows == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+async def encode_ndjson(records: AsyncIterator[Dict[str, Any]], columns: Sequence[str], chunk_rows: int = 500) -> AsyncIterator[bytes]:
+    """한 줄에 기록 하나 (점 경로 컬럼은 CSV 헤더와 달리 중첩 객체로 출력)"""
+    lines: List[str] = []
+    async for record in records:
+        lines.append(json.dumps(_nest(record, columns), ensure_ascii=False))
+        if len(lines) >= chunk_rows:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """청크를 받는 대로 gzip 압축해 내보냄 (압축기 내부 버퍼만 유지)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -1,7 +1,44 @@
-import httpx
+import asyncio
+import hashlib
+from typing import Dict
 from firebase_admin import firestore
-from app.firebase_config import get_firestore_db, verify_firebase_token
+from app.firebase_config import verify_firebase_token
 from app.config import settings
+from app.services import firestore_repository as repo
+from app.services import http_client
+from app.services.cache import TTLCache
+from app.services.single_flight import SingleFlight
+
+# 검증된 토큰 캐시: sha256(토큰) -> {"claims", "user"}, 토큰의 exp까지 유지
+_identity_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_ENTRIES)
+
+# 카카오 사용자 정보 캐시: sha256(액세스 토큰) -> 카카오 API 응답, 짧게 유지
+_kakao_profile_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.KAKAO_PROFILE_CACHE_TTL)
+
+# 사용자별 캐시 세대: invalidate_user 마다 증가. 조회 중에 무효화된 사용자 정보는 캐시에 넣지 않음
+_user_generations: Dict[str, int] = {}
+
+# 앱 복귀 시 동시에 여러 번 들어오는 같은 로그인 요청을 한 번만 처리
+_login_flights = SingleFlight()
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def invalidate_user(user_id: str) -> int:
+    """프로필 변경 시 해당 사용자의 캐시된 인증 정보 제거"""
+    _user_generations[user_id] = _user_generations.get(user_id, 0) + 1
+    return _identity_cache.discard_where(lambda entry: entry["user"].get("kakao_id") == user_id)
+
+def get_identity_cache_stats() -> dict:
+    """인증 캐시 적중/미스 통계"""
+    return _identity_cache.stats()
+
+def get_kakao_login_stats() -> dict:
+    """카카오 로그인 중복 합치기 / 사용자 정보 캐시 통계"""
+    return {
+        "single_flight": _login_flights.stats(),
+        "profile_cache": _kakao_profile_cache.stats()
+    }
 
 async def exchange_kakao_code_for_token(code: str, redirect_uri: str) -> str:
     """카카오 인증 코드를 액세스 토큰으로 교환"""
@@ -20,8 +57,7 @@ async def exchange_kakao_code_for_token(code: str, redirect_uri: str) -> str:
     print(f"DEBUG: code = {code[:10]}...")
     print(f"DEBUG: redirect_uri = {redirect_uri}")
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(token_url, data=data)
+    response = await http_client.get_client().post(token_url, data=data)
         
     print(f"DEBUG: 응답 상태 코드 = {response.status_code}")
     print(f"DEBUG: 응답 내용 = {response.text}")
@@ -32,17 +68,39 @@ async def exchange_kakao_code_for_token(code: str, redirect_uri: str) -> str:
     token_data = response.json()
     return token_data.get("access_token")
 
+async def kakao_login_from_code(code: str, redirect_uri: str) -> dict:
+    """인증 코드로 카카오 로그인 (같은 코드의 동시 요청은 한 번만 교환, 코드는 1회용)"""
+    async def login() -> dict:
+        access_token = await exchange_kakao_code_for_token(code, redirect_uri)
+        return await kakao_login_with_firebase(access_token)
+    return dict(await _login_flights.do(("code", _token_key(code)), login))
+
 async def kakao_login_with_firebase(access_token: str) -> dict:
-    """카카오 로그인 후 Firebase에 사용자 정보 저장"""
-    # 1. 카카오 API로 사용자 정보 가져오기
+    """카카오 로그인 후 Firebase에 사용자 정보 저장 (같은 토큰의 동시 요청은 한 번만 처리)"""
+    result = await _login_flights.do(("token", _token_key(access_token)), lambda: _kakao_login(access_token))
+    return dict(result)
+
+async def _fetch_kakao_profile(access_token: str) -> dict:
+    """카카오 API로 사용자 정보 조회 (KAKAO_PROFILE_CACHE_TTL 동안 캐시)"""
+    key = _token_key(access_token)
+    cached = _kakao_profile_cache.get(key)
+    if cached is not None:
+        return cached
+    
     headers = {"Authorization": f"Bearer {access_token}"}
-    async with httpx.AsyncClient() as client:
-        res = await client.get(settings.KAKAO_USER_API, headers=headers)
+    res = await http_client.get_client().get(settings.KAKAO_USER_API, headers=headers)
     
     if res.status_code != 200:
         raise Exception("카카오 인증 실패")
     
     kakao_data = res.json()
+    if settings.KAKAO_PROFILE_CACHE_TTL > 0:
+        _kakao_profile_cache.set(key, kakao_data)
+    return kakao_data
+
+async def _kakao_login(access_token: str) -> dict:
+    # 1. 카카오 API로 사용자 정보 가져오기
+    kakao_data = await _fetch_kakao_profile(access_token)
     kakao_id = str(kakao_data["id"])
     
     # 2. 카카오 사용자 정보 추출
@@ -58,33 +116,30 @@ async def kakao_login_with_firebase(access_token: str) -> dict:
         "updated_at": firestore.SERVER_TIMESTAMP
     }
     
-    # 개발 모드에서는 Firebase 없이 사용자 정보만 반환
-    if settings.DEV_MODE:
-        print(f"DEBUG: 개발 모드 - Firebase 없이 사용자 정보 반환")
-        return {
-            "user_id": kakao_id,
-            "email": user_data.get("email"),
-            "nickname": user_data.get("nickname"),
-            "profile_image": user_data.get("profile_image")
-        }
-    
     # 3. Firestore에 사용자 정보 저장/업데이트
-    db = get_firestore_db()
-    user_ref = db.collection('users').document(kakao_id)
-    
     # 기존 사용자 확인
-    user_doc = user_ref.get()
-    if user_doc.exists:
+    existing_user = await repo.get_user(kakao_id)
+    if existing_user is not None:
         # 기존 사용자 업데이트
-        user_ref.update({
+        await repo.update_user(kakao_id, {
             "nickname": user_data["nickname"],
             "profile_image": user_data["profile_image"],
             "updated_at": firestore.SERVER_TIMESTAMP
         })
-        user_data = user_doc.to_dict()
+        user_data = existing_user
     else:
         # 새 사용자 생성
-        user_ref.set(user_data)
+        await repo.set_user(kakao_id, user_data)
+    invalidate_user(kakao_id)
+    
+    # 개발 모드에서는 사용자 정보를 저장소(memory)에만 저장하고 Firebase 토큰 없이 반환
+    if settings.DEV_MODE:
+        return {
+            "user_id": kakao_id,
+            "email": user_data.get("email"),
+            "nickname": user_data.get("nickname"),
+            "profile_image": user_data.get("profile_image")
+        }
     
     # 4. Firebase 커스텀 토큰 자동 생성
     try:
@@ -108,20 +163,28 @@ async def kakao_login_with_firebase(access_token: str) -> dict:
         }
 
 async def verify_user_token(token: str) -> dict:
-    """Firebase ID 토큰으로 사용자 검증"""
+    """Firebase ID 토큰으로 사용자 검증 (검증 결과는 토큰 만료 시각까지 캐시)"""
+    key = _token_key(token)
+    cached = _identity_cache.get(key)
+    if cached is not None:
+        return dict(cached["user"])
+
     try:
-        decoded_token = verify_firebase_token(token)
+        # 공개키가 없으면 firebase_admin 이 HTTPS 로 인증서를 받으므로 이벤트 루프 밖에서 검증
+        decoded_token = await asyncio.to_thread(verify_firebase_token, token)
         user_id = decoded_token.get("uid")
         
-        # Firestore에서 사용자 정보 가져오기
-        db = get_firestore_db()
-        user_doc = db.collection('users').document(user_id).get()
+        # Firestore에서 사용자 정보 가져오기 (조회 전 세대를 기억해 두고 그 사이 무효화됐으면 캐시하지 않음)
+        generation = _user_generations.get(user_id, 0)
+        user_data = await repo.get_user(user_id)
         
-        if user_doc.exists:
-            user_data = user_doc.to_dict()
+        if user_data is not None:
+            user_data.pop("id", None)
             # kakao_id 추가
             user_data["kakao_id"] = user_id
-            return user_data
+            if decoded_token.get("exp") and _user_generations.get(user_id, 0) == generation:
+                _identity_cache.set(key, {"claims": decoded_token, "user": user_data}, expires_at=decoded_token["exp"])
+            return dict(user_data)
         else:
             raise ValueError("사용자를 찾을 수 없습니다")
             
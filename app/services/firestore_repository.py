@@ -0,0 +1,514 @@
+# app/services/firestore_repository.py
+"""Firestore 비동기 데이터 접근 계층
+
+모든 라우터는 Firestore 클라이언트를 직접 다루지 않고 이 모듈의 함수를 await 합니다.
+비동기 Firestore 클라이언트(firebase_admin.firestore_async)를 사용하므로
+Firestore 왕복 시간 동안 이벤트 루프가 다른 요청을 계속 처리할 수 있습니다.
+클라이언트는 storage.get_client() 로 얻으므로 개발 모드에서는 같은 코드가 프로세스 내 저장소를 사용합니다.
+"""
+import asyncio
+import base64
+from typing import Optional, List, Dict, Any, Tuple, Callable
+from firebase_admin import firestore
+from google.api_core.exceptions import FailedPrecondition, NotFound
+from app.services import rollups, storage
+
+USERS = "users"
+BLOOD_SUGAR = "blood_sugar"
+MEALS = "meals"
+DAILY_ROLLUPS = "daily_rollups"
+
+# Firestore WriteBatch 한 번에 담을 수 있는 최대 쓰기 수
+BATCH_LIMIT = 500
+# 기록 수정/삭제가 동시 쓰기와 충돌했을 때 다시 읽고 시도할 최대 횟수
+WRITE_ATTEMPTS = 5
+
+class RecordNotFound(Exception):
+    """수정/삭제할 문서가 없음 (이미 삭제됨)"""
+
+class RecordChanged(Exception):
+    """문서가 호출한 쪽이 기대한 상태가 아님 (check 실패)"""
+
+class WriteConflict(Exception):
+    """동시 쓰기와 WRITE_ATTEMPTS 번 연속 충돌"""
+
+def _db():
+    return storage.get_client()
+
+def _to_dict(doc) -> Optional[Dict[str, Any]]:
+    """스냅샷을 dict로 변환하고 문서 ID를 'id' 키로 포함"""
+    if not doc.exists:
+        return None
+    data = doc.to_dict()
+    data["id"] = doc.id
+    return data
+
+async def _collect(query) -> List[Dict[str, Any]]:
+    return [_to_dict(doc) async for doc in query.stream()]
+
+def _user_query(collection: str, user_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None):
+    """user_id 일치 + 날짜 범위(YYYY-MM-DD, 양끝 포함) 필터를 서버 쿼리로 구성"""
+    query = _db().collection(collection).where("user_id", "==", user_id)
+    if start_date:
+        query = query.where("date", ">=", start_date)
+    if end_date:
+        query = query.where("date", "<=", end_date)
+    return query
+
+def _select(query, fields: Optional[List[str]]):
+    """필요한 필드만 전송받도록 projection 적용 (fields가 None이면 전체 문서)"""
+    return query.select(fields) if fields else query
+
+# ---------------------------------------------------------------------------
+# 커서 기반 페이지네이션
+# ---------------------------------------------------------------------------
+
+def encode_cursor(doc_id: str) -> str:
+    """문서 ID를 클라이언트에 노출할 불투명 커서로 변환"""
+    return base64.urlsafe_b64encode(doc_id.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> str:
+    """불투명 커서를 문서 ID로 변환 (형식이 잘못되면 ValueError)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        doc_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+    except Exception:
+        raise ValueError("잘못된 커서입니다")
+    if not doc_id or "/" in doc_id:
+        raise ValueError("잘못된 커서입니다")
+    return doc_id
+
+async def _page(query, collection: str, user_id: str, limit: int, cursor: Optional[str] = None):
+    """정렬된 쿼리에서 cursor 다음부터 limit개 조회 -> (문서 목록, 다음 커서 또는 None)
+
+    커서 문서의 스냅샷으로 start_after 하므로 페이지 위치와 상관없이 읽는 문서 수는 limit + 2 이하입니다.
+    """
+    if cursor:
+        snapshot = await _db().collection(collection).document(decode_cursor(cursor)).get()
+        if not snapshot.exists or snapshot.get("user_id") != user_id:
+            raise ValueError("잘못된 커서입니다")
+        query = query.start_after(snapshot)
+    docs = [doc async for doc in query.limit(limit + 1).stream()]
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    next_cursor = encode_cursor(docs[-1].id) if has_more else None
+    return [_to_dict(doc) for doc in docs], next_cursor
+
+async def _guarded_write(
+    collection: str,
+    doc_id: str,
+    stage: Callable[[Any, Any, Any, Dict[str, Any]], None],
+    user_id: Optional[str] = None,
+    check: Optional[Callable[[Dict[str, Any]], bool]] = None
+) -> Dict[str, Any]:
+    """문서를 읽고 stage(batch, ref, option, previous) 로 쌓은 쓰기를 커밋 -> 실제로 바꾼 (수정 전) 문서
+
+    option 은 읽은 시점의 update_time 전제 조건이므로, 그 사이 다른 요청이 같은 문서를 수정/삭제했으면
+    배치 전체(일간 집계 증감 포함)가 실패하고 다시 읽어 재시도합니다. 따라서 집계 증감은 항상 실제로
+    덮어쓴 문서 기준이며 동시 수정/중복 삭제로 두 번 빠지지 않습니다.
+
+    문서가 없으면 RecordNotFound, user_id 가 다르면 PermissionError, check(previous) 가 False 면 RecordChanged,
+    계속 충돌하면 WriteConflict.
+    """
+    db = _db()
+    ref = db.collection(collection).document(doc_id)
+    for _ in range(WRITE_ATTEMPTS):
+        snapshot = await ref.get()
+        previous = _to_dict(snapshot)
+        if previous is None:
+            raise RecordNotFound(f"{collection}/{doc_id} 문서가 없습니다")
+        if user_id is not None and previous.get("user_id") != user_id:
+            raise PermissionError("접근 권한이 없습니다")
+        if check is not None and not check(previous):
+            raise RecordChanged(f"{collection}/{doc_id} 문서 상태가 바뀌었습니다")
+        batch = db.batch()
+        stage(batch, ref, db.write_option(last_update_time=snapshot.update_time), previous)
+        try:
+            await batch.commit()
+        except (FailedPrecondition, NotFound):
+            # 읽은 뒤 다른 요청이 먼저 수정/삭제함 -> 다시 읽음
+            continue
+        return previous
+    raise WriteConflict(f"{collection}/{doc_id} 동시 수정이 계속 충돌합니다")
+
+# ---------------------------------------------------------------------------
+# 사용자 (users)
+# ---------------------------------------------------------------------------
+
+async def get_user(user_id: str) -> Optional[Dict[str, Any]]:
+    """users/{user_id} 문서 조회 (없으면 None)"""
+    doc = await _db().collection(USERS).document(user_id).get()
+    return _to_dict(doc)
+
+async def set_user(user_id: str, data: Dict[str, Any]) -> None:
+    """users/{user_id} 문서 생성(덮어쓰기)"""
+    await _db().collection(USERS).document(user_id).set(data)
+
+async def update_user(user_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """users/{user_id} 문서 부분 수정 후 갱신된 문서 반환"""
+    user_ref = _db().collection(USERS).document(user_id)
+    await user_ref.update(data)
+    return _to_dict(await user_ref.get())
+
+async def list_users() -> List[Dict[str, Any]]:
+    """모든 사용자 조회"""
+    return await _collect(_db().collection(USERS))
+
+# ---------------------------------------------------------------------------
+# 혈당 (blood_sugar)
+# ---------------------------------------------------------------------------
+
+async def get_blood_sugar(blood_sugar_id: str) -> Optional[Dict[str, Any]]:
+    """혈당 기록 단건 조회 (없으면 None)"""
+    doc = await _db().collection(BLOOD_SUGAR).document(blood_sugar_id).get()
+    return _to_dict(doc)
+
+def _blood_sugar_query(
+    user_id: str,
+    date: Optional[str] = None,
+    meal_type: Optional[str] = None,
+    newest_first: bool = False,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+):
+    """혈당 조회 쿼리 구성 (필터와 정렬 모두 Firestore에서 처리, 필요한 복합 색인: firestore.indexes.json)"""
+    query = _user_query(BLOOD_SUGAR, user_id, start_date, end_date)
+    if date:
+        query = query.where("date", "==", date)
+    if meal_type:
+        query = query.where("meal_type", "==", meal_type)
+    if newest_first:
+        query = query.order_by("date", direction=firestore.Query.DESCENDING).order_by("time", direction=firestore.Query.DESCENDING)
+    elif start_date or end_date:
+        query = query.order_by("date").order_by("time")
+    return query
+
+async def list_blood_sugar_for_user(
+    user_id: str,
+    date: Optional[str] = None,
+    meal_type: Optional[str] = None,
+    newest_first: bool = False,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    fields: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """사용자의 혈당 기록 조회
+
+    date/meal_type 일치, start_date~end_date 범위 필터와 정렬은 모두 Firestore에서 처리하고
+    fields를 지정하면 해당 필드만 전송받습니다.
+    """
+    query = _blood_sugar_query(user_id, date, meal_type, newest_first, start_date, end_date)
+    return await _collect(_select(query, fields))
+
+async def page_blood_sugar_for_user(
+    user_id: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    date: Optional[str] = None,
+    meal_type: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    newest_first: bool = True
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """혈당 기록 한 페이지 조회 (최신순 date, time 정렬) -> (기록 목록, 다음 페이지 커서)"""
+    query = _blood_sugar_query(user_id, date, meal_type, newest_first, start_date, end_date)
+    if not newest_first and not (start_date or end_date):
+        query = query.order_by("date").order_by("time")
+    return await _page(query, BLOOD_SUGAR, user_id, limit, cursor)
+
+async def add_reading(data: Dict[str, Any]) -> str:
+    """혈당 기록 추가 후 생성된 문서 ID 반환 (일간 집계도 같은 배치로 갱신)"""
+    db = _db()
+    doc_ref = db.collection(BLOOD_SUGAR).document()
+    batch = db.batch()
+    batch.set(doc_ref, data)
+    _stage_rollup(batch, data["user_id"], data["date"], rollups.blood_sugar_delta(data))
+    await batch.commit()
+    return doc_ref.id
+
+def _reading_chunks(readings: List[Dict[str, Any]]) -> List[List[int]]:
+    """기록 번호를 배치 단위로 나눔
+
+    배치마다 사용자가 한 명이고, 쓰기 수(기록 + 날짜별 집계 문서)가 BATCH_LIMIT 을 넘지 않게 합니다.
+    """
+    chunks: List[List[int]] = []
+    open_chunks: Dict[str, Tuple[List[int], set]] = {}
+    for i, reading in enumerate(readings):
+        user_id, date = reading["user_id"], reading["date"]
+        chunk, dates = open_chunks.get(user_id, (None, None))
+        if chunk is None or len(chunk) + len(dates) + 1 + (date not in dates) > BATCH_LIMIT:
+            chunk, dates = [], set()
+            open_chunks[user_id] = (chunk, dates)
+            chunks.append(chunk)
+        chunk.append(i)
+        dates.add(date)
+    return chunks
+
+async def add_readings(readings: List[Dict[str, Any]], concurrency: int = 4) -> List[Any]:
+    """혈당 기록 여러 건 추가 -> 항목별 문서 ID 또는 예외 (입력 순서)
+
+    기록과 해당 날짜들의 일간 집계 증감을 BATCH_LIMIT 쓰기 이하의 배치로 묶어 최대 concurrency 개씩 동시에 커밋합니다.
+    배치 하나가 실패하면 그 배치의 기록만 예외가 되며, 집계도 같은 배치에 있으므로 어긋나지 않습니다.
+    """
+    db = _db()
+    slots = asyncio.Semaphore(max(1, concurrency))
+    results: List[Any] = [None] * len(readings)
+
+    async def commit(chunk: List[int]) -> None:
+        batch = db.batch()
+        deltas: Dict[str, Dict[str, Any]] = {}
+        refs = []
+        for i in chunk:
+            doc_ref = db.collection(BLOOD_SUGAR).document()
+            batch.set(doc_ref, readings[i])
+            refs.append(doc_ref)
+            rollups.add_delta(deltas, readings[i]["date"], rollups.blood_sugar_delta(readings[i]))
+        for date, delta in deltas.items():
+            _stage_rollup(batch, readings[chunk[0]]["user_id"], date, delta)
+        async with slots:
+            try:
+                await batch.commit()
+            except Exception as e:
+                for i in chunk:
+                    results[i] = e
+                return
+        for i, doc_ref in zip(chunk, refs):
+            results[i] = doc_ref.id
+
+    await asyncio.gather(*(commit(chunk) for chunk in _reading_chunks(readings)))
+    return results
+
+def _stage_update(delta_of: Callable[..., Dict[str, Any]], data: Dict[str, Any]):
+    """기록 수정 + 일간 집계에서 이전 값을 빼고 새 값을 더하는 쓰기 (_guarded_write 의 stage)"""
+    def stage(batch, ref, option, previous: Dict[str, Any]) -> None:
+        updated = {**previous, **data}
+        deltas: Dict[str, Dict[str, Any]] = {}
+        rollups.add_delta(deltas, previous["date"], delta_of(previous, sign=-1))
+        rollups.add_delta(deltas, updated["date"], delta_of(updated))
+        batch.update(ref, data, option=option)
+        for date, delta in deltas.items():
+            _stage_rollup(batch, previous["user_id"], date, delta)
+    return stage
+
+def _stage_delete(delta_of: Callable[..., Dict[str, Any]]):
+    """기록 삭제 + 일간 집계에서 값을 빼는 쓰기 (_guarded_write 의 stage)"""
+    def stage(batch, ref, option, previous: Dict[str, Any]) -> None:
+        batch.delete(ref, option=option)
+        _stage_rollup(batch, previous["user_id"], previous["date"], delta_of(previous, sign=-1))
+    return stage
+
+async def update_blood_sugar(blood_sugar_id: str, data: Dict[str, Any], user_id: Optional[str] = None) -> Dict[str, Any]:
+    """혈당 기록 수정 후 수정 전 문서 반환 (일간 집계에서 이전 값을 빼고 새 값을 더함)
+
+    user_id 를 주면 다른 사용자의 기록일 때 PermissionError. 그 밖의 예외는 _guarded_write 참고.
+    """
+    return await _guarded_write(BLOOD_SUGAR, blood_sugar_id, _stage_update(rollups.blood_sugar_delta, data), user_id)
+
+async def delete_blood_sugar(blood_sugar_id: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """혈당 기록 삭제 후 삭제한 문서 반환 (일간 집계에서 값을 뺌, 이미 삭제됐으면 RecordNotFound)"""
+    return await _guarded_write(BLOOD_SUGAR, blood_sugar_id, _stage_delete(rollups.blood_sugar_delta), user_id)
+
+# ---------------------------------------------------------------------------
+# 식단 (meals)
+# ---------------------------------------------------------------------------
+
+async def get_meal(meal_id: str) -> Optional[Dict[str, Any]]:
+    """식단 단건 조회 (없으면 None)"""
+    doc = await _db().collection(MEALS).document(meal_id).get()
+    return _to_dict(doc)
+
+def _meals_query(
+    user_id: str,
+    date: Optional[str] = None,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    newest_first: bool = False,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+):
+    """식단 조회 쿼리 구성 -> (쿼리, 서버에서 처리하지 못한 시간 필터 함수 또는 None)
+
+    시간(HH:MM) 범위는 date가 주어졌을 때만 서버 쿼리로 보내고(범위 필드가 정렬 첫 필드가 되어야 하므로),
+    그 외에는 정렬된 결과에서 거릅니다.
+    """
+    query = _user_query(MEALS, user_id, start_date, end_date)
+    post_filter = None
+    if date:
+        query = query.where("date", "==", date)
+        if start_time:
+            query = query.where("time", ">=", start_time)
+        if end_time:
+            query = query.where("time", "<=", end_time)
+    elif start_time or end_time:
+        def post_filter(meal: Dict[str, Any]) -> bool:
+            meal_time = meal.get("time", "")
+            return (not start_time or meal_time >= start_time) and (not end_time or meal_time <= end_time)
+    if newest_first:
+        query = query.order_by("date", direction=firestore.Query.DESCENDING).order_by("time", direction=firestore.Query.DESCENDING)
+    elif start_date or end_date:
+        query = query.order_by("date").order_by("time")
+    return query, post_filter
+
+async def list_meals_for_user(
+    user_id: str,
+    date: Optional[str] = None,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    newest_first: bool = False,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    fields: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """사용자의 식단 조회 (날짜 일치/범위 필터와 정렬은 Firestore에서 처리)"""
+    query, post_filter = _meals_query(user_id, date, start_time, end_time, newest_first, start_date, end_date)
+    meals = await _collect(_select(query, fields))
+    return [m for m in meals if post_filter(m)] if post_filter else meals
+
+async def page_meals_for_user(
+    user_id: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    date: Optional[str] = None,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    newest_first: bool = True
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """식단 한 페이지 조회 (최신순 date, time 정렬) -> (식단 목록, 다음 페이지 커서)
+
+    date 없이 시간 필터만 주어지면 페이지를 읽은 뒤 거르므로 한 페이지가 limit보다 적을 수 있습니다.
+    """
+    query, post_filter = _meals_query(user_id, date, start_time, end_time, newest_first, start_date, end_date)
+    if not newest_first and not (start_date or end_date):
+        query = query.order_by("date").order_by("time")
+    meals, next_cursor = await _page(query, MEALS, user_id, limit, cursor)
+    return ([m for m in meals if post_filter(m)] if post_filter else meals), next_cursor
+
+async def list_meals_by_status(status: str, limit: int = 500) -> List[Dict[str, Any]]:
+    """분석 상태(status)가 같은 식단 목록 (전체 사용자)"""
+    return await _collect(_db().collection(MEALS).where("status", "==", status).limit(limit))
+
+async def add_meal(data: Dict[str, Any]) -> str:
+    """식단 추가 후 생성된 문서 ID 반환 (일간 집계도 같은 배치로 갱신)"""
+    db = _db()
+    doc_ref = db.collection(MEALS).document()
+    batch = db.batch()
+    batch.set(doc_ref, data)
+    _stage_rollup(batch, data["user_id"], data["date"], rollups.meal_delta(data))
+    await batch.commit()
+    return doc_ref.id
+
+async def update_meal(
+    meal_id: str,
+    data: Dict[str, Any],
+    user_id: Optional[str] = None,
+    check: Optional[Callable[[Dict[str, Any]], bool]] = None
+) -> Dict[str, Any]:
+    """식단 수정 후 수정 전 문서 반환 (일간 집계에서 이전 값을 빼고 새 값을 더함)
+
+    check(현재 문서) 가 False 면 쓰지 않고 RecordChanged (예: 분석 작업이 자신이 맡은 식단인지 확인).
+    """
+    return await _guarded_write(MEALS, meal_id, _stage_update(rollups.meal_delta, data), user_id, check)
+
+async def delete_meal(meal_id: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """식단 삭제 후 삭제한 문서 반환 (일간 집계에서 값을 뺌, 이미 삭제됐으면 RecordNotFound)"""
+    return await _guarded_write(MEALS, meal_id, _stage_delete(rollups.meal_delta), user_id)
+
+# ---------------------------------------------------------------------------
+# 일간 집계 (daily_rollups)
+# ---------------------------------------------------------------------------
+
+def _as_increments(delta: Dict[str, Any]) -> Dict[str, Any]:
+    """증감분의 숫자 값을 firestore.Increment 로 변환"""
+    return {
+        key: _as_increments(value) if isinstance(value, dict) else firestore.Increment(value)
+        for key, value in delta.items()
+    }
+
+def _stage_rollup(batch, user_id: str, date: str, delta: Dict[str, Any]) -> None:
+    """배치에 일간 집계 증감 쓰기 추가 (문서가 없으면 생성)"""
+    ref = _db().collection(DAILY_ROLLUPS).document(rollups.rollup_id(user_id, date))
+    batch.set(ref, {
+        "user_id": user_id,
+        "date": date,
+        **_as_increments(delta),
+        "updated_at": firestore.SERVER_TIMESTAMP
+    }, merge=True)
+
+async def get_daily_rollups(
+    user_id: str,
+    start_date: str,
+    end_date: str,
+    fields: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """기간 내 일간 집계 문서 조회 (날짜순, 존재하는 날만 읽음)
+
+    fields(예: ["meals"])를 지정하면 date와 해당 필드만 전송받습니다.
+    """
+    query = _user_query(DAILY_ROLLUPS, user_id, start_date, end_date).order_by("date")
+    return await _collect(_select(query, ["date", *fields] if fields else None))
+
+async def replace_daily_rollups(daily: Dict[Tuple[str, str], Dict[str, Any]], user_id: Optional[str] = None) -> Tuple[int, int]:
+    """(user_id, date) -> 집계 값을 덮어쓰기 저장 (백필용)
+
+    daily 에 없는 기존 집계 문서(전체 또는 user_id 사용자)는 기록이 모두 삭제됐거나 어긋난 날이므로 지움.
+    (저장한 문서 수, 삭제한 문서 수) 반환
+    """
+    db = _db()
+    collection = db.collection(DAILY_ROLLUPS)
+    stale = [
+        doc["id"] async for doc in stream_collection(DAILY_ROLLUPS, user_id, fields=["user_id", "date"])
+        if (doc.get("user_id"), doc.get("date")) not in daily
+    ]
+    writes = [("set", key) for key in daily] + [("delete", doc_id) for doc_id in stale]
+    for i in range(0, len(writes), BATCH_LIMIT):
+        batch = db.batch()
+        for kind, target in writes[i:i + BATCH_LIMIT]:
+            if kind == "delete":
+                batch.delete(collection.document(target))
+                continue
+            owner, date = target
+            batch.set(collection.document(rollups.rollup_id(owner, date)), {
+                "user_id": owner, "date": date, **daily[target], "updated_at": firestore.SERVER_TIMESTAMP
+            })
+        await batch.commit()
+    return len(daily), len(stale)
+
+async def iter_user_records(
+    collection: str,
+    user_id: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    page_size: int = 500
+):
+    """사용자 기록을 (date, time) 순으로 page_size 개씩 읽으며 하나씩 내보냄 (내보내기용)
+
+    한 번에 한 페이지만 메모리에 두므로 기록 수와 상관없이 메모리 사용량이 일정합니다.
+    """
+    query = _user_query(collection, user_id, start_date, end_date).order_by("date").order_by("time")
+    last = None
+    while True:
+        page = query.start_after(last) if last is not None else query
+        docs = [doc async for doc in page.limit(page_size).stream()]
+        for doc in docs:
+            yield _to_dict(doc)
+        if len(docs) < page_size:
+            return
+        last = docs[-1]
+
+async def stream_collection(collection: str, user_id: Optional[str] = None, fields: Optional[List[str]] = None):
+    """컬렉션 전체(또는 특정 사용자) 문서를 비동기로 순회 (백필용)"""
+    query = _db().collection(collection)
+    if user_id:
+        query = query.where("user_id", "==", user_id)
+    async for doc in _select(query, fields).stream():
+        yield _to_dict(doc)
+
+# ---------------------------------------------------------------------------
+# 상태 확인
+# ---------------------------------------------------------------------------
+
+async def ping() -> None:
+    """간단한 쿼리로 저장소 연결 확인"""
+    await _collect(_db().collection("_health_check").limit(1))
@@ -0,0 +1,54 @@
+# app/services/http_client.py
+"""외부 API(카카오, Google identitytoolkit) 호출용 공용 httpx 클라이언트
+
+요청마다 AsyncClient 를 만들면 로그인할 때마다 TCP/TLS 연결을 새로 맺어야 하므로,
+앱 lifespan 에서 클라이언트 하나를 만들어 keep-alive 연결 풀을 공유하고 종료 시 닫습니다.
+h2 패키지가 설치되어 있으면 HTTP/2 로 같은 호스트 요청을 연결 하나에 다중화합니다.
+"""
+import importlib.util
+from typing import Optional
+import httpx
+from app.config import settings
+
+_client: Optional[httpx.AsyncClient] = None
+
+def _http2_available() -> bool:
+    return settings.HTTP_CLIENT_HTTP2 and importlib.util.find_spec("h2") is not None
+
+def _new_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=_http2_available(),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(settings.HTTP_CLIENT_TIMEOUT, connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT)
+    )
+
+def start() -> httpx.AsyncClient:
+    """공용 클라이언트 생성 (앱 시작 시 호출, 이미 있으면 그대로 사용)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _new_client()
+    return _client
+
+def get_client() -> httpx.AsyncClient:
+    """공용 클라이언트 반환 (lifespan 밖에서 호출되면 지연 생성)"""
+    return start()
+
+async def close() -> None:
+    """연결 풀 정리 (앱 종료 시 호출)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def get_stats() -> dict:
+    return {
+        "started": _client is not None and not _client.is_closed,
+        "http2": _http2_available(),
+        "max_connections": settings.HTTP_CLIENT_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.HTTP_CLIENT_MAX_KEEPALIVE,
+        "keepalive_expiry": settings.HTTP_CLIENT_KEEPALIVE_EXPIRY
+    }
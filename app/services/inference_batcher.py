@@ -0,0 +1,162 @@
+# app/services/inference_batcher.py
+"""동시 추론 요청을 모아 한 번에 실행하는 asyncio 마이크로 배처
+
+요청마다 입력 1개를 submit() 하면, 워커가 최대 max_wait_ms 동안
+(또는 max_batch_size 개가 모일 때까지) 요청을 모아 infer(입력 목록) 을
+한 번 호출하고 결과를 각 요청에 돌려줍니다. 결과 항목이 예외이면
+해당 요청만 그 예외로 실패합니다.
+
+infer 가 일반 함수이면 전용 스레드 1개에서만 실행되므로 스레드 안전하지 않은
+TFLite 인터프리터를 공유해도 되며, 추론 중에도 이벤트 루프가 막히지 않습니다.
+infer 가 코루틴 함수(예: 프로세스 풀 전달)이면 최대 concurrency 개 배치를
+동시에 실행하고, 모든 슬롯이 사용 중인 동안 들어온 요청은 다음 배치로 모입니다.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Set, Tuple
+from app.services.metrics import LatencyStats
+
+class MicroBatcher:
+    def __init__(
+        self,
+        infer: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        name: str = "inference",
+        concurrency: int = 1
+    ):
+        self._infer = infer
+        self._infer_is_async = asyncio.iscoroutinefunction(infer)
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        # 동기 infer 는 항상 스레드 1개에서만 실행
+        self.concurrency = max(1, concurrency) if self._infer_is_async else 1
+        self._executor = None if self._infer_is_async else ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Set[asyncio.Task] = set()
+        # 지표
+        self.max_queue_depth = 0
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes = [0] * (self.max_batch_size + 1)
+        self.queue_wait = LatencyStats()
+        self.infer_latency = LatencyStats()
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """현재 이벤트 루프에 워커가 없으면 시작 (첫 요청 시 지연 시작)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def submit(self, item: Any) -> Any:
+        """입력 1개를 추론해 결과 반환"""
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((item, future, time.perf_counter()))
+        self.max_queue_depth = max(self.max_queue_depth, queue.qsize())
+        return await future
+
+    async def _collect(self, queue: asyncio.Queue) -> List[Tuple[Any, asyncio.Future, float]]:
+        """첫 요청이 들어온 뒤 max_wait 동안 또는 max_batch_size 개까지 모음"""
+        batch = [await queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            # 빈 슬롯이 생길 때까지 기다리는 동안 요청은 큐에 쌓여 다음 배치가 커짐
+            await slots.acquire()
+            batch = await self._collect(queue)
+            # 대기 중 연결이 끊겨 취소된 요청은 제외
+            batch = [entry for entry in batch if not entry[1].done()]
+            if not batch:
+                slots.release()
+                continue
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            self.queue_wait.observe((started - enqueued) * 1000)
+        items = [item for item, _, _ in batch]
+        try:
+            if self._infer_is_async:
+                outputs = await self._infer(items)
+            else:
+                outputs = await asyncio.get_running_loop().run_in_executor(self._executor, self._infer, items)
+        except asyncio.CancelledError:
+            for _, future, _ in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.infer_latency.observe((time.perf_counter() - started) * 1000)
+            self.batches += 1
+            self.items += len(batch)
+            self.batch_sizes[len(batch)] += 1
+
+        for (_, future, _), output in zip(batch, outputs):
+            if future.done():
+                continue
+            if isinstance(output, BaseException):
+                future.set_exception(output)
+            else:
+                future.set_result(output)
+
+    async def stop(self) -> None:
+        """워커 종료 (대기 중인 요청은 취소됨)"""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        for task in list(self._inflight):
+            task.cancel()
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future, _ = self._queue.get_nowait()
+                future.cancel()
+        self._worker = None
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "concurrency": self.concurrency,
+            "inflight_batches": len(self._inflight),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "batches": self.batches,
+            "items": self.items,
+            "average_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "batch_size_counts": {str(size): count for size, count in enumerate(self.batch_sizes) if count},
+            "queue_wait": self.queue_wait.snapshot(),
+            "infer": self.infer_latency.snapshot()
+        }
@@ -0,0 +1,112 @@
+# app/services/interpreter_pool.py
+"""워커 프로세스마다 TFLite 인터프리터를 하나씩 두는 추론 풀
+
+TFLite 인터프리터는 스레드 간 공유가 안전하지 않고 추론 중 GIL 도 일부 잡으므로,
+코어 수만큼 프로세스를 띄워 각자 모델을 로드(initializer)하고 이미지 묶음을
+전처리부터 추론까지 처리하게 합니다. 요청은 run_in_executor 로 전달되어
+이벤트 루프를 막지 않습니다.
+
+워커가 죽으면(BrokenProcessPool) 풀을 새로 만들고 해당 배치를 한 번 재시도합니다.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, List, Optional
+
+# 워커 프로세스 안에서만 사용하는 모델
+_worker_model = None
+
+def _init_worker(model_path: str, num_threads: Optional[int]) -> None:
+    global _worker_model
+    from app.services.tflite_service import TFLiteModel
+    _worker_model = TFLiteModel(model_path, num_threads=num_threads)
+
+def _infer_images(images: List[bytes]) -> list:
+    return _worker_model.infer_images(images)
+
+def _ping() -> int:
+    return os.getpid()
+
+class InterpreterPool:
+    def __init__(self, model_path: str, workers: int, num_threads: Optional[int] = None):
+        self.model_path = model_path
+        self.workers = max(1, workers)
+        self.num_threads = num_threads
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.restarts = 0
+        self.last_error: Optional[str] = None
+        self.started_at: Optional[float] = None
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # fork 는 부모의 스레드/TF 상태를 복사하므로 spawn 사용
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_path, self.num_threads)
+        )
+
+    async def start(self) -> None:
+        """풀 생성 후 워커 1개에서 모델 로드가 성공하는지 확인 (실패 시 예외)"""
+        self._executor = self._new_executor()
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, _ping)
+        except BrokenProcessPool as e:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self.last_error = "워커 초기화(모델 로드) 실패"
+            raise RuntimeError(self.last_error) from e
+        self.started_at = time.time()
+
+    def _restart(self, broken: ProcessPoolExecutor, error: Exception) -> None:
+        """죽은 풀 교체 (동시에 여러 배치가 실패해도 한 번만 교체)"""
+        if self._executor is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+        self.restarts += 1
+        self.last_error = f"워커 비정상 종료: {str(error) or type(error).__name__}"
+        print(f"추론 워커 풀 재시작 ({self.restarts}회): {self.last_error}")
+
+    async def infer_images(self, images: List[bytes]) -> List[Any]:
+        """이미지 묶음을 워커 하나에서 전처리+추론 (이미지별 확률 배열 또는 예외)"""
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._executor
+            if executor is None:
+                raise RuntimeError("추론 워커 풀이 시작되지 않았습니다")
+            try:
+                return await loop.run_in_executor(executor, _infer_images, images)
+            except BrokenProcessPool as e:
+                self._restart(executor, e)
+                if attempt:
+                    raise
+
+    async def ping(self, timeout: float = 5.0) -> bool:
+        """워커가 작업을 받아 처리할 수 있는지 확인"""
+        if self._executor is None:
+            return False
+        try:
+            await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(self._executor, _ping), timeout)
+            return True
+        except Exception as e:
+            self.last_error = str(e) or type(e).__name__
+            return False
+
+    def health(self) -> dict:
+        return {
+            "mode": "process_pool",
+            "workers": self.workers,
+            "num_threads": self.num_threads,
+            "started": self._executor is not None,
+            "restarts": self.restarts,
+            "last_error": self.last_error
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
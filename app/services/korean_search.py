@@ -0,0 +1,181 @@
+# app/services/korean_search.py
+"""한글 초성/자모를 지원하는 음식 검색 인덱스
+
+문서(이름, ID, 설명)마다 다음 값을 만들어 두고, 각 값의 1글자/2글자 조각 → 문서 번호 역색인과
+접두어 검색용 정렬 목록을 생성합니다. 검색은 쿼리 조각의 역색인 교집합으로 후보를 줄인 뒤
+실제 포함 여부만 확인하므로 문서 수가 늘어도 전체를 훑지 않습니다.
+
+    name         소문자 + 공백 제거 이름
+    choseong     이름의 초성 ("고구마" → "ㄱㄱㅁ")
+    jamo         이름을 입력 순서대로 푼 자모 ("고구마" → "ㄱㅗㄱㅜㅁㅏ", 겹받침/이중모음도 분해)
+    id           소문자 ID ("sweet_potato")
+    description  소문자 + 공백 제거 설명
+
+자모 검색은 입력 중인 글자("곡" → 고구마)를, 초성 검색은 "ㄱㄱㅁ" 같은 초성 입력을 처리합니다.
+"""
+import heapq
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Set, Tuple
+
+_SYLLABLE_BASE, _SYLLABLE_LAST = 0xAC00, 0xD7A3
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+             "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+
+# 자판에서 두 번 눌러 입력하는 겹받침/이중모음
+_COMPOUND_JAMO = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+}
+
+_CHOSEONG_SET = set(CHOSEONG)
+
+# 일치 방식별 점수 (문서마다 가장 높은 점수 사용)
+MATCH_SCORES = {
+    "exact": 100,
+    "prefix": 80,
+    "name": 60,
+    "choseong_prefix": 55,
+    "jamo_prefix": 50,
+    "choseong": 40,
+    "jamo": 35,
+    "id": 30,
+    "description": 10,
+}
+
+def normalize(text: str) -> str:
+    return "".join((text or "").lower().split())
+
+def _is_syllable(ch: str) -> bool:
+    return _SYLLABLE_BASE <= ord(ch) <= _SYLLABLE_LAST
+
+def choseong(text: str) -> str:
+    """한글 음절을 초성으로 바꾸고 나머지 문자는 그대로"""
+    return "".join(
+        CHOSEONG[(ord(ch) - _SYLLABLE_BASE) // 588] if _is_syllable(ch) else ch
+        for ch in text
+    )
+
+def jamo(text: str) -> str:
+    """한글 음절을 입력 순서의 자모로 분해 (겹받침/이중모음도 나눔)"""
+    out = []
+    for ch in text:
+        if _is_syllable(ch):
+            code = ord(ch) - _SYLLABLE_BASE
+            parts = (CHOSEONG[code // 588], JUNGSEONG[code // 28 % 21], JONGSEONG[code % 28])
+            out.extend(_COMPOUND_JAMO.get(part, part) for part in parts)
+        else:
+            out.append(_COMPOUND_JAMO.get(ch, ch))
+    return "".join(out)
+
+def is_choseong_query(text: str) -> bool:
+    return bool(text) and all(ch in _CHOSEONG_SET for ch in text)
+
+def _grams(text: str) -> Set[str]:
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+class SearchIndex:
+    FIELDS = ("name", "choseong", "jamo", "id", "description")
+    # 접두어 검색(자동완성)에 쓰는 필드
+    PREFIX_FIELDS = ("name", "choseong", "jamo")
+
+    def __init__(self, documents: Sequence[Tuple[str, str, str]]):
+        """documents: (이름, ID, 설명) 목록, 결과는 이 목록의 번호"""
+        self.names = [name for name, _, _ in documents]
+        self.values: Dict[str, List[str]] = {field: [] for field in self.FIELDS}
+        for name, doc_id, description in documents:
+            key = normalize(name)
+            self.values["name"].append(key)
+            self.values["choseong"].append(choseong(key))
+            self.values["jamo"].append(jamo(key))
+            self.values["id"].append(normalize(doc_id))
+            self.values["description"].append(normalize(description))
+
+        self._postings: Dict[str, Dict[str, Set[int]]] = {}
+        for field, values in self.values.items():
+            postings: Dict[str, Set[int]] = {}
+            for doc, value in enumerate(values):
+                for gram in _grams(value):
+                    postings.setdefault(gram, set()).add(doc)
+            self._postings[field] = postings
+        self._sorted = {
+            field: sorted((value, doc) for doc, value in enumerate(self.values[field]))
+            for field in self.PREFIX_FIELDS
+        }
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _containing(self, field: str, key: str) -> Set[int]:
+        """field 값에 key 가 포함된 문서"""
+        postings = self._postings[field]
+        grams = [key] if len(key) == 1 else [key[i:i + 2] for i in range(len(key) - 1)]
+        lists = [postings.get(gram) for gram in set(grams)]
+        if not lists or any(docs is None for docs in lists):
+            return set()
+        lists.sort(key=len)
+        candidates = set(lists[0]).intersection(*lists[1:])
+        if len(key) <= 2:
+            return candidates
+        values = self.values[field]
+        return {doc for doc in candidates if key in values[doc]}
+
+    def _prefixed(self, field: str, key: str) -> List[int]:
+        """field 값이 key 로 시작하는 문서 (값 순)"""
+        entries = self._sorted[field]
+        docs = []
+        for i in range(bisect_left(entries, (key, -1)), len(entries)):
+            value, doc = entries[i]
+            if not value.startswith(key):
+                break
+            docs.append(doc)
+        return docs
+
+    def _ranked(self, scores: Dict[int, Tuple[int, str]], limit: int) -> List[Tuple[int, int, str]]:
+        # 점수 → 짧은 이름 → 원래 순서 (후보가 많아도 상위 limit 개만 정렬)
+        names = self.values["name"]
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1][0], len(names[item[0]]), item[0]))
+        return [(doc, score, match) for doc, (score, match) in ranked]
+
+    @staticmethod
+    def _add(scores: Dict[int, Tuple[int, str]], docs, match: str) -> None:
+        score = MATCH_SCORES[match]
+        for doc in docs:
+            if doc not in scores or scores[doc][0] < score:
+                scores[doc] = (score, match)
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, int, str]]:
+        """관련도 순 [(문서 번호, 점수, 일치 방식)]"""
+        key = normalize(query)
+        if not key:
+            return []
+        scores: Dict[int, Tuple[int, str]] = {}
+        if is_choseong_query(key):
+            self._add(scores, self._containing("choseong", key), "choseong")
+            self._add(scores, self._prefixed("choseong", key), "choseong_prefix")
+            return self._ranked(scores, limit)
+
+        self._add(scores, self._containing("description", key), "description")
+        self._add(scores, self._containing("id", key), "id")
+        key_jamo = jamo(key)
+        self._add(scores, self._containing("jamo", key_jamo), "jamo")
+        self._add(scores, self._prefixed("jamo", key_jamo), "jamo_prefix")
+        self._add(scores, self._containing("name", key), "name")
+        self._add(scores, self._prefixed("name", key), "prefix")
+        self._add(scores, (doc for doc in self._prefixed("name", key) if self.values["name"][doc] == key), "exact")
+        return self._ranked(scores, limit)
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Tuple[int, int, str]]:
+        """이름이 prefix 로 시작하는 문서 (입력 중인 글자/초성 입력 포함)"""
+        key = normalize(prefix)
+        if not key:
+            return []
+        scores: Dict[int, Tuple[int, str]] = {}
+        if is_choseong_query(key):
+            self._add(scores, self._prefixed("choseong", key), "choseong_prefix")
+        else:
+            self._add(scores, self._prefixed("jamo", jamo(key)), "jamo_prefix")
+            self._add(scores, self._prefixed("name", key), "prefix")
+        return self._ranked(scores, limit)
@@ -0,0 +1,206 @@
+# app/services/meal_analysis.py
+"""업로드된 식단 사진 백그라운드 분석
+
+/meals/upload 는 사진을 BlobStore 에 저장하고 status="pending" 인 식단 문서를 만든 뒤 바로 응답합니다.
+MealAnalysisQueue 의 작업들이 큐에서 식단 ID 를 꺼내 사진을 분류하고 영양 정보를 찾아
+analysis 를 채우며(status="complete"), 일간 집계도 같은 배치로 갱신합니다(repo.update_meal).
+분석에 실패하면 status="failed" 와 analysis_error 를 기록합니다.
+
+분석 전에 pending → analyzing 으로 바꾸며 작업 토큰(analysis_claim)을 기록하는데, 이 쓰기는 읽은 시점의
+update_time 전제 조건으로 커밋되므로 여러 프로세스가 같은 식단을 꺼내도 한 곳만 맡습니다.
+결과도 "아직 내가 맡은 상태이고 analysis 가 그대로인지" 확인하며 그 시점 문서 기준으로 집계를 갱신하므로,
+분석 중에 식단이 삭제/수정되면 결과를 버리고 사용자가 바꾼 값을 덮어쓰지 않습니다.
+
+결과 기록이 쓰기 충돌이나 일시적 오류로 실패하면 status="failed" 와 analysis_error 를 다시 기록해
+GET /meals/{id} 를 기다리는 클라이언트가 최종 상태를 받게 합니다.
+
+큐는 프로세스 메모리에만 있으므로 resume_pending() 으로 남아 있는 pending 식단과
+맡은 프로세스가 claim_timeout 안에 끝내지 못한(죽었거나 failed 기록까지 실패한) analyzing 식단을
+다시 넣습니다. 서버 시작 시 한 번, 이후 claim_timeout 마다 실행합니다.
+"""
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from firebase_admin import firestore
+from app.services import firestore_repository as repo
+from app.services.blob_store import BlobStore
+from app.services.metrics import LatencyStats
+
+PENDING = "pending"
+ANALYZING = "analyzing"
+COMPLETE = "complete"
+FAILED = "failed"
+
+class MealAnalysisQueue:
+    def __init__(
+        self,
+        analyze: Callable[[bytes], Awaitable[Dict[str, Any]]],
+        store: BlobStore,
+        workers: int = 2,
+        claim_timeout: float = 300
+    ):
+        """analyze: 이미지 바이트 → MealAnalysis 필드 dict, claim_timeout: analyzing 상태를 다시 맡기까지의 시간(초)"""
+        self._analyze = analyze
+        self._store = store
+        self.workers = max(1, workers)
+        self.claim_timeout = claim_timeout
+        self._queue: asyncio.Queue = asyncio.Queue()
+        # 큐에 들어 있는 식단 ID (resume_pending 이 같은 식단을 중복으로 넣지 않도록)
+        self._queued: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+        # 지표
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.latency = LatencyStats()
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._run()) for _ in range(self.workers)]
+        self._tasks.append(loop.create_task(self._sweep()))
+
+    def enqueue(self, meal_id: str) -> None:
+        self._queued.add(meal_id)
+        self._queue.put_nowait((meal_id, time.perf_counter()))
+
+    async def _run(self) -> None:
+        while True:
+            meal_id, enqueued = await self._queue.get()
+            self._queued.discard(meal_id)
+            try:
+                await self.process(meal_id)
+            except Exception as e:
+                # 상태 기록까지 실패한 경우 (pending/analyzing 으로 남아 다음 resume_pending 에서 재시도)
+                print(f"식단 분석 상태 저장 실패 ({meal_id}): {str(e)}")
+            finally:
+                self.latency.observe((time.perf_counter() - enqueued) * 1000)
+
+    async def _sweep(self) -> None:
+        """claim_timeout 마다 남은 pending 식단과 오래된 analyzing 식단을 다시 넣음"""
+        while True:
+            await asyncio.sleep(max(self.claim_timeout, 1))
+            try:
+                await self.resume_pending()
+            except Exception as e:
+                print(f"pending 식단 조회 실패: {str(e)}")
+
+    def _claimable(self, meal: Dict[str, Any]) -> bool:
+        """pending 이거나, 맡은 뒤 claim_timeout 이 지난 analyzing 식단"""
+        if meal.get("status") == PENDING:
+            return True
+        claimed_at = meal.get("analysis_claimed_at")
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=self.claim_timeout)
+        return meal.get("status") == ANALYZING and isinstance(claimed_at, datetime) and claimed_at < stale_before
+
+    async def process(self, meal_id: str) -> Optional[str]:
+        """식단 1건 분석 후 최종 상태 반환 (삭제됐거나 다른 작업이 맡았거나 분석 중 바뀐 식단이면 None)"""
+        claim = uuid.uuid4().hex
+        try:
+            meal = await repo.update_meal(meal_id, {
+                "status": ANALYZING,
+                "analysis_claim": claim,
+                "analysis_claimed_at": firestore.SERVER_TIMESTAMP
+            }, check=self._claimable)
+        except (repo.RecordNotFound, repo.RecordChanged):
+            self.skipped += 1
+            return None
+
+        def still_mine(current: Dict[str, Any]) -> bool:
+            return (
+                current.get("status") == ANALYZING
+                and current.get("analysis_claim") == claim
+                and current.get("analysis") == meal.get("analysis")
+            )
+
+        try:
+            image = await self._store.get(meal["image_key"])
+            # analysis 가 바뀌므로 일간 집계에서 현재 분석 값을 빼고 새 값을 더함
+            data = {"status": COMPLETE, "analysis": await self._analyze(image)}
+        except Exception as e:
+            data = {"status": FAILED, "analysis_error": str(e) or type(e).__name__}
+        data["analyzed_at"] = firestore.SERVER_TIMESTAMP
+        try:
+            result = await self._finish(meal_id, data, still_mine)
+        except Exception as e:
+            # 쓰기 충돌(repo.WriteConflict)이나 일시적 오류 - analyzing 으로 남기지 않고 failed 로 기록
+            print(f"식단 분석 결과 저장 실패 ({meal_id}): {str(e)}")
+            data = {
+                "status": FAILED,
+                "analysis_error": f"분석 결과 저장 실패: {str(e) or type(e).__name__}",
+                "analyzed_at": firestore.SERVER_TIMESTAMP
+            }
+            result = await self._finish(meal_id, data, still_mine)
+        if result == COMPLETE:
+            self.completed += 1
+        elif result == FAILED:
+            self.failed += 1
+        return result
+
+    async def _finish(self, meal_id: str, data: Dict[str, Any], still_mine: Callable[[Dict[str, Any]], bool]) -> Optional[str]:
+        """분석 결과 기록 (맡은 뒤 식단이 삭제/수정됐으면 기록하지 않고 None)"""
+        try:
+            await repo.update_meal(meal_id, data, check=still_mine)
+        except (repo.RecordNotFound, repo.RecordChanged):
+            self.skipped += 1
+            return None
+        return data["status"]
+
+    async def resume_pending(self) -> int:
+        """저장소에 pending 또는 오래된 analyzing 으로 남은 식단 중 큐에 없는 것을 다시 넣고 개수 반환"""
+        meals = await repo.list_meals_by_status(PENDING)
+        meals += [meal for meal in await repo.list_meals_by_status(ANALYZING) if self._claimable(meal)]
+        resumed = [meal["id"] for meal in meals if meal["id"] not in self._queued]
+        for meal_id in resumed:
+            self.enqueue(meal_id)
+        return len(resumed)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize(),
+            "completed": self.completed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "upload_to_analysis": self.latency.snapshot()
+        }
+
+_queue: Optional[MealAnalysisQueue] = None
+
+async def start(
+    analyze: Callable[[bytes], Awaitable[Dict[str, Any]]],
+    store: BlobStore,
+    workers: int = 2,
+    claim_timeout: float = 300
+) -> None:
+    """서버 시작 시 작업 시작 + 남은 pending 식단 재개"""
+    global _queue
+    _queue = MealAnalysisQueue(analyze, store, workers, claim_timeout)
+    _queue.start()
+    try:
+        resumed = await _queue.resume_pending()
+        if resumed:
+            print(f"pending 식단 {resumed}개 분석 재개")
+    except Exception as e:
+        print(f"pending 식단 조회 실패: {str(e)}")
+
+def enqueue(meal_id: str) -> bool:
+    """분석 요청 (큐가 시작되지 않았으면 False - 다음 시작 시 resume_pending 으로 처리)"""
+    if _queue is None:
+        return False
+    _queue.enqueue(meal_id)
+    return True
+
+async def stop() -> None:
+    if _queue is not None:
+        await _queue.stop()
+
+def get_stats() -> dict:
+    return _queue.stats() if _queue is not None else {}
@@ -0,0 +1,583 @@
+# app/services/memory_store.py
+"""프로세스 내 인덱스 문서 저장소 (memory 저장소 백엔드, firestore_async.client() 대체)
+
+app/services/firestore_repository.py 가 사용하는 Firestore API 만 구현합니다.
+
+    collection / document / add / get / set(merge) / update(점 경로) / delete
+    where(FieldFilter 포함) / order_by / limit / select / start_after / stream / get_all
+    batch().set / update / delete / commit (최대 500 쓰기, 전부 적용되거나 전부 실패)
+    write_option(last_update_time= / exists=) 전제 조건과 스냅샷 update_time
+    SERVER_TIMESTAMP, Increment, DELETE_FIELD
+
+실제 Firestore 와 같게 맞춘 동작:
+    - order_by 필드가 없는 문서는 결과에서 제외되고, null 은 다른 값보다 앞에 정렬
+    - 정렬 마지막에 문서 ID 로 순서를 고정하고, start_after(스냅샷) 은 스냅샷의 정렬 필드 값 기준
+    - 없는 문서 update 는 NotFound, 전제 조건이 맞지 않으면 FailedPrecondition (배치 전체 실패)
+    - 스냅샷/to_dict 는 저장된 데이터의 복사본
+
+실제 Firestore 는 인덱스로 쿼리하므로 비용이 컬렉션 전체가 아니라 조건에 맞는 문서 수에 비례합니다.
+같은 비용 구조가 되도록 "==" 조건 필드에는 (컬렉션, 필드) 별 값 -> 문서 ID 인덱스를 처음 쿼리할 때
+만들고 모든 쓰기에서 갱신하며, 정렬된 쿼리 결과는 사용자(user_id)별로 보관해 그 사용자의 문서가
+바뀔 때만 다시 정렬합니다.
+
+path 를 주면 모든 쓰기를 SQLite 파일에 함께 기록하고 시작할 때 다시 읽으므로 재시작 후에도 데이터가 남습니다.
+latency(초)를 주면 모든 읽기/쓰기 호출이 그만큼 기다리므로 네트워크 왕복 시간을 흉내 낼 수 있습니다.
+"""
+import asyncio
+import json
+import sqlite3
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from firebase_admin import firestore
+from google.api_core.exceptions import FailedPrecondition, NotFound
+
+_Increment = type(firestore.Increment(1))
+_MISSING = object()
+_DELETE = object()
+
+# 정렬된 쿼리 결과 캐시 최대 항목 수 (사용자 x 쿼리 모양)
+QUERY_CACHE_MAX_ENTRIES = 4096
+
+def _get_path(data, path, default=None):
+    if "." not in path:
+        return data.get(path, default) if isinstance(data, dict) else default
+    for part in path.split("."):
+        if not isinstance(data, dict) or part not in data:
+            return default
+        data = data[part]
+    return data
+
+def _clone(value):
+    """저장 데이터 복사 (dict/list 만 새로 만들고 나머지 값은 불변이므로 공유)"""
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    return value
+
+def _resolve(value, current):
+    if value is firestore.SERVER_TIMESTAMP:
+        return datetime.now(timezone.utc)
+    if isinstance(value, _Increment):
+        return (current or 0) + value.value
+    if value is firestore.DELETE_FIELD:
+        return _DELETE
+    return _clone(value)
+
+def _apply_nested(target, data):
+    """set(merge=True) 처럼 중첩 dict 를 병합"""
+    for key, value in data.items():
+        if isinstance(value, dict):
+            node = target.get(key)
+            if not isinstance(node, dict):
+                node = target[key] = {}
+            _apply_nested(node, value)
+        else:
+            resolved = _resolve(value, target.get(key))
+            if resolved is _DELETE:
+                target.pop(key, None)
+            else:
+                target[key] = resolved
+
+def _materialize(data):
+    out = {}
+    _apply_nested(out, data)
+    return out
+
+def _set_path(target, path, value):
+    """update() 의 "a.b.c" 점 경로 쓰기"""
+    parts = path.split(".")
+    for part in parts[:-1]:
+        node = target.get(part)
+        if not isinstance(node, dict):
+            node = target[part] = {}
+        target = node
+    resolved = _resolve(value, target.get(parts[-1]))
+    if resolved is _DELETE:
+        target.pop(parts[-1], None)
+    else:
+        target[parts[-1]] = resolved
+
+def _project(data, field_paths):
+    if not any("." in path for path in field_paths):
+        return {path: data[path] for path in field_paths if path in data}
+    out = {}
+    for path in field_paths:
+        value = _get_path(data, path, _MISSING)
+        if value is not _MISSING:
+            _set_path(out, path, value)
+    return out
+
+class WriteOption:
+    """write_option() 결과 (last_update_time 또는 exists 중 하나)"""
+
+    def __init__(self, last_update_time=None, exists=None):
+        self.last_update_time = last_update_time
+        self.exists = exists
+
+    def check(self, path, update_time) -> None:
+        """update_time: 현재 문서의 마지막 수정 시각 (문서가 없으면 None)"""
+        if self.last_update_time is not None and update_time != self.last_update_time:
+            raise FailedPrecondition(f"the stored version does not match the required base version: {path}")
+        if self.exists is not None and (update_time is not None) != self.exists:
+            raise FailedPrecondition(f"precondition failed (exists={self.exists}): {path}")
+
+class DocumentSnapshot:
+    def __init__(self, reference, data, update_time=None):
+        self.reference = reference
+        self._data = data
+        self.update_time = update_time
+
+    @property
+    def id(self):
+        return self.reference.id
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return _clone(self._data) if self._data is not None else None
+
+    def get(self, field_path):
+        return _get_path(self._data or {}, field_path)
+
+class DocumentReference:
+    def __init__(self, client, collection, doc_id):
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+
+    @property
+    def path(self):
+        return f"{self._collection}/{self.id}"
+
+    def _exists(self):
+        return self.id in self._client._collections.get(self._collection, {})
+
+    def _update_time(self):
+        return self._client._update_times.get((self._collection, self.id))
+
+    def _snapshot(self, field_paths=None):
+        data = self._client._collections.get(self._collection, {}).get(self.id)
+        if data is not None and field_paths is not None:
+            data = _project(data, field_paths)
+        if data is None:
+            return DocumentSnapshot(self, None)
+        return DocumentSnapshot(self, _clone(data), self._update_time())
+
+    def _set(self, data, merge=False):
+        def write(current):
+            if merge and current is not None:
+                _apply_nested(current, data)
+                return current
+            return _materialize(data)
+        self._client._write(self._collection, self.id, write)
+
+    def _update(self, field_updates):
+        def write(current):
+            if current is None:
+                raise NotFound(f"No document to update: {self.path}")
+            for path, value in field_updates.items():
+                _set_path(current, path, value)
+            return current
+        self._client._write(self._collection, self.id, write)
+
+    def _delete(self):
+        self._client._write(self._collection, self.id, lambda current: None)
+
+    async def get(self, field_paths=None, **kwargs):
+        await self._client._tick()
+        return self._snapshot(field_paths)
+
+    async def set(self, document_data, merge=False):
+        await self._client._tick()
+        self._set(document_data, merge)
+        self._client._flush()
+
+    async def update(self, field_updates, option=None):
+        await self._client._tick()
+        if option is not None:
+            option.check(self.path, self._update_time())
+        self._update(field_updates)
+        self._client._flush()
+
+    async def delete(self, option=None):
+        await self._client._tick()
+        if option is not None:
+            option.check(self.path, self._update_time())
+        self._delete()
+        self._client._flush()
+
+_OPS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a is not None and a != b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "in": lambda a, b: a in b,
+    "not-in": lambda a, b: a is not None and a not in b,
+    "array_contains": lambda a, b: isinstance(a, list) and b in a,
+    "array_contains_any": lambda a, b: isinstance(a, list) and any(v in a for v in b),
+}
+
+def _sort_value(value):
+    # Firestore 정렬: null 이 가장 앞
+    return (0, 0) if value is None else (1, value)
+
+def _descending(direction):
+    return direction in ("DESCENDING", firestore.Query.DESCENDING)
+
+class Query:
+    def __init__(self, client, collection, filters=(), orders=(), limit=None, fields=None, cursor=None):
+        self._client = client
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._fields = fields
+        self._cursor = cursor
+
+    def _copy(self, **changes):
+        params = dict(filters=self._filters, orders=self._orders, limit=self._limit,
+                      fields=self._fields, cursor=self._cursor)
+        params.update(changes)
+        return Query(self._client, self._collection, **params)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        if op_string not in _OPS:
+            raise ValueError(f"지원하지 않는 연산자: {op_string}")
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction="ASCENDING"):
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def select(self, field_paths):
+        return self._copy(fields=list(field_paths))
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy(cursor=document_fields_or_snapshot)
+
+    def _sort_key(self, doc_id, data):
+        return [_sort_value(_get_path(data, field)) for field, _ in self._orders] + [(1, doc_id)]
+
+    def _after_cursor(self, key, cursor_key):
+        """정렬 순서상 key 가 커서보다 뒤인지 (필드별 방향 반영)"""
+        directions = [_descending(direction) for _, direction in self._orders] + [False]
+        for value, cursor_value, descending in zip(key, cursor_key, directions):
+            if value != cursor_value:
+                return (value < cursor_value) if descending else (value > cursor_value)
+        return False
+
+    def _cursor_key(self):
+        cursor = self._cursor
+        if isinstance(cursor, DocumentSnapshot):
+            return self._sort_key(cursor.id, cursor._data or {})
+        if isinstance(cursor, dict):
+            return [_sort_value(_get_path(cursor, field)) for field, _ in self._orders] + [(2, "")]
+        raise TypeError("start_after 는 스냅샷 또는 필드 값 dict 만 지원합니다")
+
+    def _candidates(self):
+        """"==" 조건 인덱스 중 가장 작은 후보 집합 (없으면 컬렉션 전체)"""
+        store = self._client._collections.get(self._collection, {})
+        best = None
+        for field, op, value in self._filters:
+            if op == "==":
+                ids = self._client._lookup(self._collection, field, value)
+                if ids is not None and (best is None or len(ids) < len(best)):
+                    best = ids
+        if best is None:
+            return store.items()
+        return [(doc_id, store[doc_id]) for doc_id in best]
+
+    def _partition(self):
+        """user_id == 조건이 있으면 그 사용자 파티션, 없으면 컬렉션 전체 (캐시 무효화 단위)"""
+        for field, op, value in self._filters:
+            if field == "user_id" and op == "==":
+                key = _index_key(value)
+                if key is not None:
+                    return (self._collection, key)
+        return self._collection
+
+    def _sorted(self):
+        """조건에 맞는 문서를 정렬한 (행 목록, 정렬 키 목록) - 해당 사용자 문서가 바뀔 때까지 캐시
+
+        실제 Firestore 가 정렬된 인덱스를 이어서 읽듯이, 같은 모양의 쿼리가 반복되면
+        다시 정렬하지 않고 커서 위치만 이진 탐색합니다.
+        """
+        client = self._client
+        cache_key = (self._collection, repr(self._filters), self._orders)
+        version = client._versions.get(self._partition(), 0)
+        cached = client._query_cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            client.query_cache_hits += 1
+            return cached[1], cached[2]
+        client.query_cache_misses += 1
+        rows = [
+            (doc_id, data) for doc_id, data in self._candidates()
+            if all(_OPS[op](_get_path(data, field), value) for field, op, value in self._filters)
+            # order_by 필드가 없는 문서는 제외
+            and all(_get_path(data, field, _MISSING) is not _MISSING for field, _ in self._orders)
+        ]
+        keyed = [(self._sort_key(doc_id, data), doc_id, data) for doc_id, data in rows]
+        keyed.sort(key=lambda row: row[1])
+        for i in reversed(range(len(self._orders))):
+            keyed.sort(key=lambda row: row[0][i], reverse=_descending(self._orders[i][1]))
+        rows = [(doc_id, data) for _, doc_id, data in keyed]
+        keys = [key for key, _, _ in keyed]
+        if len(client._query_cache) >= QUERY_CACHE_MAX_ENTRIES:
+            client._query_cache.clear()
+        client._query_cache[cache_key] = (version, rows, keys)
+        return rows, keys
+
+    def _matches(self):
+        rows, keys = self._sorted()
+        start = 0
+        if self._cursor is not None:
+            # 정렬 순서상 커서 뒤의 첫 위치
+            cursor_key = self._cursor_key()
+            low, high = 0, len(rows)
+            while low < high:
+                middle = (low + high) // 2
+                if self._after_cursor(keys[middle], cursor_key):
+                    high = middle
+                else:
+                    low = middle + 1
+            start = low
+        end = len(rows) if self._limit is None else start + self._limit
+        return rows[start:end]
+
+    async def stream(self, **kwargs):
+        await self._client._tick()
+        for doc_id, data in self._matches():
+            if self._fields is not None:
+                data = _project(data, self._fields)
+            reference = DocumentReference(self._client, self._collection, doc_id)
+            yield DocumentSnapshot(reference, _clone(data), reference._update_time())
+
+    async def get(self, **kwargs):
+        return [doc async for doc in self.stream()]
+
+class CollectionReference(Query):
+    def __init__(self, client, name):
+        super().__init__(client, name)
+        self.id = name
+
+    def document(self, document_id=None):
+        return DocumentReference(self._client, self._collection, document_id or uuid.uuid4().hex[:20])
+
+    async def add(self, document_data, document_id=None):
+        reference = self.document(document_id)
+        await reference.set(document_data)
+        return datetime.now(timezone.utc), reference
+
+class WriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def set(self, reference, document_data, merge=False):
+        self._ops.append(("set", reference, None, lambda: reference._set(document_data, merge)))
+
+    def update(self, reference, field_updates, option=None):
+        self._ops.append(("update", reference, option, lambda: reference._update(field_updates)))
+
+    def delete(self, reference, option=None):
+        self._ops.append(("delete", reference, option, reference._delete))
+
+    def __len__(self):
+        return len(self._ops)
+
+    async def commit(self):
+        if len(self._ops) > 500:
+            raise ValueError("A write batch can contain at most 500 writes")
+        await self._client._tick()
+        # 적용 전에 update 대상 존재와 전제 조건을 모두 확인해 실패한 배치는 아무것도 쓰지 않음
+        exists = {}
+        for kind, reference, option, _ in self._ops:
+            if option is not None:
+                option.check(reference.path, reference._update_time())
+            present = exists.get(reference.path)
+            if present is None:
+                present = reference._exists()
+            if kind == "update" and not present:
+                raise NotFound(f"No document to update: {reference.path}")
+            exists[reference.path] = kind != "delete"
+        for _, _, _, op in self._ops:
+            op()
+        self._client._flush()
+        return []
+
+def _index_key(value):
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    # Firestore 는 1 == 1.0 이지만 True 는 숫자와 다른 값
+    if isinstance(value, bool):
+        return ("bool", value)
+    if isinstance(value, (int, float)):
+        return ("number", value)
+    return (type(value).__name__, value)
+
+def _encode_value(value):
+    """SQLite 에 JSON 으로 저장할 수 없는 값 변환 (현재는 datetime 만)"""
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    raise TypeError(f"저장할 수 없는 값: {type(value).__name__}")
+
+def _decode_object(obj):
+    if len(obj) == 1 and "$datetime" in obj:
+        return datetime.fromisoformat(obj["$datetime"])
+    return obj
+
+class MemoryClient:
+    """firestore_async.client() 대체 (모든 데이터는 프로세스 메모리에 보관, path 가 있으면 SQLite 에도 기록)"""
+
+    def __init__(self, path: Optional[str] = None, latency: float = 0.0):
+        self._collections = {}
+        # (컬렉션, 문서 ID) -> 마지막 수정 시각 (쓰기마다 이전 값보다 커짐)
+        self._update_times = {}
+        self._last_update_time = datetime.now(timezone.utc)
+        # (컬렉션, 필드) -> {값: 문서 ID 집합}
+        self._indexes = {}
+        # 쓰기마다 증가하는 컬렉션/사용자 파티션 버전과 정렬된 쿼리 결과 캐시
+        self._versions = {}
+        self._query_cache = {}
+        self.latency = latency
+        self.calls = 0
+        self.writes = 0
+        self.query_cache_hits = 0
+        self.query_cache_misses = 0
+        self.path = path
+        self._dirty = set()
+        self._db = None
+        if path:
+            self._open(path)
+
+    def _open(self, path: str) -> None:
+        """SQLite 파일을 열고 저장된 문서를 모두 메모리로 읽음"""
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "collection TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL, PRIMARY KEY (collection, id))"
+        )
+        for collection, doc_id, data in self._db.execute("SELECT collection, id, data FROM documents"):
+            self._collections.setdefault(collection, {})[doc_id] = json.loads(data, object_hook=_decode_object)
+            self._update_times[(collection, doc_id)] = self._last_update_time
+
+    def _write(self, collection, doc_id, write):
+        """write(현재 데이터 또는 None) -> 새 데이터 또는 None(삭제) 적용 후 인덱스 갱신"""
+        store = self._collections.setdefault(collection, {})
+        current = store.get(doc_id)
+        indexes = [(field, index) for (name, field), index in self._indexes.items() if name == collection]
+        before = [_get_path(current, field, _MISSING) for field, _ in indexes] if current is not None else None
+        owner = _index_key(current.get("user_id")) if current is not None else None
+        data = write(current)
+        if data is None:
+            store.pop(doc_id, None)
+            self._update_times.pop((collection, doc_id), None)
+        else:
+            store[doc_id] = data
+            self._update_times[(collection, doc_id)] = self._next_update_time()
+        for i, (field, index) in enumerate(indexes):
+            if before is not None and before[i] is not _MISSING:
+                index.get(_index_key(before[i]), set()).discard(doc_id)
+            value = _get_path(data, field, _MISSING) if data is not None else _MISSING
+            if value is not _MISSING:
+                index.setdefault(_index_key(value), set()).add(doc_id)
+        # 컬렉션 전체 쿼리와 문서 소유자(수정 전/후) 쿼리의 캐시만 무효화
+        partitions = {collection, (collection, owner)}
+        if data is not None:
+            partitions.add((collection, _index_key(data.get("user_id"))))
+        for partition in partitions:
+            self._versions[partition] = self._versions.get(partition, 0) + 1
+        self.writes += 1
+        if self._db is not None:
+            self._dirty.add((collection, doc_id))
+
+    def _next_update_time(self):
+        """현재 시각 (같은 마이크로초에 여러 번 쓰더라도 이전 값보다 크게)"""
+        now = datetime.now(timezone.utc)
+        self._last_update_time = max(now, self._last_update_time + timedelta(microseconds=1))
+        return self._last_update_time
+
+    def _flush(self) -> None:
+        """마지막 flush 이후 바뀐 문서를 한 트랜잭션으로 SQLite 에 기록"""
+        if self._db is None or not self._dirty:
+            return
+        upserts, deletes = [], []
+        for collection, doc_id in self._dirty:
+            data = self._collections.get(collection, {}).get(doc_id)
+            if data is None:
+                deletes.append((collection, doc_id))
+            else:
+                upserts.append((collection, doc_id, json.dumps(data, ensure_ascii=False, default=_encode_value)))
+        self._dirty.clear()
+        with self._db:
+            self._db.executemany("DELETE FROM documents WHERE collection = ? AND id = ?", deletes)
+            self._db.executemany("INSERT OR REPLACE INTO documents (collection, id, data) VALUES (?, ?, ?)", upserts)
+
+    def _lookup(self, collection, field, value):
+        """field == value 인 문서 ID 목록 (인덱스가 없으면 생성, 해시할 수 없는 값이면 None)"""
+        key = _index_key(value)
+        if key is None:
+            return None
+        index = self._indexes.get((collection, field))
+        if index is None:
+            index = self._indexes[(collection, field)] = {}
+            for doc_id, data in self._collections.get(collection, {}).items():
+                found = _get_path(data, field, _MISSING)
+                if found is not _MISSING:
+                    index.setdefault(_index_key(found), set()).add(doc_id)
+        return sorted(index.get(key, ()))
+
+    async def _tick(self):
+        self.calls += 1
+        # latency 가 0 이어도 실제 I/O 처럼 이벤트 루프에 한 번 양보
+        await asyncio.sleep(self.latency)
+
+    def collection(self, name):
+        return CollectionReference(self, name)
+
+    @staticmethod
+    def write_option(**kwargs):
+        """Firestore 와 같게 last_update_time 또는 exists 중 하나만 받음"""
+        if len(kwargs) != 1 or not set(kwargs) <= {"last_update_time", "exists"}:
+            raise TypeError("write_option 은 last_update_time 또는 exists 하나만 받습니다")
+        return WriteOption(**kwargs)
+
+    def batch(self):
+        return WriteBatch(self)
+
+    async def get_all(self, references, field_paths=None, **kwargs):
+        await self._tick()
+        for reference in references:
+            yield reference._snapshot(field_paths)
+
+    def close(self) -> None:
+        """남은 쓰기를 기록하고 SQLite 파일을 닫음"""
+        if self._db is not None:
+            self._flush()
+            self._db.close()
+            self._db = None
+
+    def stats(self) -> dict:
+        return {
+            "documents": {name: len(docs) for name, docs in self._collections.items()},
+            "calls": self.calls,
+            "writes": self.writes,
+            "query_cache_entries": len(self._query_cache),
+            "query_cache_hits": self.query_cache_hits,
+            "query_cache_misses": self.query_cache_misses,
+            "sqlite_path": self.path
+        }
@@ -0,0 +1,65 @@
+# app/services/metrics.py
+"""프로세스 내 지연 시간 지표와 요청 단계별 타이머"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+class LatencyStats:
+    """최근 N개 샘플 기준 지연 시간(ms) 통계"""
+
+    def __init__(self, window: int = 1024):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        with self._lock:
+            self._samples.append(ms)
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = sorted(self._samples)
+        def percentile(p: float) -> float:
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))], 3)
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(self.max_ms, 3)
+        }
+
+class PhaseTimer:
+    """한 요청 안의 단계별 소요 시간 측정 (Server-Timing 헤더로 응답에 포함)"""
+
+    def __init__(self, registry: Optional[Dict[str, LatencyStats]] = None):
+        self.phases: List[Tuple[str, float]] = []
+        self._registry = registry
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            self.phases.append((name, ms))
+            if self._registry is not None:
+                self._registry.setdefault(name, LatencyStats()).observe(ms)
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값 (예: "fetch;dur=12.3, insights;dur=0.1")"""
+        return ", ".join(f"{name};dur={ms:.2f}" for name, ms in self.phases)
+
+def snapshot_registry(registry: Dict[str, LatencyStats]) -> dict:
+    return {name: stats.snapshot() for name, stats in registry.items()}
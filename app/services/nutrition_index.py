@@ -0,0 +1,383 @@
+# app/services/nutrition_index.py
+"""음식명 → 영양 정보 조회 인덱스
+
+영양 CSV 를 NumPy 배열 몇 개로 컴파일해 두고, 요청마다 전체 행을 훑지 않고 조회합니다.
+python -m app.scripts.build_nutrition_table 로 배열을 디스크(.npy)에 저장해 두면
+서버는 np.load(mmap_mode='r') 로 열기만 하므로 시작 시 CSV 파싱/인덱스 생성이 없고,
+여러 워커 프로세스가 같은 페이지 캐시를 읽기 전용으로 공유합니다.
+
+    names_*          원본 식품명 문자열 표 (UTF-8 바이트 + 오프셋, 파일 순서)
+    values           (행 수, 열 수) float64, 값이 없으면 NaN
+    sources          행별 원본 CSV 번호 (meta.json 의 sources 인덱스)
+    exact_sorted     식품명 순으로 정렬한 행 번호 (이진 탐색으로 완전 일치)
+    norm_*           공백/괄호를 뺀 소문자 이름 문자열 표 (순위 순서)
+    norm_sorted      정규화 이름 순으로 정렬한 순위 번호 (이진 탐색으로 정규화 일치)
+    order            순위 → 행 번호. 순위는 (정규화 이름 길이, 파일 순서)
+    gram_* / postings*  정규화 이름의 1글자/2글자 조각 → 순위 번호 배열 (역색인)
+
+조회 순서: 완전 일치 → 정규화 일치 → 포함 검색 → 유사 검색(2-gram Dice 계수)
+포함 검색 결과는 이름이 짧은 순(같으면 쿼리로 시작하는 이름, 그다음 파일 순서)으로 정렬합니다.
+역색인에는 이 순위 번호를 넣어 두어 교집합 결과가 곧 순위가 됩니다.
+"""
+import csv
+import json
+import math
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.config import settings
+
+NAME_COLUMN = "식품명"
+
+# 응답 필드 → CSV 열
+NUMERIC_COLUMNS = {
+    "energy_kcal": "에너지(㎉)",
+    "carbohydrate_g": "탄수화물(g)",
+    "protein_g": "단백질(g)",
+    "sugars_g": "총당류(g)",
+    "fat_g": "지방(g)",
+}
+
+# 유사 검색으로 인정하는 최소 Dice 계수
+FUZZY_THRESHOLD = 0.5
+
+# 컴파일 파일 형식 (배열 구성이 바뀌면 올림)
+FORMAT_VERSION = 1
+
+_IGNORED = re.compile(r"[\s()\[\]{}（）]+")
+
+def normalize_name(name: str) -> str:
+    """공백과 괄호를 제거하고 소문자로 변환"""
+    return _IGNORED.sub("", name or "").lower()
+
+def _grams(text: str) -> set:
+    """1글자 + 2글자 조각"""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+def _bigrams(text: str) -> set:
+    return {text[i:i + 2] for i in range(len(text) - 1)} or ({text} if text else set())
+
+def to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+class StringTable:
+    """UTF-8 바이트 배열 + 오프셋으로 저장한 문자열 목록 (mmap 배열을 그대로 사용)"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+        # 조회마다 NumPy 스칼라/슬라이스를 만들지 않도록 memoryview 로 접근 (복사 없음)
+        self._bytes = memoryview(blob).cast("B") if len(blob) else memoryview(b"")
+        self._offsets = memoryview(offsets)
+
+    @classmethod
+    def build(cls, strings: Sequence[str]) -> "StringTable":
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8).copy(), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def raw(self, i: int) -> bytes:
+        return self._bytes[self._offsets[i]:self._offsets[i + 1]].tobytes()
+
+    def __getitem__(self, i: int) -> str:
+        return self.raw(i).decode("utf-8")
+
+    def find(self, sorted_ids: np.ndarray, key: str) -> Optional[int]:
+        """sorted_ids 순서(바이트 오름차순)에서 key 와 같은 첫 항목 (없으면 None)
+
+        UTF-8 바이트 순서는 코드 포인트 순서와 같으므로 파이썬 문자열 정렬과 일치합니다.
+        """
+        raw = key.encode("utf-8")
+        ids = memoryview(sorted_ids)
+        lo, hi = 0, len(ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.raw(ids[mid]) < raw:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(ids) and self.raw(ids[lo]) == raw:
+            return ids[lo]
+        return None
+
+def read_csv(path: str) -> Tuple[List[str], np.ndarray]:
+    """영양 CSV → (식품명 목록, (행 수, 열 수) 수치 배열)"""
+    names, values = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            names.append(row.get(NAME_COLUMN) or "")
+            values.append([to_float(row.get(column)) for column in NUMERIC_COLUMNS.values()])
+    return names, np.array(values, dtype=np.float64).reshape(len(names), len(NUMERIC_COLUMNS))
+
+def compile_arrays(names: Sequence[str], values: np.ndarray, sources: Optional[Sequence[int]] = None) -> Dict[str, np.ndarray]:
+    """식품명/수치 → 인덱스 배열 (디스크 저장 형식과 같음)"""
+    names = list(names)
+    n = len(names)
+    normalized = [normalize_name(name) for name in names]
+    order = sorted(range(n), key=lambda row: (len(normalized[row]), row))
+    normalized_by_rank = [normalized[row] for row in order]
+    # 같은 이름이 여러 번 나오면 파일에서 먼저 나온 행이 이진 탐색에 먼저 걸리도록 정렬
+    exact_sorted = sorted(range(n), key=lambda row: (names[row].encode("utf-8"), row))
+    norm_sorted = sorted(range(n), key=lambda rank: (normalized_by_rank[rank].encode("utf-8"), order[rank]))
+
+    postings: Dict[str, List[int]] = {}
+    bigram_counts = np.zeros(n, dtype=np.float32)
+    for rank, key in enumerate(normalized_by_rank):
+        for gram in _grams(key):
+            postings.setdefault(gram, []).append(rank)
+        bigram_counts[rank] = len(_bigrams(key))
+    gram_keys = sorted(postings, key=lambda gram: gram.encode("utf-8"))
+    posting_offsets = np.zeros(len(gram_keys) + 1, dtype=np.int64)
+    np.cumsum([len(postings[gram]) for gram in gram_keys], out=posting_offsets[1:])
+
+    names_table = StringTable.build(names)
+    norm_table = StringTable.build(normalized_by_rank)
+    gram_table = StringTable.build(gram_keys)
+    return {
+        "names_blob": names_table.blob,
+        "names_offsets": names_table.offsets,
+        "values": np.asarray(values, dtype=np.float64).reshape(n, len(NUMERIC_COLUMNS)),
+        "sources": np.asarray(sources if sources is not None else np.zeros(n), dtype=np.uint16),
+        "exact_sorted": np.array(exact_sorted, dtype=np.int32),
+        "norm_blob": norm_table.blob,
+        "norm_offsets": norm_table.offsets,
+        "norm_sorted": np.array(norm_sorted, dtype=np.int32),
+        "order": np.array(order, dtype=np.int32),
+        "bigram_counts": bigram_counts,
+        "gram_blob": gram_table.blob,
+        "gram_offsets": gram_table.offsets,
+        "postings": np.array([rank for gram in gram_keys for rank in postings[gram]], dtype=np.int32),
+        "posting_offsets": posting_offsets,
+    }
+
+ARRAY_NAMES = (
+    "names_blob", "names_offsets", "values", "sources", "exact_sorted",
+    "norm_blob", "norm_offsets", "norm_sorted", "order", "bigram_counts",
+    "gram_blob", "gram_offsets", "postings", "posting_offsets",
+)
+
+class NutritionIndex:
+    def __init__(self, arrays: Dict[str, np.ndarray], columns: Sequence[str] = tuple(NUMERIC_COLUMNS), sources: Sequence[str] = ()):
+        """compile_arrays() 결과(메모리 배열 또는 mmap 배열)로 생성
+
+        columns 는 values 의 열 순서, sources 는 원본 CSV 파일명 목록입니다.
+        """
+        self.arrays = arrays
+        self.columns = list(columns)
+        self.source_names = list(sources)
+        self.names = StringTable(arrays["names_blob"], arrays["names_offsets"])
+        self.values = arrays["values"]
+        self.sources = arrays["sources"]
+        self._exact_sorted = arrays["exact_sorted"]
+        self._normalized = StringTable(arrays["norm_blob"], arrays["norm_offsets"])
+        self._norm_sorted = arrays["norm_sorted"]
+        self._order = arrays["order"]
+        self._bigram_counts = arrays["bigram_counts"]
+        self._grams = StringTable(arrays["gram_blob"], arrays["gram_offsets"])
+        self._gram_ids = np.arange(len(self._grams), dtype=np.int32)
+        self._postings = arrays["postings"]
+        self._posting_offsets = arrays["posting_offsets"]
+
+    @classmethod
+    def from_csv(cls, *paths: str) -> "NutritionIndex":
+        """CSV 파일(여러 개면 앞 파일 우선)을 읽어 메모리에서 인덱스 생성"""
+        names: List[str] = []
+        blocks, sources = [], []
+        for source, path in enumerate(paths):
+            file_names, values = read_csv(path)
+            names.extend(file_names)
+            blocks.append(values)
+            sources.extend([source] * len(file_names))
+        values = np.concatenate(blocks) if blocks else np.zeros((0, len(NUMERIC_COLUMNS)))
+        return cls(compile_arrays(names, values, sources), sources=[os.path.basename(p) for p in paths])
+
+    def save(self, directory: str) -> None:
+        """배열을 .npy 파일로, 열/원본 정보를 meta.json 으로 저장
+
+        meta.json 을 마지막에 쓰므로 meta.json 이 있으면 배열 파일이 모두 있는 상태입니다.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(self.arrays[name]))
+        meta = {"format_version": FORMAT_VERSION, "rows": len(self), "columns": self.columns, "sources": self.source_names}
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, directory: str) -> "NutritionIndex":
+        """컴파일된 테이블을 읽기 전용 mmap 으로 열기 (파싱/정렬 없음)"""
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 영양 테이블 형식입니다: {meta.get('format_version')} ({directory})")
+        # np.memmap 서브클래스는 슬라이스마다 비용이 커서 같은 매핑을 가리키는 일반 ndarray 뷰로 사용
+        arrays = {
+            name: np.asarray(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+            for name in ARRAY_NAMES
+        }
+        return cls(arrays, columns=meta["columns"], sources=meta.get("sources", []))
+
+    def source_of(self, row: int) -> Optional[str]:
+        """행의 원본 CSV 파일명"""
+        source = int(self.sources[row])
+        return self.source_names[source] if source < len(self.source_names) else None
+
+    def _posting(self, gram: str) -> Optional[np.ndarray]:
+        gram_id = self._grams.find(self._gram_ids, gram)
+        if gram_id is None:
+            return None
+        return self._postings[self._posting_offsets[gram_id]:self._posting_offsets[gram_id + 1]]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _candidate_ranks(self, key: str) -> np.ndarray:
+        """쿼리의 조각을 모두 가진 이름의 순위 번호 (오름차순 = 순위순)"""
+        grams = [key] if len(key) == 1 else [key[i:i + 2] for i in range(len(key) - 1)]
+        lists = []
+        for gram in set(grams):
+            ranks = self._posting(gram)
+            if ranks is None:
+                return np.zeros(0, dtype=np.int32)
+            lists.append(ranks)
+        # 짧은 목록부터 교집합
+        lists.sort(key=len)
+        candidates = lists[0]
+        for ranks in lists[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, ranks, assume_unique=True)
+        return candidates
+
+    def _ranked_substring(self, key: str, limit: int) -> List[int]:
+        """포함 검색 결과 행 번호 (짧은 이름 → 쿼리로 시작 → 파일 순서)
+
+        후보는 이미 (길이, 파일 순서) 순이므로 limit 개를 채운 뒤 같은 길이까지만 확인합니다.
+        """
+        matches: List[Tuple[int, str]] = []
+        for rank in self._candidate_ranks(key):
+            name = self._normalized[rank]
+            if len(matches) >= limit and len(name) > len(matches[-1][1]):
+                break
+            # 3글자 이상은 조각이 모두 있어도 연속으로 붙어 있는지 확인 필요
+            if len(key) <= 2 or key in name:
+                matches.append((int(rank), name))
+        matches.sort(key=lambda match: (len(match[1]), not match[1].startswith(key), match[0]))
+        return [int(self._order[rank]) for rank, _ in matches[:limit]]
+
+    def _fuzzy(self, key: str, limit: int) -> List[Tuple[int, float]]:
+        """2-gram Dice 계수 상위 행 (FUZZY_THRESHOLD 이상)
+
+        Dice >= t 이려면 이름이 쿼리 조각을 최소 ceil(t * (쿼리 조각 수 + 1) / 2)개 공유해야 하므로,
+        가장 드문 조각 몇 개의 역색인만 합쳐 후보를 만들고 나머지 조각은 이진 탐색으로 셉니다.
+        """
+        query = _bigrams(key)
+        lists = sorted((ranks for ranks in map(self._posting, query) if ranks is not None), key=len)
+        min_shared = math.ceil(FUZZY_THRESHOLD * (len(query) + 1) / 2)
+        if len(lists) < min_shared:
+            return []
+        candidates = np.unique(np.concatenate(lists[:len(lists) - min_shared + 1]))
+        shared = np.zeros(len(candidates), dtype=np.float32)
+        for ranks in lists:
+            positions = np.minimum(np.searchsorted(ranks, candidates), len(ranks) - 1)
+            shared += ranks[positions] == candidates
+        scores = 2 * shared / (len(query) + self._bigram_counts[candidates])
+        top = np.argsort(-scores, kind="stable")[:limit]
+        return [(int(self._order[candidates[i]]), float(scores[i])) for i in top if scores[i] >= FUZZY_THRESHOLD]
+
+    def exact(self, name: str) -> Optional[int]:
+        """식품명이 정확히 같은 첫 행 번호"""
+        return self.names.find(self._exact_sorted, name)
+
+    def lookup(self, name: str) -> Optional[Tuple[int, str]]:
+        """가장 잘 맞는 행 번호와 일치 방식 (exact / normalized / substring / fuzzy)"""
+        row = self.exact(name)
+        if row is not None:
+            return row, "exact"
+        key = normalize_name(name)
+        if not key:
+            return None
+        rank = self._normalized.find(self._norm_sorted, key)
+        if rank is not None:
+            return int(self._order[rank]), "normalized"
+        rows = self._ranked_substring(key, 1)
+        if rows:
+            return rows[0], "substring"
+        fuzzy = self._fuzzy(key, 1)
+        if fuzzy:
+            return fuzzy[0][0], "fuzzy"
+        return None
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, str, float]]:
+        """순위가 매겨진 후보 목록 [(행 번호, 일치 방식, 점수)]"""
+        key = normalize_name(query)
+        if not key:
+            return []
+        results: List[Tuple[int, str, float]] = []
+        seen = set()
+        for row in self._ranked_substring(key, limit):
+            name = self.names[row]
+            normalized = normalize_name(name)
+            match = "exact" if name == query else "normalized" if normalized == key else "substring"
+            results.append((row, match, 1.0 if match != "substring" else len(key) / max(len(normalized), 1)))
+            seen.add(row)
+        if len(results) < limit:
+            for row, score in self._fuzzy(key, limit):
+                if row not in seen and len(results) < limit:
+                    results.append((row, "fuzzy", score))
+        return results
+
+    def record(self, row: int) -> dict:
+        """행 번호 → 응답용 dict (NaN 은 None)"""
+        record = {"food_name": self.names[row]}
+        for column, value in zip(self.columns, self.values[row]):
+            record[column] = None if np.isnan(value) else float(value)
+        return record
+
+def map_labels(index: NutritionIndex, labels: Sequence[str]) -> Dict[str, Optional[dict]]:
+    """모델 클래스 라벨 → 영양 정보 (lookup 과 같은 순서로 매칭, 못 찾으면 None)
+
+    모델 로드 시 한 번 만들어 두면 분류 결과에 영양 정보를 붙일 때 검색이 필요 없습니다.
+    """
+    table: Dict[str, Optional[dict]] = {}
+    for label in labels:
+        match = index.lookup(label)
+        if match is None:
+            table[label] = None
+        else:
+            row, match_type = match
+            table[label] = {**index.record(row), "match": match_type, "source": index.source_of(row)}
+    return table
+
+def open_index(table_path: str, csv_path: str) -> NutritionIndex:
+    """컴파일된 테이블이 CSV 보다 최신이면 mmap 으로 열고, 아니면 CSV 로 메모리에서 생성
+
+    둘 다 없으면 FileNotFoundError.
+    """
+    meta_path = os.path.join(table_path, "meta.json")
+    if os.path.exists(meta_path) and (
+        not os.path.exists(csv_path) or os.path.getmtime(meta_path) >= os.path.getmtime(csv_path)
+    ):
+        return NutritionIndex.load(table_path)
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"영양 CSV 파일을 찾을 수 없습니다: {csv_path}")
+    print(f"컴파일된 영양 테이블이 없거나 CSV 보다 오래되어 CSV 로 인덱스를 만듭니다: {csv_path}")
+    print("   (python -m app.scripts.build_nutrition_table 로 미리 컴파일하면 워커 간 메모리가 공유됩니다)")
+    return NutritionIndex.from_csv(csv_path)
+
+_shared_index: Optional[NutritionIndex] = None
+
+def get_shared_index() -> NutritionIndex:
+    """프로세스 공용 인덱스 (설정의 NUTRITION_TABLE_PATH / NUTRITION_CSV_PATH, 첫 호출 시 열기)"""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = open_index(settings.NUTRITION_TABLE_PATH, settings.NUTRITION_CSV_PATH)
+    return _shared_index
@@ -0,0 +1,89 @@
+# app/services/precompiled.py
+"""내용이 바뀌지 않는 응답을 미리 직렬화/압축해 두고 그대로 내보내는 헬퍼
+
+서버 시작 시 본문 바이트, gzip(가능하면 brotli) 압축본, 강한 ETag 를 한 번 만들고,
+요청마다 Accept-Encoding 으로 변형을 고르고 If-None-Match 가 맞으면 304 를 반환합니다.
+압축본마다 내용이 다르므로 ETag 에 인코딩을 붙여 구분합니다 ("<해시>", "<해시>-gzip", "<해시>-br").
+
+brotli 패키지는 선택 사항이며, 설치되어 있지 않으면 gzip 변형만 만듭니다.
+"""
+import gzip
+import hashlib
+from typing import Dict, Optional
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 데이터는 배포 시에만 바뀌므로 하루 동안 재검증 없이 사용, 이후에는 ETag 로 재검증
+DEFAULT_CACHE_CONTROL = "public, max-age=86400"
+
+# 이보다 작은 본문은 압축 이득이 헤더 비용보다 작음
+MIN_COMPRESS_BYTES = 512
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    """Accept-Encoding → {인코딩: q 값}"""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+class PrecompiledResponse:
+    def __init__(self, body: bytes, media_type: str = "application/json", cache_control: str = DEFAULT_CACHE_CONTROL):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # 인코딩 → (본문, ETag), 선호 순서대로
+        self.variants: Dict[str, tuple] = {}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            if brotli is not None:
+                self.variants["br"] = (brotli.compress(body, quality=11), f'"{digest}-br"')
+            self.variants["gzip"] = (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gzip"')
+        self.variants["identity"] = (body, f'"{digest}"')
+        self._etags = {etag for _, etag in self.variants.values()}
+
+    def _choose(self, accept_encoding: Optional[str]) -> str:
+        if not accept_encoding:
+            return "identity"
+        accepted = _accepted_encodings(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        best, best_q = "identity", 0.0
+        for encoding in self.variants:
+            if encoding == "identity":
+                continue
+            q = accepted.get(encoding, wildcard)
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def _not_modified(self, if_none_match: Optional[str]) -> bool:
+        """If-None-Match 는 약한 비교 (W/ 접두사 무시), 어느 인코딩의 ETag 든 같은 내용"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return not tags.isdisjoint(self._etags)
+
+    def respond(self, request: Request) -> Response:
+        encoding = self._choose(request.headers.get("accept-encoding"))
+        body, etag = self.variants[encoding]
+        headers = {"ETag": etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        if self._not_modified(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=self.media_type, headers=headers)
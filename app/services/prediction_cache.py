@@ -0,0 +1,114 @@
+# app/services/prediction_cache.py
+"""업로드 이미지 → 음식 분류 결과 캐시
+
+같은 사진을 다시 올리는 경우(네트워크 재시도 등) 디코딩/추론을 건너뛰도록
+분류 결과(top-5 포함)를 두 단계로 보관합니다.
+
+    exact    업로드 바이트의 SHA-256 → 결과 (바이트가 완전히 같을 때)
+    similar  9x8 흑백 축소 이미지의 차이 해시(dHash, 64비트) → 결과 (선택)
+             다시 인코딩/메타데이터만 바뀐 사진도 해밍 거리 max_distance 이하이면 적중
+
+모든 항목은 모델 버전(모델 파일 + 라벨 파일 해시)과 함께 저장되며,
+버전이 바뀌면 캐시 전체를 비웁니다.
+"""
+import hashlib
+import io
+import os
+from typing import Any, Optional, Tuple
+import numpy as np
+from app.services.cache import TTLCache
+
+# dHash 축소 크기 (가로 9 x 세로 8 → 인접 픽셀 비교 64개)
+_HASH_SIZE = (9, 8)
+
+def image_digest(image_data: bytes) -> str:
+    return hashlib.sha256(image_data).hexdigest()
+
+def difference_hash(image_data: bytes) -> Optional[int]:
+    """64비트 dHash (오른쪽 픽셀이 더 밝으면 1, 디코딩할 수 없는 데이터면 None)
+
+    JPEG 은 draft 모드로 1/8 배율 디코딩하므로 큰 사진도 수 ms 안에 계산됩니다.
+    """
+    from PIL import Image
+    try:
+        image = Image.open(io.BytesIO(image_data))
+        if image.format == "JPEG":
+            image.draft("L", (image.width // 8 or 1, image.height // 8 or 1))
+        pixels = np.asarray(image.convert("L").resize(_HASH_SIZE, Image.Resampling.BILINEAR), dtype=np.int16)
+    except Exception:
+        return None
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+_version_cache: dict = {}
+
+def model_version(model_path: str) -> str:
+    """모델 파일과 라벨 파일 내용의 해시 (파일 크기/수정 시각이 같으면 다시 계산하지 않음)"""
+    labels_path = os.path.join(os.path.dirname(model_path), "labels_final.txt")
+    paths = [p for p in (model_path, labels_path) if os.path.exists(p)]
+    stat_key = tuple((p, os.stat(p).st_size, os.stat(p).st_mtime_ns) for p in paths)
+    version = _version_cache.get(model_path)
+    if version is None or version[0] != stat_key:
+        digest = hashlib.sha256()
+        for path in paths:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        version = (stat_key, digest.hexdigest()[:16])
+        _version_cache[model_path] = version
+    return version[1]
+
+class PredictionCache:
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 3600, similar: bool = False, max_distance: int = 4):
+        self.exact = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.similar = TTLCache(maxsize=maxsize, ttl=ttl) if similar else None
+        self.max_distance = max_distance
+        self.version: Optional[str] = None
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exact.maxsize > 0
+
+    def set_version(self, version: str) -> None:
+        """모델 버전이 바뀌었으면 캐시를 비움"""
+        if version != self.version:
+            if self.version is not None:
+                self.invalidations += 1
+            self.exact.clear()
+            if self.similar is not None:
+                self.similar.clear()
+            self.version = version
+
+    def get(self, digest: str) -> Optional[Any]:
+        return self.exact.get(digest)
+
+    def get_similar(self, dhash: int) -> Optional[Tuple[Any, int]]:
+        """해밍 거리가 가장 가까운 항목의 결과와 거리 (max_distance 초과면 None)"""
+        if self.similar is None:
+            return None
+        key, distance = dhash, 0
+        keys = self.similar.keys()
+        if keys:
+            distances = np.bitwise_count(np.array(keys, dtype=np.uint64) ^ np.uint64(dhash))
+            nearest = int(np.argmin(distances))
+            if distances[nearest] <= self.max_distance:
+                key, distance = keys[nearest], int(distances[nearest])
+        # 적중/미스가 한 번만 집계되도록 조회는 한 번
+        result = self.similar.get(key)
+        return (result, distance) if result is not None else None
+
+    def set(self, digest: str, result: Any, dhash: Optional[int] = None) -> None:
+        self.exact.set(digest, result)
+        if self.similar is not None and dhash is not None:
+            self.similar.set(dhash, result)
+
+    def stats(self) -> dict:
+        stats = {
+            "model_version": self.version,
+            "invalidations": self.invalidations,
+            "exact": self.exact.stats()
+        }
+        if self.similar is not None:
+            stats["similar"] = {**self.similar.stats(), "max_distance": self.max_distance}
+        return stats
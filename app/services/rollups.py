@@ -0,0 +1,89 @@
+# app/services/rollups.py
+"""사용자별 일간 집계(rollup) 문서 계산
+
+daily_rollups/{user_id}_{YYYY-MM-DD} 문서 하나에 그날의 식단/혈당 합계와 개수를 보관합니다.
+혈당·식단이 생성/수정/삭제될 때 이 모듈이 만든 증감분(delta)을 같은 배치에서 반영하므로
+/stats 는 원본 기록 대신 기간 내 일간 문서(최대 31개)만 읽으면 됩니다.
+
+문서 구조:
+    {
+        "user_id": str, "date": str,
+        "meals": {"count", "calories", "carbs", "protein", "fat"},
+        "blood_sugar": {
+            "count", "sum",
+            "meal_types": {"기상직후": {"count", "sum"}, ...},
+            "time_periods": {"06:00-09:00": {"count", "sum"}, ...}
+        }
+    }
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+MEAL_TYPES = ["기상직후", "아침", "점심", "저녁"]
+
+# (시작 시, 종료 시, 라벨) - 범위에 들지 않는 시간(00~06시 포함)은 마지막 구간으로 집계
+TIME_PERIODS = [
+    (6, 9, "06:00-09:00"),
+    (9, 12, "09:00-12:00"),
+    (12, 15, "12:00-15:00"),
+    (15, 18, "15:00-18:00"),
+    (18, 21, "18:00-21:00"),
+    (21, 24, "21:00-24:00"),
+]
+
+NUTRIENTS = ["calories", "carbs", "protein", "fat"]
+
+def rollup_id(user_id: str, date: str) -> str:
+    return f"{user_id}_{date}"
+
+def time_period_for(time_str: Optional[str]) -> str:
+    """HH:MM 문자열을 시간대 라벨로 변환"""
+    hour = int((time_str or "00:00").split(":")[0])
+    for start, end, label in TIME_PERIODS:
+        if start <= hour < end:
+            return label
+    return TIME_PERIODS[-1][2]
+
+def dates_between(start_date: str, end_date: str) -> List[str]:
+    """start_date ~ end_date (포함) 사이의 YYYY-MM-DD 목록"""
+    current = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    dates = []
+    while current <= end:
+        dates.append(current.strftime("%Y-%m-%d"))
+        current += timedelta(days=1)
+    return dates
+
+def blood_sugar_delta(reading: Dict[str, Any], sign: int = 1) -> Dict[str, Any]:
+    """혈당 기록 1건이 일간 집계에 더하는(sign=-1이면 빼는) 값"""
+    value = sign * (reading.get("blood_sugar") or 0)
+    bucket = {"count": sign, "sum": value}
+    delta = {
+        "count": sign,
+        "sum": value,
+        "time_periods": {time_period_for(reading.get("time")): dict(bucket)}
+    }
+    if reading.get("meal_type") in MEAL_TYPES:
+        delta["meal_types"] = {reading["meal_type"]: dict(bucket)}
+    return {"blood_sugar": delta}
+
+def meal_delta(meal: Dict[str, Any], sign: int = 1) -> Dict[str, Any]:
+    """식단 1건이 일간 집계에 더하는(sign=-1이면 빼는) 값"""
+    analysis = meal.get("analysis") or {}
+    delta = {"count": sign}
+    for nutrient in NUTRIENTS:
+        delta[nutrient] = sign * (analysis.get(nutrient) or 0)
+    return {"meals": delta}
+
+def merge_delta(target: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """중첩된 증감분을 target에 더함 (target 반환)"""
+    for key, value in delta.items():
+        if isinstance(value, dict):
+            merge_delta(target.setdefault(key, {}), value)
+        else:
+            target[key] = target.get(key, 0) + value
+    return target
+
+def add_delta(deltas: Dict[str, Dict[str, Any]], date: str, delta: Dict[str, Any]) -> None:
+    """날짜별 증감분 모음에 delta를 누적"""
+    merge_delta(deltas.setdefault(date, {}), delta)
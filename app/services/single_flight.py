@@ -0,0 +1,42 @@
+# app/services/single_flight.py
+"""같은 키의 동시 비동기 호출을 한 번의 실행으로 합치는 single-flight
+
+먼저 들어온 호출이 작업을 태스크로 시작하고, 작업이 끝나기 전에 같은 키로 들어온
+호출은 그 태스크의 결과(또는 예외)를 함께 받습니다. 작업은 shield 로 기다리므로
+먼저 호출한 요청의 연결이 끊겨도 나머지 요청을 위해 끝까지 실행됩니다.
+결과는 보관하지 않으며, 작업이 끝난 뒤 들어온 호출은 새로 실행합니다.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """key 로 진행 중인 작업이 있으면 그 결과를, 없으면 fn() 을 실행해 결과 반환"""
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 기다리던 호출이 모두 취소된 경우에도 "예외 미회수" 경고가 나지 않도록 확인
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.calls - self.executions,
+            "inflight": len(self._inflight)
+        }
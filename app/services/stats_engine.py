@@ -0,0 +1,248 @@
+# app/services/stats_engine.py
+"""혈당/영양 기록 열(column) 단위 통계 엔진
+
+기록(dict) 목록을 한 번만 순회해 NumPy 배열로 변환한 뒤
+모든 집계를 bincount / digitize / 마스크 연산으로 계산합니다.
+
+혈당 (ReadingColumns)
+    values     float64  혈당 수치 (없으면 0)
+    days       int64    날짜 서수 (1970-01-01 기준 일수, 날짜가 없으면 NO_DAY)
+    minutes    int16    하루 중 분 (00:00 = 0, 시간이 없거나 잘못되면 0)
+    meal_types int8     rollups.MEAL_TYPES 인덱스 (해당 없으면 -1)
+
+영양 (MealColumns, 식단 기록 또는 일간 집계 문서의 meals 필드)
+    counts     int64    식단 수 (기록이면 1, 집계 문서면 meals.count)
+    days       int64    날짜 서수 (ReadingColumns 와 같음)
+    nutrients  float64  (N, len(rollups.NUTRIENTS)) 영양소 합계 (없으면 0)
+
+시간대/식사 타입 구분은 rollups 모듈과 같은 정의를 사용하므로
+일간 집계 문서와 원본 기록으로 계산한 값이 일치합니다.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+from app.services import rollups
+
+MEAL_TYPE_CODES = {meal_type: code for code, meal_type in enumerate(rollups.MEAL_TYPES)}
+
+# 시(0~23) → rollups.TIME_PERIODS 인덱스. digitize 결과 0(06시 이전)은 마지막 구간으로 집계
+_PERIOD_LABELS = [label for _, _, label in rollups.TIME_PERIODS]
+_HOUR_TO_PERIOD = np.digitize(np.arange(24), [start for start, _, _ in rollups.TIME_PERIODS]) - 1
+_HOUR_TO_PERIOD[_HOUR_TO_PERIOD < 0] = len(_PERIOD_LABELS) - 1
+
+NO_DAY = np.iinfo(np.int64).min
+_EPOCH = date(1970, 1, 1)
+
+class ReadingColumns:
+    """혈당 기록의 열 단위 표현"""
+
+    __slots__ = ("values", "days", "minutes", "meal_types")
+
+    def __init__(self, values: np.ndarray, days: np.ndarray, minutes: np.ndarray, meal_types: np.ndarray):
+        self.values = values
+        self.days = days
+        self.minutes = minutes
+        self.meal_types = meal_types
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "ReadingColumns":
+        """기록 목록을 한 번 순회해 열 배열로 변환"""
+        records = records if isinstance(records, list) else list(records)
+        values = np.fromiter((r.get("blood_sugar") or 0 for r in records), dtype=np.float64, count=len(records))
+        meal_types = np.fromiter(
+            (MEAL_TYPE_CODES.get(r.get("meal_type"), -1) for r in records), dtype=np.int8, count=len(records)
+        )
+        days = _day_ordinals([r.get("date") for r in records])
+        minutes = _minutes_of_day([r.get("time") for r in records])
+        return cls(values, days, minutes, meal_types)
+
+class MealColumns:
+    """식단 영양 정보의 열 단위 표현"""
+
+    __slots__ = ("counts", "days", "nutrients")
+
+    def __init__(self, counts: np.ndarray, days: np.ndarray, nutrients: np.ndarray):
+        self.counts = counts
+        self.days = days
+        self.nutrients = nutrients
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @classmethod
+    def from_records(cls, meals: Iterable[Dict[str, Any]]) -> "MealColumns":
+        """식단 기록(analysis 필드) 목록 → 열 배열 (기록마다 식단 1개)"""
+        meals = meals if isinstance(meals, list) else list(meals)
+        return cls._build(meals, [1] * len(meals), [m.get("analysis") or {} for m in meals])
+
+    @classmethod
+    def from_rollups(cls, daily_rollups: Iterable[Dict[str, Any]]) -> "MealColumns":
+        """일간 집계 문서(meals 필드) 목록 → 열 배열 (문서마다 그날의 식단 수/영양소 합계)"""
+        daily_rollups = daily_rollups if isinstance(daily_rollups, list) else list(daily_rollups)
+        totals = [r.get("meals") or {} for r in daily_rollups]
+        return cls._build(daily_rollups, [t.get("count") or 0 for t in totals], totals)
+
+    @classmethod
+    def _build(cls, records: List[Dict[str, Any]], counts: List[int], nutrient_sources: List[Dict[str, Any]]) -> "MealColumns":
+        nutrients = np.fromiter(
+            (source.get(nutrient) or 0 for source in nutrient_sources for nutrient in rollups.NUTRIENTS),
+            dtype=np.float64, count=len(records) * len(rollups.NUTRIENTS)
+        ).reshape(len(records), len(rollups.NUTRIENTS))
+        days = _day_ordinals([r.get("date") for r in records])
+        return cls(np.array(counts, dtype=np.int64), days, nutrients)
+
+def _day_ordinals(dates: List[Optional[str]]) -> np.ndarray:
+    """YYYY-MM-DD 문자열 → 1970-01-01 기준 일수
+
+    모두 0을 채운 ISO 형식이면 한 번에 변환하고, 아니면("2024-1-5" 등) 하나씩 다시 해석하며
+    해석할 수 없는 값은 NO_DAY 로 둡니다.
+    """
+    try:
+        parsed = np.array([d or "NaT" for d in dates], dtype="datetime64[D]")
+    except ValueError:
+        return np.fromiter((_parse_day(d) for d in dates), dtype=np.int64, count=len(dates))
+    days = parsed.astype(np.int64)
+    days[np.isnat(parsed)] = NO_DAY
+    return days
+
+def _parse_day(date_str: Optional[str]) -> int:
+    try:
+        return (datetime.strptime(date_str, "%Y-%m-%d").date() - _EPOCH).days
+    except (TypeError, ValueError):
+        return NO_DAY
+
+def _minutes_of_day(times: List[Optional[str]]) -> np.ndarray:
+    """HH:MM 문자열 → 하루 중 분
+
+    앞 5바이트를 uint8 행렬로 보고 숫자 자리를 한 번에 계산하며,
+    형식이 다른 값("8:30" 등)만 파이썬으로 다시 해석합니다.
+    """
+    raw = np.array([t or "00:00" for t in times], dtype="S5")
+    if not len(raw):
+        return np.zeros(0, dtype=np.int16)
+    chars = raw.view(np.uint8).reshape(-1, 5).astype(np.int16) - ord("0")
+    digits = chars[:, [0, 1, 3, 4]]
+    valid = (chars[:, 2] == ord(":") - ord("0")) & ((digits >= 0) & (digits <= 9)).all(axis=1)
+    minutes = (digits[:, 0] * 10 + digits[:, 1]) * 60 + digits[:, 2] * 10 + digits[:, 3]
+    for i in np.flatnonzero(~valid):
+        minutes[i] = _parse_minutes(times[i])
+    return minutes
+
+def _parse_minutes(time_str: Optional[str]) -> int:
+    try:
+        hour, _, minute = (time_str or "00:00").partition(":")
+        return int(hour) * 60 + int(minute[:2] or 0)
+    except ValueError:
+        return 0
+
+def _grouped(codes: np.ndarray, values: np.ndarray, labels: List[str]) -> Dict[str, Dict[str, float]]:
+    """코드별 개수/합계/평균 (코드 < 0 은 제외)"""
+    mask = codes >= 0
+    counts = np.bincount(codes[mask], minlength=len(labels))
+    sums = np.bincount(codes[mask], weights=values[mask], minlength=len(labels))
+    return {
+        label: {"count": int(counts[i]), "sum": float(sums[i]), "average": float(sums[i] / counts[i]) if counts[i] else 0.0}
+        for i, label in enumerate(labels)
+    }
+
+def time_period_codes(cols: ReadingColumns) -> np.ndarray:
+    """rollups.TIME_PERIODS 인덱스 (06시 이전과 24시 이후 값은 마지막 구간)"""
+    hours = cols.minutes // 60
+    return np.where(hours < 24, _HOUR_TO_PERIOD[np.minimum(hours, 23)], len(_PERIOD_LABELS) - 1)
+
+def meal_type_stats(cols: ReadingColumns) -> Dict[str, Dict[str, float]]:
+    return _grouped(cols.meal_types.astype(np.int64), cols.values, rollups.MEAL_TYPES)
+
+def time_period_stats(cols: ReadingColumns) -> Dict[str, Dict[str, float]]:
+    return _grouped(time_period_codes(cols), cols.values, _PERIOD_LABELS)
+
+def masked_mean(cols: ReadingColumns, meal_types: List[str]) -> float:
+    """지정한 식사 타입 기록의 평균 (없으면 0)"""
+    mask = np.isin(cols.meal_types, [MEAL_TYPE_CODES[m] for m in meal_types])
+    return float(cols.values[mask].mean()) if mask.any() else 0.0
+
+def daily_stats(cols: ReadingColumns) -> List[Dict[str, Any]]:
+    """날짜별 개수/평균 (날짜 오름차순, 날짜 없는 기록 제외)
+
+    기록 기간은 길어야 수년이므로 정렬(np.unique) 대신 첫 날짜 기준 오프셋으로 bincount 합니다.
+    """
+    days = cols.days[cols.days != NO_DAY]
+    if not len(days):
+        return []
+    first_day = days.min()
+    offsets = days - first_day
+    counts = np.bincount(offsets)
+    sums = np.bincount(offsets, weights=cols.values[cols.days != NO_DAY])
+    present = np.flatnonzero(counts)
+    dates = (present + first_day).astype("datetime64[D]").astype(str)
+    return [
+        {"date": str(date), "count": int(counts[i]), "average": float(sums[i] / counts[i])}
+        for date, i in zip(dates, present)
+    ]
+
+def unique_day_count(cols: ReadingColumns) -> int:
+    days = cols.days[cols.days != NO_DAY]
+    return int(np.count_nonzero(np.bincount(days - days.min()))) if len(days) else 0
+
+def latest_indices(cols: ReadingColumns, k: int) -> np.ndarray:
+    """(날짜, 시간) 기준 최근 k개 기록의 인덱스 (최신순)"""
+    if not len(cols) or k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    # 날짜 없는 기록은 NO_DAY 이므로 자연히 가장 오래된 것으로 취급
+    keys = np.where(cols.days != NO_DAY, cols.days * 1440 + cols.minutes, NO_DAY)
+    if k < len(keys):
+        top = np.argpartition(keys, len(keys) - k)[-k:]
+    else:
+        top = np.arange(len(keys))
+    return top[np.argsort(keys[top], kind="stable")[::-1]]
+
+def summarize(cols: ReadingColumns) -> Dict[str, Any]:
+    """전체/식사 타입별/시간대별/일별 통계를 한 번에 계산"""
+    if not len(cols):
+        return {
+            "count": 0, "average": 0.0, "max": 0.0, "min": 0.0,
+            "average_fasting": 0.0, "average_before_meal": 0.0,
+            "meal_types": meal_type_stats(cols), "time_periods": time_period_stats(cols), "daily": []
+        }
+    return {
+        "count": len(cols),
+        "average": float(cols.values.mean()),
+        "max": float(cols.values.max()),
+        "min": float(cols.values.min()),
+        # 공복/식전 혈당 구분 (간단한 로직)
+        "average_fasting": masked_mean(cols, ["기상직후"]),
+        "average_before_meal": masked_mean(cols, ["아침", "점심", "저녁"]),
+        "meal_types": meal_type_stats(cols),
+        "time_periods": time_period_stats(cols),
+        "daily": daily_stats(cols)
+    }
+
+def nutrition_daily(cols: MealColumns) -> List[Dict[str, Any]]:
+    """날짜별 식단 수와 영양소 합계 (날짜 오름차순, 식단이 없는 날과 날짜 없는 기록 제외)"""
+    dated = cols.days != NO_DAY
+    days = cols.days[dated]
+    if not len(days):
+        return []
+    first_day = days.min()
+    offsets = days - first_day
+    counts = np.bincount(offsets, weights=cols.counts[dated])
+    sums = [np.bincount(offsets, weights=cols.nutrients[dated, i]) for i in range(len(rollups.NUTRIENTS))]
+    present = np.flatnonzero(counts > 0)
+    dates = (present + first_day).astype("datetime64[D]").astype(str)
+    return [
+        {"date": str(date), "count": int(counts[i]), **{n: float(sums[j][i]) for j, n in enumerate(rollups.NUTRIENTS)}}
+        for date, i in zip(dates, present)
+    ]
+
+def nutrition_summary(cols: MealColumns) -> Dict[str, Any]:
+    """전체 식단 수/영양소 합계와 일별 합계를 한 번에 계산 (식단 수가 0 이하인 행은 제외)"""
+    present = cols.counts > 0
+    totals = cols.nutrients[present].sum(axis=0)
+    return {
+        "count": int(cols.counts[present].sum()),
+        "totals": {nutrient: float(totals[i]) for i, nutrient in enumerate(rollups.NUTRIENTS)},
+        "daily": nutrition_daily(cols)
+    }
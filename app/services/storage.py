@@ -0,0 +1,58 @@
+# app/services/storage.py
+"""문서 저장소 백엔드 선택
+
+firestore_repository 의 모든 함수(즉 모든 라우터)는 get_client() 가 돌려주는 클라이언트로 읽고 씁니다.
+백엔드는 firestore_async.client() 와 같은 API(collection/document/where/order_by/limit/select/
+start_after/stream/batch)를 제공하며 두 가지가 있습니다.
+
+    firestore  Firebase Firestore
+    memory     프로세스 내 인덱스 저장소 (app/services/memory_store.py, MEMORY_STORE_PATH 로 SQLite 보존)
+
+STORAGE_BACKEND=auto 이면 DEV_MODE 에서는 memory, 그 외에는 firestore 를 사용하므로
+개발 모드에서도 라우터/집계/페이지네이션 코드는 운영과 같은 경로로 실행됩니다.
+"""
+from app.config import settings
+
+BACKENDS = ("firestore", "memory")
+
+# memory 백엔드 클라이언트 (또는 use() 로 지정한 클라이언트)
+_client = None
+
+def backend_name() -> str:
+    """설정에 따른 백엔드 이름 (알 수 없는 값이면 ValueError)"""
+    backend = settings.STORAGE_BACKEND
+    if backend == "auto":
+        return "memory" if settings.DEV_MODE else "firestore"
+    if backend not in BACKENDS:
+        raise ValueError(f"알 수 없는 저장소 백엔드: {backend} (사용 가능: auto, {', '.join(BACKENDS)})")
+    return backend
+
+def get_client():
+    """현재 백엔드의 비동기 클라이언트 (memory 는 처음 호출할 때 생성)"""
+    global _client
+    if _client is not None:
+        return _client
+    if backend_name() == "memory":
+        from app.services.memory_store import MemoryClient
+        _client = MemoryClient(settings.MEMORY_STORE_PATH or None)
+        return _client
+    from app.firebase_config import get_async_firestore_db
+    return get_async_firestore_db()
+
+def use(client) -> None:
+    """설정과 상관없이 client 를 저장소로 사용 (벤치마크/스크립트용, None 이면 설정대로 되돌림)"""
+    global _client
+    _client = client
+
+def close() -> None:
+    """memory 백엔드의 남은 쓰기를 SQLite 에 기록하고 닫음"""
+    global _client
+    if _client is not None and hasattr(_client, "close"):
+        _client.close()
+    _client = None
+
+def get_stats() -> dict:
+    client = _client
+    if client is None or not hasattr(client, "stats"):
+        return {"backend": backend_name()}
+    return {"backend": "memory", **client.stats()}
@@ -1,24 +1,109 @@
 import numpy as np
-from PIL import Image
+import importlib
 import io
-import tensorflow as tf
 import os
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# 인터프리터 모듈 후보 (앞에서부터 시도). TensorFlow 전체는 수백 MB 이고 import 에 수 초가
+# 걸리므로 독립 인터프리터 패키지가 없을 때만 사용합니다.
+INTERPRETER_BACKENDS = {
+    "litert": ("ai_edge_litert.interpreter", "Interpreter"),
+    "tflite_runtime": ("tflite_runtime.interpreter", "Interpreter"),
+    "tensorflow": ("tensorflow", "lite.Interpreter"),
+}
+
+_interpreter_classes: dict = {}
+
+def load_interpreter_class(backend: str = "auto") -> tuple:
+    """(사용한 패키지 이름, Interpreter 클래스) - 첫 모델 로드 시 import, auto 면 가벼운 패키지 우선"""
+    if backend in _interpreter_classes:
+        return _interpreter_classes[backend]
+    if backend != "auto" and backend not in INTERPRETER_BACKENDS:
+        raise ValueError(f"알 수 없는 인터프리터: {backend} (auto, {', '.join(INTERPRETER_BACKENDS)})")
+    names = list(INTERPRETER_BACKENDS) if backend == "auto" else [backend]
+    errors = []
+    for name in names:
+        module_name, attribute_path = INTERPRETER_BACKENDS[name]
+        try:
+            interpreter_class = importlib.import_module(module_name)
+        except ImportError as e:
+            errors.append(f"{name}: {str(e)}")
+            continue
+        for attribute in attribute_path.split("."):
+            interpreter_class = getattr(interpreter_class, attribute)
+        _interpreter_classes[backend] = (name, interpreter_class)
+        return _interpreter_classes[backend]
+    raise ImportError("TFLite 인터프리터를 찾을 수 없습니다 (ai-edge-litert, tflite-runtime 또는 tensorflow 설치 필요) - " + "; ".join(errors))
+
+def load_class_names(model_path: str) -> list:
+    """클래스 이름 TXT 파일 로드"""
+    try:
+        # 모델 파일과 같은 디렉토리에서 labels_final.txt 찾기
+        model_dir = os.path.dirname(model_path)
+        class_names_path = os.path.join(model_dir, "labels_final.txt")
+        
+        if os.path.exists(class_names_path):
+            with open(class_names_path, 'r', encoding='utf-8') as f:
+                # 각 줄을 읽어서 리스트로 변환
+                class_names = [line.strip() for line in f.readlines() if line.strip()]
+            print(f"클래스 이름 로드 완료: {class_names_path}")
+            return class_names
+        else:
+            print(f"클래스 이름 파일을 찾을 수 없음: {class_names_path}")
+            # 기본 클래스 이름 반환 (인덱스 기반)
+            return [f"음식_{i}" for i in range(100)]
+            
+    except Exception as e:
+        print(f"클래스 이름 로드 실패: {str(e)}")
+        # 기본 클래스 이름 반환
+        return [f"음식_{i}" for i in range(100)]
+
+def padded_batch_sizes(max_batch: int) -> List[int]:
+    """배치를 채워 맞출 크기 목록: max_batch 미만의 2의 거듭제곱 + max_batch (예: 8 → [1, 2, 4, 8], 6 → [1, 2, 4, 6])"""
+    max_batch = max(1, max_batch)
+    sizes = []
+    size = 1
+    while size < max_batch:
+        sizes.append(size)
+        size *= 2
+    return sizes + [max_batch]
 
 class TFLiteModel:
-    def __init__(self, model_path: str):
-        """TFLite 모델 초기화"""
+    def __init__(self, model_path: str, num_threads: Optional[int] = None, max_batch: Optional[int] = None):
+        """TFLite 모델 초기화
+        
+        num_threads: 인터프리터 연산 스레드 수 (None 이면 기본값)
+        max_batch: 한 번에 추론하는 최대 배치 크기 (None 이면 ML_MAX_BATCH_SIZE)
+        
+        배치는 padded_batch_sizes() 크기 중 하나로 채워 추론하고, 크기마다 텐서를 할당한
+        인터프리터를 처음 쓸 때 만들어 재사용하므로 배치 크기가 바뀌어도 다시 할당하지 않습니다.
+        """
         try:
-            self.interpreter = tf.lite.Interpreter(model_path=model_path)
+            from app.config import settings
+            self.interpreter_backend, self._interpreter_class = load_interpreter_class(settings.ML_INTERPRETER)
+            self.model_path = model_path
+            self.num_threads = num_threads
+            self.interpreter = self._interpreter_class(model_path=model_path, num_threads=num_threads)
             self.interpreter.allocate_tensors()
             
             # 입력/출력 정보 가져오기
             self.input_details = self.interpreter.get_input_details()
             self.output_details = self.interpreter.get_output_details()
+            self.batch_sizes = padded_batch_sizes(settings.ML_MAX_BATCH_SIZE if max_batch is None else max_batch)
+            # 배치 크기 → (인터프리터, 입력 정보, 출력 정보)
+            self._runners: Dict[int, tuple] = {
+                int(self.input_details[0]['shape'][0]): (self.interpreter, self.input_details, self.output_details)
+            }
+            self._padded: Dict[int, np.ndarray] = {}
+            self._batch_resizable = True
 
             # 클래스 이름 TXT 파일 로드
-            self.class_names = self._load_class_names(model_path)
+            self.class_names = load_class_names(model_path)
             
-            print(f"모델 로드 완료: {model_path}")
+            print(f"모델 로드 완료: {model_path} ({self.interpreter_backend})")
             print(f"입력 형태: {self.input_details[0]['shape']}")
             print(f"출력 형태: {self.output_details[0]['shape']}")
             print(f"클래스 수: {len(self.class_names)}")
@@ -27,113 +112,232 @@ class TFLiteModel:
             print(f"모델 로드 실패: {str(e)}")
             raise e
     
-    def _load_class_names(self, model_path: str) -> list:
-        """클래스 이름 TXT 파일 로드"""
-        try:
-            # 모델 파일과 같은 디렉토리에서 labels_final.txt 찾기
-            model_dir = os.path.dirname(model_path)
-            class_names_path = os.path.join(model_dir, "labels_final.txt")
-            
-            if os.path.exists(class_names_path):
-                with open(class_names_path, 'r', encoding='utf-8') as f:
-                    # 각 줄을 읽어서 리스트로 변환
-                    class_names = [line.strip() for line in f.readlines() if line.strip()]
-                print(f"클래스 이름 로드 완료: {class_names_path}")
-                return class_names
+    @property
+    def input_size(self) -> tuple:
+        """모델 입력 이미지 크기 (너비, 높이)"""
+        shape = self.input_details[0]['shape']
+        return int(shape[2]), int(shape[1])
+    
+    def _input_buffer(self, batch_size: int) -> np.ndarray:
+        """재사용하는 입력 텐서 버퍼 (N, H, W, C) - 필요할 때만 더 크게 다시 할당"""
+        buffer = getattr(self, '_buffer', None)
+        if buffer is None or len(buffer) < batch_size:
+            shape = tuple(int(d) for d in self.input_details[0]['shape'][1:])
+            buffer = np.empty((batch_size,) + shape, dtype=self.input_details[0]['dtype'])
+            self._buffer = buffer
+        return buffer[:batch_size]
+    
+    def _decode(self, image_data: bytes, size: tuple) -> "Image.Image":
+        """이미지 디코딩 + RGB 변환 + 리사이즈
+        
+        JPEG 은 draft 모드로 디코딩 단계에서 목표 크기 이상을 유지하는 가장 작은
+        배율(1/2, 1/4, 1/8)로 줄여 읽으므로 휴대폰 사진도 전체 해상도로 풀지 않습니다.
+        """
+        from PIL import Image
+        image = Image.open(io.BytesIO(image_data))
+        if image.format == 'JPEG':
+            image.draft('RGB', size)
+        
+        # RGB로 변환
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        
+        # 리사이즈
+        if image.size != size:
+            image = image.resize(size)
+        return image
+    
+    def _write_input(self, image: "Image.Image", out: np.ndarray) -> None:
+        """이미지를 모델 입력 형식으로 out (H, W, C) 에 직접 기록"""
+        pixels = np.asarray(image)
+        if out.dtype == np.uint8 or out.dtype == np.int8:
+            # 양자화 모델: 실수값(0~1) = (q - zero_point) * scale
+            scale, zero_point = self.input_details[0].get('quantization', (0.0, 0))
+            if not scale or (abs(scale * 255 - 1) < 1e-6 and zero_point == (0 if out.dtype == np.uint8 else -128)):
+                # 0~255 를 그대로 쓰는 모델 (int8 은 -128 이동)
+                if out.dtype == np.uint8:
+                    out[...] = pixels
+                else:
+                    np.subtract(pixels, 128, out=out, dtype=np.int16, casting='unsafe')
             else:
-                print(f"클래스 이름 파일을 찾을 수 없음: {class_names_path}")
-                # 기본 클래스 이름 반환 (인덱스 기반)
-                return [f"음식_{i}" for i in range(100)]
-                
-        except Exception as e:
-            print(f"클래스 이름 로드 실패: {str(e)}")
-            # 기본 클래스 이름 반환
-            return [f"음식_{i}" for i in range(100)]
+                info = np.iinfo(out.dtype)
+                quantized = np.rint(pixels / (255.0 * scale) + zero_point)
+                np.clip(quantized, info.min, info.max, out=quantized)
+                out[...] = quantized
+        else:
+            # 0-1 정규화 (새 배열을 만들지 않고 버퍼에 바로 계산)
+            np.divide(pixels, out.dtype.type(255), out=out)
     
-    def preprocess_image(self, image_data: bytes, target_size: tuple = (224, 224)):
-        """이미지 전처리"""
+    def preprocess_image(self, image_data: bytes, target_size: Optional[tuple] = None):
+        """이미지 전처리 → (1, H, W, C) 입력 배열 (target_size 기본값: 모델 입력 크기)"""
         try:
-            # 바이트 데이터를 PIL Image로 변환
-            image = Image.open(io.BytesIO(image_data))
-            
-            # RGB로 변환
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # 리사이즈
-            image = image.resize(target_size)
-            
-            # numpy 배열로 변환 및 정규화
-            image_array = np.array(image, dtype=np.float32)
-            image_array = image_array / 255.0  # 0-1 정규화
-            
-            # 배치 차원 추가
-            image_array = np.expand_dims(image_array, axis=0)
-            
+            size = target_size or self.input_size
+            image = self._decode(image_data, size)
+            image_array = np.empty((1, size[1], size[0], 3), dtype=self.input_details[0]['dtype'])
+            self._write_input(image, image_array[0])
             return image_array
             
         except Exception as e:
             print(f"이미지 전처리 실패: {str(e)}")
             raise e
     
+    def _padded_size(self, count: int) -> int:
+        """count 개를 담을 수 있는 가장 작은 배치 크기 (최대 배치 크기를 넘으면 최대 크기)"""
+        for size in self.batch_sizes:
+            if size >= count:
+                return size
+        return self.batch_sizes[-1]
+    
+    def _runner(self, batch_size: int) -> Optional[tuple]:
+        """배치 크기 batch_size 용 (인터프리터, 입력 정보, 출력 정보) - 처음 요청될 때 생성 (변경 불가 모델이면 None)"""
+        runner = self._runners.get(batch_size)
+        if runner is not None or not self._batch_resizable:
+            return runner
+        try:
+            interpreter = self._interpreter_class(model_path=self.model_path, num_threads=self.num_threads)
+            input_detail = interpreter.get_input_details()[0]
+            shape = list(input_detail['shape'])
+            shape[0] = batch_size
+            interpreter.resize_tensor_input(input_detail['index'], shape)
+            interpreter.allocate_tensors()
+        except Exception as e:
+            print(f"배치 크기 변경 불가, 1개씩 추론합니다: {str(e)}")
+            self._batch_resizable = False
+            return None
+        runner = (interpreter, interpreter.get_input_details(), interpreter.get_output_details())
+        self._runners[batch_size] = runner
+        return runner
+    
+    def _invoke(self, runner: tuple, batch: np.ndarray) -> np.ndarray:
+        interpreter, input_details, output_details = runner
+        interpreter.set_tensor(input_details[0]['index'], batch)
+        interpreter.invoke()
+        return self._dequantize(interpreter.get_tensor(output_details[0]['index']))
+    
+    def _infer_padded(self, padded: np.ndarray, count: int) -> Optional[np.ndarray]:
+        """batch_sizes 크기로 채운 padded 중 앞 count 개의 결과 (배치 추론 불가 모델이면 None)"""
+        runner = self._runner(len(padded))
+        if runner is None:
+            return None
+        return self._invoke(runner, padded)[:count]
+    
+    def infer_batch(self, batch: np.ndarray) -> np.ndarray:
+        """전처리된 이미지 묶음 (N, H, W, C) 추론 → 확률 배열 (N, 클래스 수)
+        
+        N 은 batch_sizes 크기로 채워(남는 자리는 이전 값 그대로) 추론한 뒤 앞 N 개만 돌려주며,
+        최대 배치 크기보다 크면 나눠서 추론합니다.
+        인터프리터는 스레드 안전하지 않으므로 한 번에 한 스레드에서만 호출해야 합니다.
+        """
+        outputs = []
+        step = self.batch_sizes[-1]
+        for start in range(0, len(batch), step):
+            chunk = batch[start:start + step]
+            size = self._padded_size(len(chunk))
+            if size != len(chunk):
+                padded = self._padded.get(size)
+                if padded is None:
+                    padded = self._padded[size] = np.zeros((size,) + chunk.shape[1:], dtype=chunk.dtype)
+                padded[:len(chunk)] = chunk
+                chunk_outputs = self._infer_padded(padded, len(chunk))
+            else:
+                chunk_outputs = self._infer_padded(chunk, len(chunk))
+            if chunk_outputs is None:
+                return self._infer_one_by_one(batch)
+            outputs.append(chunk_outputs)
+        return outputs[0] if len(outputs) == 1 else np.concatenate(outputs)
+    
+    def _infer_one_by_one(self, batch: np.ndarray) -> np.ndarray:
+        """배치 크기를 바꿀 수 없는 모델은 원래 입력 크기(1)로 1개씩 추론"""
+        runner = (self.interpreter, self.input_details, self.output_details)
+        return np.stack([self._invoke(runner, item[np.newaxis])[0] for item in batch])
+    
+    def _dequantize(self, output: np.ndarray) -> np.ndarray:
+        """양자화 모델의 정수 출력을 확률(실수)로 변환 (인터프리터 버퍼와 분리된 복사본 반환)"""
+        if np.issubdtype(output.dtype, np.integer):
+            scale, zero_point = self.output_details[0].get('quantization', (0.0, 0))
+            if scale:
+                return (output.astype(np.float32) - zero_point) * np.float32(scale)
+        return np.array(output, dtype=np.float32)
+    
+    def format_prediction(self, probabilities: np.ndarray) -> dict:
+        return format_prediction(probabilities, self.class_names)
+    
+    def infer_images(self, images: List[bytes]) -> List[Union[np.ndarray, Exception]]:
+        """이미지 여러 장을 전처리 후 한 번에 추론
+        
+        이미지별 결과는 확률 배열이며, 전처리에 실패한 이미지는 해당 예외를 담아
+        나머지 이미지의 추론에 영향을 주지 않습니다.
+        """
+        outputs: List[Union[np.ndarray, Exception]] = [None] * len(images)
+        # 채울 자리까지 포함한 크기로 받아 두면 배치를 복사하지 않고 바로 추론
+        buffer = self._input_buffer(max(len(images), self._padded_size(len(images))))
+        decoded = []
+        for i, image_data in enumerate(images):
+            try:
+                # 성공한 이미지만 버퍼 앞쪽부터 채움
+                self._write_input(self._decode(image_data, self.input_size), buffer[len(decoded)])
+                decoded.append(i)
+            except Exception as e:
+                print(f"이미지 전처리 실패: {str(e)}")
+                outputs[i] = e
+        if decoded:
+            count = len(decoded)
+            size = self._padded_size(count)
+            probabilities = self._infer_padded(buffer[:size], count) if size >= count else None
+            if probabilities is None:
+                probabilities = self.infer_batch(buffer[:count])
+            for i, row in zip(decoded, probabilities):
+                outputs[i] = row
+        return outputs
+    
     def predict(self, image_data: bytes):
         """예측 수행"""
         try:
-            # 이미지 전처리
+            # 이미지 전처리 후 배치 1개로 추론
             input_data = self.preprocess_image(image_data)
-            
-            # 입력 데이터 설정
-            self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
-            
-            # 추론 실행
-            self.interpreter.invoke()
-            
-            # 결과 가져오기
-            output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
-            
-            # 확률 배열을 1차원으로 변환
-            probabilities = output_data[0]
-            
-            # 최고 확률 인덱스 찾기
-            max_index = np.argmax(probabilities)
-            max_probability = float(probabilities[max_index])
-            
-            # 상위 5개 예측 결과
-            top_5_indices = np.argsort(probabilities)[-5:][::-1]
-            top_5_predictions = []
-            
-            for idx in top_5_indices:
-                # 배열 인덱스 범위 체크
-                if idx < len(self.class_names):
-                    food_name = self.class_names[idx]
-                else:
-                    food_name = f"음식_{idx}"
-                
-                top_5_predictions.append({
-                    "food_name": food_name,
-                    "probability": float(probabilities[idx]),
-                    "confidence": f"{float(probabilities[idx]) * 100:.2f}%"
-                })
-            
-            # 예측된 음식 이름
-            if max_index < len(self.class_names):
-                predicted_food = self.class_names[max_index]
-            else:
-                predicted_food = f"음식_{max_index}"
-            
-            return {
-                "success": True,
-                "predicted_food": predicted_food,
-                "confidence": max_probability,
-                "confidence_percentage": f"{max_probability * 100:.2f}%",
-                "top_5_predictions": top_5_predictions,
-                "raw_probabilities": probabilities.tolist()
-            }
+            probabilities = self.infer_batch(input_data)[0]
+            return self.format_prediction(probabilities)
             
         except Exception as e:
             return {
                 "success": False,
                 "error": str(e)
             }
+
+def format_prediction(probabilities: np.ndarray, class_names: list) -> dict:
+    """확률 배열 1개를 예측 결과로 변환"""
+    # 최고 확률 인덱스 찾기
+    max_index = np.argmax(probabilities)
+    max_probability = float(probabilities[max_index])
+    
+    # 상위 5개 예측 결과
+    top_5_indices = np.argsort(probabilities)[-5:][::-1]
+    top_5_predictions = []
+    
+    for idx in top_5_indices:
+        # 배열 인덱스 범위 체크
+        if idx < len(class_names):
+            food_name = class_names[idx]
+        else:
+            food_name = f"음식_{idx}"
         
-        
\ No newline at end of file
+        top_5_predictions.append({
+            "food_name": food_name,
+            "probability": float(probabilities[idx]),
+            "confidence": f"{float(probabilities[idx]) * 100:.2f}%"
+        })
+    
+    # 예측된 음식 이름
+    if max_index < len(class_names):
+        predicted_food = class_names[max_index]
+    else:
+        predicted_food = f"음식_{max_index}"
+    
+    return {
+        "success": True,
+        "predicted_food": predicted_food,
+        "confidence": max_probability,
+        "confidence_percentage": f"{max_probability * 100:.2f}%",
+        "top_5_predictions": top_5_predictions,
+        "raw_probabilities": probabilities.tolist()
+    }
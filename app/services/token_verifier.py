@@ -0,0 +1,183 @@
+# app/services/token_verifier.py
+"""Firebase ID 토큰 로컬 검증과 Google 서명 인증서 저장소
+
+firebase_admin 의 verify_id_token 은 공개키 캐시가 만료되면 요청 처리 중에
+Google 인증서를 HTTPS 로 받아오므로 주기적으로 지연이 튑니다.
+GoogleKeyStore 는 앱 시작 시 인증서를 미리 받고, Cache-Control max-age 로 정해진
+만료 시각보다 refresh_margin 초 먼저 백그라운드에서 갱신하므로 검증은
+로컬 서명 확인(CPU 연산)만으로 끝납니다.
+
+검증된 토큰의 클레임은 토큰 exp 까지 캐시합니다. 저장소에 키가 없거나 모르는 kid 이면
+(키 교체 직후 등) 즉시 갱신을 요청하고 이번 요청은 firebase_admin 검증으로 처리합니다.
+"""
+import asyncio
+import hashlib
+import re
+import time
+from typing import Any, Dict, Optional
+import jwt
+from cryptography import x509
+from app.services.cache import TTLCache
+from app.services.metrics import LatencyStats
+
+CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+ISSUER_PREFIX = "https://securetoken.google.com/"
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+class GoogleKeyStore:
+    """kid -> RSA 공개키 (백그라운드 갱신)"""
+
+    def __init__(self, url: str = CERTS_URL, refresh_margin: float = 300.0, retry_interval: float = 30.0):
+        self.url = url
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self._keys: Dict[str, Any] = {}
+        self.expires_at = 0.0
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get_key(self, kid: str) -> Optional[Any]:
+        return self._keys.get(kid)
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._keys)
+
+    async def refresh(self) -> None:
+        """인증서를 받아 키 목록 교체 (실패 시 예외, 기존 키는 유지)"""
+        from app.services import http_client
+        response = await http_client.get_client().get(self.url)
+        response.raise_for_status()
+        keys = {
+            kid: x509.load_pem_x509_certificate(pem.encode("utf-8")).public_key()
+            for kid, pem in response.json().items()
+        }
+        if not keys:
+            raise ValueError("인증서 목록이 비어 있습니다")
+        match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+        max_age = int(match.group(1)) if match else 3600
+        self._keys = keys
+        self.expires_at = time.time() + max_age
+        self.refreshes += 1
+        self.last_error = None
+
+    def _next_delay(self) -> float:
+        return max(self.retry_interval, self.expires_at - self.refresh_margin - time.time())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+                delay = self._next_delay()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e) or type(e).__name__
+                print(f"Google 인증서 갱신 실패: {self.last_error}")
+                delay = self.retry_interval
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self, timeout: float = 5.0) -> None:
+        """첫 인증서를 최대 timeout 초 기다린 뒤 백그라운드 갱신 시작 (실패해도 앱은 시작)"""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+        deadline = time.perf_counter() + timeout
+        while not self.ready and self.failures == 0 and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+
+    def request_refresh(self) -> None:
+        """모르는 kid 를 만났을 때 즉시 갱신 요청 (어느 스레드에서 호출해도 됨)"""
+        if self._loop is not None and self._wakeup is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._keys),
+            "expires_in": round(self.expires_at - time.time(), 1) if self._keys else None,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "running": self._task is not None and not self._task.done()
+        }
+
+class KeyUnavailable(Exception):
+    """로컬 검증에 필요한 공개키가 없음 (firebase_admin 검증으로 대체)"""
+
+class TokenVerifier:
+    def __init__(self, store: GoogleKeyStore, clock_skew: int = 10, cache_size: int = 10000):
+        self.store = store
+        self.clock_skew = clock_skew
+        self._claims = TTLCache(maxsize=cache_size)
+        self.latency = LatencyStats()
+        self.local = 0
+        self.fallback = 0
+
+    def verify(self, id_token: str, project_id: str) -> Dict[str, Any]:
+        """서명/클레임 검증 후 디코딩된 클레임 반환 (실패 시 jwt 예외, 키가 없으면 KeyUnavailable)"""
+        if not project_id:
+            raise KeyUnavailable("프로젝트 ID 를 알 수 없습니다")
+        key = hashlib.sha256(id_token.encode("utf-8")).hexdigest()
+        cached = self._claims.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        kid = jwt.get_unverified_header(id_token).get("kid")
+        public_key = self.store.get_key(kid) if kid else None
+        if public_key is None:
+            self.store.request_refresh()
+            raise KeyUnavailable(f"알 수 없는 서명 키: {kid}")
+
+        claims = jwt.decode(
+            id_token,
+            public_key,
+            algorithms=["RS256"],
+            audience=project_id,
+            issuer=ISSUER_PREFIX + project_id,
+            leeway=self.clock_skew,
+            options={"require": ["exp", "iat", "sub"]}
+        )
+        subject = claims.get("sub")
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise jwt.InvalidTokenError("sub 클레임이 올바르지 않습니다")
+        if claims.get("auth_time", 0) > time.time() + self.clock_skew:
+            raise jwt.ImmatureSignatureError("auth_time 이 미래입니다")
+        claims["uid"] = subject
+        self._claims.set(key, claims, expires_at=claims["exp"])
+        return dict(claims)
+
+    def stats(self) -> dict:
+        return {
+            "local": self.local,
+            "fallback": self.fallback,
+            "claims_cache": self._claims.stats(),
+            "latency": self.latency.snapshot(),
+            "keys": self.store.stats()
+        }
+
+key_store = GoogleKeyStore()
+verifier = TokenVerifier(key_store)
+
+def get_stats() -> dict:
+    return verifier.stats()
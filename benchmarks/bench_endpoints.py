@@ -0,0 +1,253 @@
+"""주요 API 엔드포인트 지연 시간 / 처리량 벤치마크 (프로세스 내 memory 저장소 사용)
+
+사용법:
+    python -m benchmarks.bench_endpoints                                    # 결과만 출력
+    python -m benchmarks.bench_endpoints --save benchmarks/baselines/endpoints.json
+    python -m benchmarks.bench_endpoints --compare benchmarks/baselines/endpoints.json
+    python -m benchmarks.bench_endpoints --only stats --requests 500 --concurrency 16 --latency-ms 5
+
+실제 라우트 코드(쿼리, 집계, 직렬화)를 실행하도록 저장소를 app/services/memory_store.py 의
+클라이언트로 지정하고(--latency-ms 로 왕복 지연 추가), 앱을 ASGI 로 직접 호출합니다.
+인증은 요청 헤더의 사용자 ID 를 그대로 쓰도록 바꾸므로 토큰 검증 비용은 포함되지 않습니다.
+
+사용자 프로필(하루 혈당/식단 기록 수 x 기간)별로 기록을 저장소 함수로 미리 넣어 두고
+(일간 집계 문서도 함께 생성), 엔드포인트마다 p50/p95/p99 와 초당 요청 수를 출력합니다.
+--save 로 결과를 JSON 으로 저장하고, --compare 로 저장된 기준과 비교해
+--threshold(%) 이상 느려진 항목을 표시합니다 (하나라도 있으면 종료 코드 1).
+기준 파일에는 측정한 머신 정보가 함께 저장되며, 같은 머신에서 만든 기준과 비교해야 의미가 있습니다.
+"""
+import os
+
+# 앱 설정을 읽기 전에 지정 (개발 모드의 고정 사용자 인증 없이 벤치마크 사용자별로 요청)
+os.environ["DEV_MODE"] = "false"
+os.environ.setdefault("ML_WORKERS", "0")
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List
+import httpx
+
+# 이름: (하루 혈당 기록 수, 하루 식단 수, 기간 일수)
+PROFILES = {
+    "light": (2, 2, 30),
+    "typical": (4, 3, 180),
+    "heavy": (8, 4, 730),
+}
+MEAL_TYPES = ["기상직후", "아침", "점심", "저녁"]
+FOODS = [("김치찌개", 450, 30, 25, 20), ("비빔밥", 600, 90, 20, 15), ("된장찌개", 350, 20, 22, 12), ("닭가슴살 샐러드", 300, 15, 35, 8)]
+TODAY = date.today()
+
+def endpoints(today: date) -> Dict[str, tuple]:
+    """이름: (메서드, 경로, JSON 본문 팩토리 또는 None)"""
+    day = today.strftime("%Y-%m-%d")
+    month_start = today.replace(day=1).strftime("%Y-%m-%d")
+    return {
+        "blood_sugar.list": ("GET", "/blood-sugar/?limit=50", None),
+        "blood_sugar.daily": ("GET", f"/blood-sugar/daily/{day}", None),
+        "blood_sugar.create": ("POST", "/blood-sugar/", lambda i: {
+            "blood_sugar": 90 + i % 120, "meal_type": MEAL_TYPES[i % 4], "date": day, "time": f"{i % 24:02d}:{i % 60:02d}"
+        }),
+        "meals.history": ("GET", "/meals/history?limit=30", None),
+        "stats.overview.weekly": ("GET", "/stats/overview?period=weekly", None),
+        "stats.overview.monthly": ("GET", f"/stats/overview?period=monthly&start_date={month_start}", None),
+        "stats.blood_sugar.monthly": ("GET", f"/stats/blood-sugar?period=monthly&start_date={month_start}", None),
+        "stats.nutrition.weekly": ("GET", "/stats/nutrition?period=weekly", None),
+        "user.profile": ("GET", "/user/profile", None),
+        "user.dashboard": ("GET", "/user/dashboard", None),
+        "user.blood_sugar_stats": ("GET", "/user/blood-sugar/stats", None),
+        "export.blood_sugar.csv": ("GET", "/export/blood-sugar?format=csv", None),
+        "foods.all": ("GET", "/foods/", None),
+        "foods.search": ("GET", "/foods/search/밥", None),
+        "foods.autocomplete": ("GET", "/foods/autocomplete?q=ㄱ", None),
+    }
+
+def build_app():
+    from app.main import app
+    from app.dependencies import get_current_user_id
+    from fastapi import Header
+
+    async def bench_user(x_bench_user: str = Header("typical")) -> str:
+        return x_bench_user
+
+    app.dependency_overrides[get_current_user_id] = bench_user
+    return app
+
+async def seed(profiles: Dict[str, tuple], rng: random.Random) -> Dict[str, int]:
+    """프로필별 사용자 1명과 기록을 저장소 함수로 생성 -> 프로필별 혈당 기록 수"""
+    from firebase_admin import firestore
+    from app.services import firestore_repository as repo
+    counts = {}
+    for user_id, (readings_per_day, meals_per_day, days) in profiles.items():
+        await repo.set_user(user_id, {
+            "kakao_id": user_id, "email": f"{user_id}@example.com", "nickname": user_id,
+            "gender": "여자", "height": 162.0, "weight": 58.0, "activity_level": "보통활동",
+            "carb_ratio": 50.0, "protein_ratio": 30.0, "fat_ratio": 20.0,
+            "created_at": firestore.SERVER_TIMESTAMP, "updated_at": firestore.SERVER_TIMESTAMP
+        })
+        readings = []
+        for offset in range(days):
+            day = (TODAY - timedelta(days=offset)).strftime("%Y-%m-%d")
+            for i in range(readings_per_day):
+                readings.append({
+                    "user_id": user_id, "blood_sugar": rng.randint(70, 240), "meal_type": MEAL_TYPES[i % 4],
+                    "date": day, "time": f"{6 + i * 2:02d}:{rng.randint(0, 59):02d}",
+                    "created_at": firestore.SERVER_TIMESTAMP
+                })
+            for i in range(meals_per_day):
+                name, calories, carbs, protein, fat = rng.choice(FOODS)
+                await repo.add_meal({
+                    "user_id": user_id, "date": day, "time": f"{7 + i * 5:02d}:30", "notes": None,
+                    "image_filename": None, "content_type": None, "size_bytes": None,
+                    "analysis": {"name": name, "calories": float(calories), "carbs": float(carbs),
+                                 "protein": float(protein), "fat": float(fat), "confidence": None},
+                    "status": "complete", "created_at": firestore.SERVER_TIMESTAMP
+                })
+        results = await repo.add_readings(readings)
+        failed = [r for r in results if isinstance(r, Exception)]
+        if failed:
+            raise RuntimeError(f"{user_id} 기록 생성 실패: {failed[0]}")
+        counts[user_id] = len(readings)
+    return counts
+
+def percentile(samples: List[float], p: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * p))] if samples else 0.0
+
+async def run_endpoint(client: httpx.AsyncClient, method: str, path: str, body, user: str,
+                       requests: int, concurrency: int, warmup: int) -> dict:
+    counter = iter(range(warmup + requests))
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+
+    async def call(record: bool) -> None:
+        i = next(counter)
+        started = time.perf_counter()
+        response = await client.request(method, path, json=body(i) if body else None, headers={"X-Bench-User": user})
+        # 스트리밍 응답도 본문을 끝까지 받은 시점까지 측정
+        await response.aread()
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code >= 400:
+            errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+        elif record:
+            latencies.append(elapsed)
+
+    for _ in range(warmup):
+        await call(False)
+
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await call(True)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3)
+    }
+
+def compare(results: dict, baseline: dict, threshold: float) -> int:
+    """기준 대비 p50/p95 변화 출력 -> 느려진 항목 수"""
+    regressions = 0
+    print(f"\n기준: {baseline.get('created_at')} ({baseline.get('python')}, {baseline.get('machine')})")
+    print(f"{'endpoint':<42} {'p50 Δ':>9} {'p95 Δ':>9} {'rps Δ':>9}")
+    for key, current in results.items():
+        base = baseline["results"].get(key)
+        if base is None:
+            print(f"{key:<42} {'(new)':>9}")
+            continue
+        deltas = [
+            (current[metric] - base[metric]) / base[metric] * 100 if base[metric] else 0.0
+            for metric in ("p50_ms", "p95_ms", "rps")
+        ]
+        slower = deltas[0] > threshold or deltas[1] > threshold
+        regressions += slower
+        print(f"{key:<42} {deltas[0]:>+8.1f}% {deltas[1]:>+8.1f}% {deltas[2]:>+8.1f}%{'  <- 느려짐' if slower else ''}")
+    return regressions
+
+async def main_async(args) -> int:
+    from app.services import storage
+    from app.services.memory_store import MemoryClient
+    storage.use(MemoryClient(latency=args.latency_ms / 1000))
+    app = build_app()
+    profiles = {name: PROFILES[name] for name in args.profiles}
+
+    started = time.perf_counter()
+    counts = await seed(profiles, random.Random(args.seed))
+    print(f"seed: {', '.join(f'{name}={count}건' for name, count in counts.items())} ({time.perf_counter() - started:.1f}s)")
+
+    selected = {
+        name: spec for name, spec in endpoints(TODAY).items()
+        if not args.only or any(name.startswith(prefix) for prefix in args.only)
+    }
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'endpoint':<42} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}  errors")
+        for user in profiles:
+            for name, (method, path, body) in selected.items():
+                key = f"{name}[{user}]"
+                result = await run_endpoint(client, method, path, body, user, args.requests, args.concurrency, args.warmup)
+                results[key] = result
+                print(f"{key:<42} {result['rps']:>8.1f} {result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms "
+                      f"{result['p99_ms']:>7.2f}ms  {result['errors'] or '-'}")
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} x{os.cpu_count()}",
+        "config": {
+            "requests": args.requests, "concurrency": args.concurrency, "warmup": args.warmup,
+            "latency_ms": args.latency_ms, "seed": args.seed,
+            "profiles": {name: dict(zip(("readings_per_day", "meals_per_day", "days"), PROFILES[name])) for name in profiles}
+        },
+        "results": results
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"\n저장: {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config", {}).get("latency_ms") != args.latency_ms:
+            print("경고: 기준과 --latency-ms 가 달라 비교가 정확하지 않습니다")
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="엔드포인트 지연 시간 / 처리량 벤치마크")
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument("--only", nargs="*", default=None, help="엔드포인트 이름 접두사 (예: stats blood_sugar.list)")
+    parser.add_argument("--requests", type=int, default=200, help="엔드포인트/프로필별 측정 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Firestore 호출마다 더할 지연 (네트워크 왕복 흉내)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", default=None, help="비교할 기준 JSON 경로")
+    parser.add_argument("--threshold", type=float, default=10.0, help="느려짐으로 표시할 p50/p95 증가율(%%)")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""프로세스(워커)별 import 시간과 메모리(RSS): TensorFlow 전체 vs LiteRT / tflite-runtime
+
+사용법:
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --model models/kfood30_mnv3_fp16.tflite --repeat 5
+
+시나리오마다 새 파이썬 프로세스를 띄워 측정하므로 이전 import 가 결과에 섞이지 않습니다.
+
+    app.main                  API 프로세스 시작 (ML 이 아닌 라우트만 쓰면 인터프리터/PIL 을 읽지 않아야 함)
+    legacy: import tensorflow 변경 전 tflite_service 가 모듈 로드 시 하던 import
+    interpreter: <backend>    load_interpreter_class(backend) 로 인터프리터만 import
+    worker: <backend>         --model 지정 시 추론 워커 초기화 (인터프리터 import + 모델 로드)
+
+설치되지 않은 패키지의 시나리오는 건너뜁니다.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# 자식 프로세스에서 실행: 준비 코드 → 측정 코드 순서로 실행하고 시간/RSS 를 JSON 으로 출력
+_PROBE = r"""
+import json, resource, sys, time
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+before = rss_mb()
+started = time.perf_counter()
+exec(sys.argv[1])
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_mb": rss_mb(),
+    "delta_mb": rss_mb() - before,
+    "heavy": [m for m in ("tensorflow", "ai_edge_litert", "tflite_runtime", "PIL") if m in sys.modules]
+}))
+"""
+
+def scenarios(model_path):
+    from app.services.tflite_service import INTERPRETER_BACKENDS
+    yield "app.main", "import app.main", None
+    yield "legacy: import tensorflow", "import tensorflow as tf; tf.lite.Interpreter", "tensorflow"
+    for backend, (module_name, _) in INTERPRETER_BACKENDS.items():
+        code = f"from app.services.tflite_service import load_interpreter_class; load_interpreter_class({backend!r})"
+        yield f"interpreter: {backend}", code, module_name.split(".")[0]
+    if model_path:
+        for backend, (module_name, _) in INTERPRETER_BACKENDS.items():
+            code = (
+                "import os; os.environ['ML_INTERPRETER'] = " + repr(backend) + "\n"
+                "from app.services.tflite_service import TFLiteModel\n"
+                f"TFLiteModel({model_path!r}, num_threads=1)"
+            )
+            yield f"worker: {backend}", code, module_name.split(".")[0]
+
+def available(module_name):
+    if module_name is None:
+        return True
+    import importlib.util
+    return importlib.util.find_spec(module_name) is not None
+
+def measure(code, repeat):
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE, code], capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "seconds": statistics.median(run["seconds"] for run in runs),
+        "rss_mb": statistics.median(run["rss_mb"] for run in runs),
+        "delta_mb": statistics.median(run["delta_mb"] for run in runs),
+        "heavy": runs[-1]["heavy"]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="import 시간 / RSS 벤치마크")
+    parser.add_argument("--model", default=None, help="TFLite 모델 경로 (지정 시 워커 초기화까지 측정)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<30} {'import':>9} {'RSS':>9} {'+RSS':>9}  loaded")
+    for name, code, module_name in scenarios(args.model):
+        if not available(module_name):
+            print(f"{name:<30} {'(not installed)':>29}")
+            continue
+        try:
+            result = measure(code, args.repeat)
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<30} 실패: {e.stderr.strip().splitlines()[-1] if e.stderr.strip() else e}")
+            continue
+        print(f"{name:<30} {result['seconds'] * 1000:>7.0f}ms {result['rss_mb']:>7.1f}MB {result['delta_mb']:>7.1f}MB  "
+              f"{', '.join(result['heavy']) or '-'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""/ml/food 추론: 요청당 1회 invoke vs 마이크로 배치(+워커 프로세스 풀) 처리량 비교
+
+사용법:
+    python -m benchmarks.bench_inference_batcher                     # 합성 비용 모델
+    python -m benchmarks.bench_inference_batcher --model models/kfood30_mnv3_fp16.tflite
+    python -m benchmarks.bench_inference_batcher --model models/kfood30_mnv3_fp16.tflite --workers 4
+
+--model 을 주면 실제 TFLite 인터프리터로, 없으면 invoke 비용을
+"고정 오버헤드 + 이미지당 비용" 으로 흉내 낸 함수로 측정합니다.
+--workers 를 주면 (모델 필요) 워커 프로세스 풀에 배치를 나눠 보내는 경우도 측정합니다.
+동시 요청 --burst 개를 한 번에 보내고 전체 처리 시간과 처리량을 출력합니다.
+"""
+import argparse
+import asyncio
+import threading
+import time
+import numpy as np
+from app.services.inference_batcher import MicroBatcher
+
+def synthetic_infer(fixed_ms: float, per_item_ms: float, classes: int = 30):
+    def infer(items: list) -> np.ndarray:
+        # time.sleep 은 invoke 처럼 GIL 을 놓고 대기
+        time.sleep((fixed_ms + per_item_ms * len(items)) / 1000)
+        return np.full((len(items), classes), 1.0 / classes, dtype=np.float32)
+    return infer
+
+def sample_jpegs(count: int, size=(3024, 4032)):
+    """휴대폰 사진 크기의 JPEG (추론 풀은 전처리까지 포함해 측정)"""
+    from PIL import Image
+    import io
+    rng = np.random.default_rng(0)
+    base = Image.fromarray((rng.random((size[0] // 8, size[1] // 8, 3)) * 255).astype(np.uint8)).resize((size[1], size[0]))
+    buf = io.BytesIO()
+    base.save(buf, "JPEG", quality=90)
+    return [buf.getvalue()] * count
+
+async def run_unbatched(infer, inputs):
+    """기존 방식: 공유 인터프리터 1개에 요청마다 배치 1로 invoke"""
+    lock = threading.Lock()
+    def call(item):
+        with lock:
+            return infer([item])[0]
+    return await asyncio.gather(*(asyncio.to_thread(call, item) for item in inputs))
+
+async def run_batched(infer, inputs, max_batch_size, max_wait_ms, concurrency=1):
+    batcher = MicroBatcher(infer, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, concurrency=concurrency)
+    try:
+        results = await asyncio.gather(*(batcher.submit(item) for item in inputs))
+    finally:
+        await batcher.stop()
+    return results, batcher.stats()
+
+def main():
+    parser = argparse.ArgumentParser(description="추론 마이크로 배치 벤치마크")
+    parser.add_argument("--model", default=None, help="TFLite 모델 경로 (없으면 합성 비용 모델)")
+    parser.add_argument("--burst", type=int, default=64, help="동시 요청 수")
+    parser.add_argument("--workers", type=int, default=0, help="워커 프로세스 풀 크기 (0이면 측정 안 함)")
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--fixed-ms", type=float, default=8.0, help="합성 모델: invoke 1회 고정 비용")
+    parser.add_argument("--per-item-ms", type=float, default=2.0, help="합성 모델: 이미지 1장당 비용")
+    args = parser.parse_args()
+
+    if args.model:
+        from app.services.tflite_service import TFLiteModel
+        model = TFLiteModel(args.model)
+        infer = model.infer_images
+        inputs = sample_jpegs(args.burst)
+    else:
+        infer = synthetic_infer(args.fixed_ms, args.per_item_ms)
+        inputs = [np.random.rand(224, 224, 3).astype(np.float32) for _ in range(args.burst)]
+
+    started = time.perf_counter()
+    asyncio.run(run_unbatched(infer, inputs))
+    unbatched_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    _, stats = asyncio.run(run_batched(infer, inputs, args.max_batch_size, args.max_wait_ms))
+    batched_s = time.perf_counter() - started
+
+    print(f"burst requests     {args.burst:>8}")
+    print(f"unbatched          {unbatched_s * 1000:>8.1f} ms  {args.burst / unbatched_s:>8.1f} req/s")
+    print(f"micro-batched      {batched_s * 1000:>8.1f} ms  {args.burst / batched_s:>8.1f} req/s  ({unbatched_s / batched_s:.1f}x)")
+    print(f"batches            {stats['batches']:>8}  avg size {stats['average_batch_size']}")
+    print(f"queue wait p95     {stats['queue_wait']['p95_ms']:>8.1f} ms")
+
+    if args.workers and args.model:
+        from app.services.interpreter_pool import InterpreterPool
+
+        async def run_pool():
+            pool = InterpreterPool(args.model, args.workers, num_threads=1)
+            await pool.start()
+            try:
+                # 워커별 모델 로드가 끝나도록 한 번 예열
+                await run_batched(pool.infer_images, inputs[:args.workers * 2], args.max_batch_size, args.max_wait_ms, args.workers)
+                started = time.perf_counter()
+                await run_batched(pool.infer_images, inputs, args.max_batch_size, args.max_wait_ms, args.workers)
+                return time.perf_counter() - started
+            finally:
+                pool.shutdown()
+
+        pool_s = asyncio.run(run_pool())
+        print(f"pool x{args.workers:<3}          {pool_s * 1000:>8.1f} ms  {args.burst / pool_s:>8.1f} req/s  ({unbatched_s / pool_s:.1f}x)")
+
+if __name__ == "__main__":
+    main()
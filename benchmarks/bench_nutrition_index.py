@@ -0,0 +1,106 @@
+"""/ml/nutrition 조회: CSV 행 선형 탐색 vs NutritionIndex, CSV 로 생성 vs 컴파일 테이블 mmap 열기
+
+사용법:
+    python -m benchmarks.bench_nutrition_index                         # 합성 10만 행
+    python -m benchmarks.bench_nutrition_index --csv app/data/food_nutrition_1.csv
+
+쿼리 종류(완전 일치 / 포함 검색 / 없음)별 1건당 평균 소요 시간과,
+시작 비용(CSV 파싱+인덱스 생성 vs build_nutrition_table 결과를 mmap 으로 열기)을 출력합니다.
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from app.scripts.build_nutrition_table import build
+from app.services.nutrition_index import NUMERIC_COLUMNS, NAME_COLUMN, NutritionIndex, to_float
+
+BASES = ["김치", "된장", "순두부", "부대", "갈비", "닭", "돼지", "소고기", "해물", "버섯", "감자", "고등어", "오징어", "멸치", "시금치", "콩나물"]
+DISHES = ["찌개", "국", "탕", "볶음", "조림", "구이", "전", "무침", "덮밥", "비빔밥", "죽", "찜", "김밥", "만두"]
+STYLES = ["", "", "(가정식)", "(외식)", "_냉동", " 즉석", "(저염)"]
+
+def synthetic_rows(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        name = f"{rng.choice(BASES)}{rng.choice(DISHES)}{rng.choice(STYLES)}"
+        if i >= len(BASES) * len(DISHES):
+            name += f" {i}"
+        rows.append({NAME_COLUMN: name, **{column: f"{rng.uniform(0, 500):.1f}" for column in NUMERIC_COLUMNS.values()}})
+    return rows
+
+def legacy_lookup(rows, food_name):
+    """변경 전 get_food_nutrition 의 탐색 + 수치 변환"""
+    exact = [r for r in rows if r.get(NAME_COLUMN) == food_name]
+    candidates = exact if exact else [r for r in rows if food_name in r.get(NAME_COLUMN, "")]
+    if not candidates:
+        return None
+    r = candidates[0]
+    return {key: to_float(r.get(column)) for key, column in NUMERIC_COLUMNS.items()}
+
+def per_call_us(fn, queries, repeat=1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            fn(query)
+    return (time.perf_counter() - started) / (len(queries) * repeat) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="영양 정보 조회 벤치마크")
+    parser.add_argument("--csv", default=None, help="영양 CSV (없으면 합성 데이터)")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = args.csv
+        if csv_path is None:
+            csv_path = os.path.join(tmp, "nutrition.csv")
+            with open(csv_path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=[NAME_COLUMN, *NUMERIC_COLUMNS.values()])
+                writer.writeheader()
+                writer.writerows(synthetic_rows(args.rows))
+        with open(csv_path, encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        table_dir = os.path.join(tmp, "nutrition_table")
+
+        started = time.perf_counter()
+        NutritionIndex.from_csv(csv_path)
+        csv_build_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        build([csv_path], table_dir)
+        compile_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index = NutritionIndex.load(table_dir)
+        load_s = time.perf_counter() - started
+        run(rows, index, csv_build_s, compile_s, load_s)
+
+def run(rows, index, csv_build_s, compile_s, load_s):
+    names = [r.get(NAME_COLUMN) or "" for r in rows]
+    rng = random.Random(1)
+    queries = {
+        "exact": [rng.choice(names) for _ in range(50)],
+        "substring": [rng.choice(names)[1:4] for _ in range(50)],
+        "miss": [f"없는음식{i}" for i in range(20)],
+    }
+
+    # 완전 일치는 두 방식 결과가 같아야 함
+    for query in queries["exact"]:
+        expected = legacy_lookup(rows, query)
+        got = index.values[index.lookup(query)[0]]
+        assert np.allclose(list(expected.values()), got, equal_nan=True)
+
+    print(f"rows               {len(rows):>10,}")
+    print(f"csv → index        {csv_build_s * 1000:>10.1f} ms   (컴파일 테이블 없을 때 프로세스마다)")
+    print(f"compile (1회)      {compile_s * 1000:>10.1f} ms")
+    print(f"mmap load          {load_s * 1000:>10.3f} ms   (프로세스마다)")
+    for kind, items in queries.items():
+        legacy_us = per_call_us(lambda q: legacy_lookup(rows, q), items)
+        index_us = per_call_us(lambda q: index.record(index.lookup(q)[0]) if index.lookup(q) else None, items, repeat=20)
+        print(f"{kind:<10} legacy {legacy_us / 1000:>9.2f} ms   index {index_us:>8.1f} us   ({legacy_us / index_us:,.0f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""/ml/food 이미지 전처리 단계별 벤치마크: 기존 경로 vs draft 디코딩 + 버퍼 재사용
+
+사용법:
+    python -m benchmarks.bench_preprocess --images ~/Pictures/food    # 실제 휴대폰 사진 (*.jpg)
+    python -m benchmarks.bench_preprocess                             # 12MP 합성 JPEG
+
+모델 파일 없이 전처리만 측정하도록 입력 텐서 정보만 채운 TFLiteModel 을 사용합니다.
+--dtype uint8 로 양자화 모델 입력 경로도 측정할 수 있습니다.
+"""
+import argparse
+import glob
+import io
+import os
+import time
+import numpy as np
+from PIL import Image
+from app.services.tflite_service import TFLiteModel
+
+def synthetic_photo(width: int = 4032, height: int = 3024, quality: int = 90) -> bytes:
+    """휴대폰 사진과 비슷한 압축률이 나오도록 완만한 그라데이션 + 노이즈로 만든 JPEG"""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([x / width, y / height, (x + y) / (width + height)], axis=-1) * 200
+    noise = rng.normal(0, 12, size=(height, width, 3)).astype(np.float32)
+    pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, "JPEG", quality=quality)
+    return buf.getvalue()
+
+def preprocess_only_model(dtype, size=(224, 224)) -> TFLiteModel:
+    model = TFLiteModel.__new__(TFLiteModel)
+    quantization = (1 / 255, 0) if dtype == np.uint8 else (0.0, 0)
+    model.input_details = [{"index": 0, "shape": np.array([1, size[1], size[0], 3]), "dtype": dtype, "quantization": quantization}]
+    return model
+
+def legacy_preprocess(image_data: bytes, target_size=(224, 224)) -> np.ndarray:
+    """변경 전 preprocess_image"""
+    image = Image.open(io.BytesIO(image_data))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    image = image.resize(target_size)
+    image_array = np.array(image, dtype=np.float32)
+    image_array = image_array / 255.0
+    return np.expand_dims(image_array, axis=0)
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return float(np.median(samples))
+
+def main():
+    parser = argparse.ArgumentParser(description="이미지 전처리 벤치마크")
+    parser.add_argument("--images", default=None, help="JPEG 사진 폴더 (없으면 12MP 합성 이미지)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--dtype", choices=["float32", "uint8"], default="float32")
+    args = parser.parse_args()
+
+    if args.images:
+        paths = sorted(glob.glob(os.path.join(os.path.expanduser(args.images), "*.jp*g")))
+        images = [open(path, "rb").read() for path in paths]
+    else:
+        images = [synthetic_photo()]
+    if not images:
+        raise SystemExit("JPEG 이미지를 찾지 못했습니다")
+
+    dtype = np.uint8 if args.dtype == "uint8" else np.float32
+    model = preprocess_only_model(dtype)
+    size = model.input_size
+    buffer = model._input_buffer(1)
+
+    rows = {name: [] for name in [
+        "legacy: full decode", "legacy: resize", "legacy: to float + /255 + expand_dims", "legacy: total",
+        "fast: draft decode", "fast: resize", "fast: write into buffer", "fast: total"
+    ]}
+    for data in images:
+        full = Image.open(io.BytesIO(data)).convert("RGB")
+        small = full.resize(size)
+        rows["legacy: full decode"].append(timed(lambda: Image.open(io.BytesIO(data)).convert("RGB"), args.repeat))
+        rows["legacy: resize"].append(timed(lambda: full.resize(size), args.repeat))
+        rows["legacy: to float + /255 + expand_dims"].append(
+            timed(lambda: np.expand_dims(np.array(small, dtype=np.float32) / 255.0, axis=0), args.repeat))
+        rows["legacy: total"].append(timed(lambda: legacy_preprocess(data, size), args.repeat))
+
+        def draft_decode():
+            image = Image.open(io.BytesIO(data))
+            image.draft("RGB", size)
+            image.load()
+            return image
+        drafted = draft_decode()
+        rows["fast: draft decode"].append(timed(draft_decode, args.repeat))
+        rows["fast: resize"].append(timed(lambda: drafted.resize(size), args.repeat))
+        rows["fast: write into buffer"].append(timed(lambda: model._write_input(small, buffer[0]), args.repeat))
+        rows["fast: total"].append(timed(lambda: model._write_input(model._decode(data, size), buffer[0]), args.repeat))
+
+    if dtype == np.float32:
+        model._write_input(model._decode(images[0], size), buffer[0])
+        diff = np.abs(buffer[0] - legacy_preprocess(images[0], size)[0]).mean()
+        print(f"mean |fast - legacy| = {diff:.4f} (0-1 스케일, draft 디코딩의 DCT 축소 차이)")
+
+    first = Image.open(io.BytesIO(images[0]))
+    print(f"images: {len(images)}  first: {first.size[0]}x{first.size[1]} {len(images[0]) / 1024:.0f} KiB  input: {args.dtype}")
+    for name, values in rows.items():
+        print(f"{name:<40} {np.mean(values):>9.2f} ms")
+    print(f"speedup (total)                          {np.mean(rows['legacy: total']) / np.mean(rows['fast: total']):>9.1f}x")
+
+if __name__ == "__main__":
+    main()
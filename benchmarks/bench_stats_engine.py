@@ -0,0 +1,167 @@
+"""혈당/영양 통계: 기존 dict 순회 방식 vs NumPy 열 단위 엔진 비교
+
+사용법:
+    python -m benchmarks.bench_stats_engine            # 기본 100만 건
+    python -m benchmarks.bench_stats_engine --n 200000
+
+두 방식의 결과가 같은지 먼저 확인한 뒤 각각의 소요 시간을 출력합니다.
+엔진 시간은 dict → 배열 변환(decode)과 집계(aggregate)를 나누어 보여줍니다.
+영양 통계는 같은 수의 합성 식단 기록으로 날짜별 합계를 비교합니다.
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from app.services import stats_engine
+
+MEAL_TYPES = ["기상직후", "아침", "점심", "저녁"]
+
+def synthetic_readings(n: int, days: int = 365, seed: int = 42):
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    dates = [(start + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(days)]
+    return [
+        {
+            "blood_sugar": rng.randint(60, 250),
+            "meal_type": rng.choice(MEAL_TYPES),
+            "date": rng.choice(dates),
+            "time": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}"
+        }
+        for _ in range(n)
+    ]
+
+def synthetic_meals(n: int, days: int = 365, seed: int = 7):
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    dates = [(start + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(days)]
+    return [
+        {
+            "date": rng.choice(dates),
+            "analysis": {
+                "calories": rng.randint(100, 900), "carbs": rng.randint(0, 120),
+                "protein": rng.randint(0, 60), "fat": rng.randint(0, 50)
+            }
+        }
+        for _ in range(n)
+    ]
+
+def legacy_nutrition(meals):
+    """날짜별 dict 누적 방식의 영양 합계"""
+    totals = {nutrient: 0 for nutrient in stats_engine.rollups.NUTRIENTS}
+    daily = {}
+    for meal in meals:
+        analysis = meal.get("analysis") or {}
+        day = daily.setdefault(meal.get("date"), {"count": 0, **{n: 0 for n in totals}})
+        day["count"] += 1
+        for nutrient in totals:
+            value = analysis.get(nutrient) or 0
+            totals[nutrient] += value
+            day[nutrient] += value
+    return {
+        "count": len(meals),
+        "totals": {n: float(v) for n, v in totals.items()},
+        "daily": [{"date": d, **{k: (v if k == "count" else float(v)) for k, v in daily[d].items()}} for d in sorted(daily)]
+    }
+
+def legacy_stats(blood_sugar_data):
+    """기존 stats.py / user_profile.py 의 집계 로직"""
+    fasting_data = [d for d in blood_sugar_data if d.get("meal_type") == "기상직후"]
+    before_meal_data = [d for d in blood_sugar_data if d.get("meal_type") in ["아침", "점심", "저녁"]]
+    average_fasting = sum(d.get("blood_sugar", 0) for d in fasting_data) / len(fasting_data) if fasting_data else 0
+    average_before_meal = sum(d.get("blood_sugar", 0) for d in before_meal_data) / len(before_meal_data) if before_meal_data else 0
+
+    time_periods = {
+        "06:00-09:00": [], "09:00-12:00": [], "12:00-15:00": [],
+        "15:00-18:00": [], "18:00-21:00": [], "21:00-24:00": []
+    }
+    for data in blood_sugar_data:
+        hour = int(data.get("time", "00:00").split(":")[0])
+        if 6 <= hour < 9:
+            time_periods["06:00-09:00"].append(data.get("blood_sugar", 0))
+        elif 9 <= hour < 12:
+            time_periods["09:00-12:00"].append(data.get("blood_sugar", 0))
+        elif 12 <= hour < 15:
+            time_periods["12:00-15:00"].append(data.get("blood_sugar", 0))
+        elif 15 <= hour < 18:
+            time_periods["15:00-18:00"].append(data.get("blood_sugar", 0))
+        elif 18 <= hour < 21:
+            time_periods["18:00-21:00"].append(data.get("blood_sugar", 0))
+        else:
+            time_periods["21:00-24:00"].append(data.get("blood_sugar", 0))
+    time_period_averages = {k: round(sum(v) / len(v), 1) for k, v in time_periods.items() if v}
+
+    meal_type_totals = {"기상직후": [], "아침": [], "점심": [], "저녁": []}
+    for data in blood_sugar_data:
+        if data.get("meal_type") in meal_type_totals:
+            meal_type_totals[data["meal_type"]].append(data.get("blood_sugar", 0))
+    meal_type_averages = {k: round(sum(v) / len(v), 1) for k, v in meal_type_totals.items() if v}
+
+    daily_totals = {}
+    for data in blood_sugar_data:
+        totals = daily_totals.setdefault(data.get("date"), {"total": 0, "count": 0})
+        totals["total"] += data.get("blood_sugar", 0)
+        totals["count"] += 1
+    daily_trends = sorted(
+        ({"date": d, "average": round(t["total"] / t["count"], 1), "count": t["count"]} for d, t in daily_totals.items()),
+        key=lambda x: x["date"]
+    )
+    return {
+        "average_fasting": round(average_fasting, 1),
+        "average_before_meal": round(average_before_meal, 1),
+        "time_period_averages": time_period_averages,
+        "meal_type_averages": meal_type_averages,
+        "daily_trends": daily_trends
+    }
+
+def engine_stats(cols):
+    summary = stats_engine.summarize(cols)
+    return {
+        "average_fasting": round(summary["average_fasting"], 1),
+        "average_before_meal": round(summary["average_before_meal"], 1),
+        "time_period_averages": {k: round(v["average"], 1) for k, v in summary["time_periods"].items() if v["count"]},
+        "meal_type_averages": {k: round(v["average"], 1) for k, v in summary["meal_types"].items() if v["count"]},
+        "daily_trends": [{"date": d["date"], "average": round(d["average"], 1), "count": d["count"]} for d in summary["daily"]]
+    }
+
+def best_of(fn, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="혈당/영양 통계 엔진 벤치마크")
+    parser.add_argument("--n", type=int, default=1_000_000, help="합성 혈당/식단 기록 수")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    readings = synthetic_readings(args.n)
+    legacy_s, legacy = best_of(lambda: legacy_stats(readings), args.repeat)
+    decode_s, cols = best_of(lambda: stats_engine.ReadingColumns.from_records(readings), args.repeat)
+    aggregate_s, engine = best_of(lambda: engine_stats(cols), args.repeat)
+    assert legacy == engine, "엔진 결과가 기존 로직과 다릅니다"
+
+    print(f"records            {args.n:>12,}")
+    print(f"legacy loop        {legacy_s * 1000:>10.1f} ms")
+    print(f"engine decode      {decode_s * 1000:>10.1f} ms")
+    print(f"engine aggregate   {aggregate_s * 1000:>10.1f} ms")
+    print(f"engine total       {(decode_s + aggregate_s) * 1000:>10.1f} ms  ({legacy_s / (decode_s + aggregate_s):.1f}x)")
+    print(f"aggregate only                  ({legacy_s / aggregate_s:.1f}x)")
+
+    meals = synthetic_meals(args.n)
+    legacy_s, legacy = best_of(lambda: legacy_nutrition(meals), args.repeat)
+    decode_s, meal_cols = best_of(lambda: stats_engine.MealColumns.from_records(meals), args.repeat)
+    aggregate_s, engine = best_of(lambda: stats_engine.nutrition_summary(meal_cols), args.repeat)
+    assert legacy == engine, "영양 집계 결과가 기존 로직과 다릅니다"
+
+    print(f"meals              {args.n:>12,}")
+    print(f"legacy loop        {legacy_s * 1000:>10.1f} ms")
+    print(f"engine decode      {decode_s * 1000:>10.1f} ms")
+    print(f"engine aggregate   {aggregate_s * 1000:>10.1f} ms")
+    print(f"engine total       {(decode_s + aggregate_s) * 1000:>10.1f} ms  ({legacy_s / (decode_s + aggregate_s):.1f}x)")
+    print(f"aggregate only                  ({legacy_s / aggregate_s:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from app.scripts import backfill_rollups
+from app.services import firestore_repository as repo
+from app.services import rollups, storage
+from app.services.memory_store import MemoryClient
+
+@pytest.fixture
+def memory_store():
+    client = MemoryClient()
+    storage.use(client)
+    yield client
+    storage.use(None)
+
+def _reading(user_id, value, date):
+    return {"user_id": user_id, "blood_sugar": value, "meal_type": "아침", "date": date, "time": "08:30"}
+
+async def _rollup_dates(user_id):
+    return [row["date"] for row in await repo.get_daily_rollups(user_id, "2024-01-01", "2024-12-31")]
+
+def test_backfill_removes_rollups_without_records(memory_store):
+    """기록이 모두 지워진 날의 집계 문서는 삭제하고, 어긋난 집계는 다시 계산한 값으로 덮어씀"""
+    async def scenario():
+        await repo.add_reading(_reading("u1", 100, "2024-01-05"))
+        await repo.add_reading(_reading("u2", 130, "2024-01-05"))
+        db = storage.get_client()
+        # 원본 없이 남은 집계와 어긋난 집계
+        await db.collection(repo.DAILY_ROLLUPS).document(rollups.rollup_id("u1", "2024-01-06")).set(
+            {"user_id": "u1", "date": "2024-01-06", "blood_sugar": {"count": 1, "sum": 90}}
+        )
+        await db.collection(repo.DAILY_ROLLUPS).document(rollups.rollup_id("u1", "2024-01-05")).set(
+            {"user_id": "u1", "date": "2024-01-05", "blood_sugar": {"count": 5, "sum": 999}}
+        )
+        await db.collection(repo.DAILY_ROLLUPS).document(rollups.rollup_id("u2", "2024-01-07")).set(
+            {"user_id": "u2", "date": "2024-01-07", "blood_sugar": {"count": 1, "sum": 90}}
+        )
+
+        assert await backfill_rollups.backfill("u1") == (1, 1)
+        assert await _rollup_dates("u1") == ["2024-01-05"]
+        day = (await repo.get_daily_rollups("u1", "2024-01-05", "2024-01-05"))[0]["blood_sugar"]
+        assert (day["count"], day["sum"]) == (1, 100)
+        # 다른 사용자의 집계는 건드리지 않음
+        assert await _rollup_dates("u2") == ["2024-01-05", "2024-01-07"]
+
+        assert await backfill_rollups.backfill() == (2, 1)
+        assert await _rollup_dates("u2") == ["2024-01-05"]
+    asyncio.run(scenario())
@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.routes import export, meals
+from app.services import bulk_ingest
+
+def test_single_and_bulk_share_rules():
+    """단건 등록(reading_error)과 일괄 등록(validate)이 같은 항목을 같은 이유로 거부"""
+    items = [
+        {"blood_sugar": 120, "meal_type": "아침", "date": "2024-01-05", "time": "08:30"},
+        {"blood_sugar": 120, "meal_type": "아침", "date": "2024-1-5", "time": "08:30"},
+        {"blood_sugar": 120, "meal_type": "아침", "date": "2024-01-05", "time": "8:30"},
+        {"blood_sugar": 1200, "meal_type": "아침", "date": "2024-01-05", "time": "08:30"},
+        {"blood_sugar": 120, "meal_type": "간식", "date": "2024-02-30", "time": "08:30"},
+    ]
+    readings, errors = bulk_ingest.validate(items)
+
+    assert [r["index"] for r in readings] == [0]
+    assert errors[1] == "날짜 형식 오류 (YYYY-MM-DD)"
+    assert errors[2] == "시간 형식 오류 (HH:MM)"
+    for i, item in enumerate(items):
+        assert bulk_ingest.reading_error(item) == errors.get(i)
+
+def test_date_and_time_errors_match_reading_rules():
+    for value in ["2024-01-05", "2024-02-29"]:
+        assert bulk_ingest.date_error(value) is None
+    for value in ["2024-5-1", "2023-02-29", "2024/01/05", "", None, 20240105]:
+        assert bulk_ingest.date_error(value) == bulk_ingest.DATE_ERROR
+    for value in ["00:00", "23:59"]:
+        assert bulk_ingest.time_error(value) is None
+    for value in ["8:30", "24:00", "12:60", "12:3", None]:
+        assert bulk_ingest.time_error(value) == bulk_ingest.TIME_ERROR
+
+def test_meal_and_export_routes_use_strict_dates():
+    """식단 등록/조회와 내보내기 기간도 혈당 기록과 같은 형식만 허용"""
+    payload = meals.ManualMealCreate(name="비빔밥", calories=600, carbs=80, protein=20, fat=15, date="2024-5-1", time="12:00")
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(meals.create_manual_meal(payload, user_id="u1"))
+    assert (e.value.status_code, e.value.detail) == (400, bulk_ingest.DATE_ERROR)
+    with pytest.raises(HTTPException) as e:
+        meals._validate_date_time("2024-05-01", "9:00")
+    assert e.value.detail == bulk_ingest.TIME_ERROR
+    for kwargs in ({"date": "2024-5-1"}, {"start_time": "9:00"}):
+        with pytest.raises(HTTPException) as e:
+            asyncio.run(meals.get_meal_history(limit=10, cursor=None, user_id="u1", **kwargs))
+        assert e.value.status_code == 400
+    with pytest.raises(HTTPException) as e:
+        export._validate_range("2024-5-1", "2024-05-31")
+    assert e.value.status_code == 400
+    export._validate_range("2024-05-01", "2024-05-31")
@@ -0,0 +1,47 @@
+from app.services import cache
+from app.services.cache import TTLCache
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+def test_entries_expire(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock.time)
+    entries = TTLCache(maxsize=10, ttl=60)
+    entries.set("default", 1)
+    entries.set("short", 2, ttl=5)
+    entries.set("token", 3, expires_at=clock.now + 30)
+    # ttl=None 은 기본 ttl 사용
+    entries.set("default2", 4, ttl=None)
+
+    clock.now += 10
+    assert entries.get("short") is None
+    assert entries.get("token") == 3
+    clock.now += 25
+    assert entries.get("token") is None
+    assert entries.keys() == ["default", "default2"]
+    clock.now += 30
+    assert entries.get("default", "만료") == "만료"
+    assert entries.get("default2") is None
+    assert entries.stats()["hits"] == 1 and entries.stats()["misses"] == 4
+
+    # 기본 ttl 이 없으면 만료 없음
+    forever = TTLCache()
+    forever.set("k", 1)
+    clock.now += 10 ** 9
+    assert forever.get("k") == 1
+
+def test_lru_eviction_and_discard_where():
+    entries = TTLCache(maxsize=3)
+    for key in "abc":
+        entries.set(key, {"user": key})
+    entries.get("a")
+    entries.set("d", {"user": "d"})
+    assert entries.keys() == ["c", "a", "d"]
+    assert entries.discard_where(lambda value: value["user"] in ("a", "d")) == 2
+    assert entries.keys() == ["c"]
+    assert entries.pop("c") == {"user": "c"} and len(entries) == 0
@@ -0,0 +1,36 @@
+import asyncio
+import csv
+import io
+import json
+from app.routes import export
+from app.services import export_stream, meal_analysis
+
+MEALS = [
+    {"id": "a", "date": "2024-01-05", "time": "12:00", "analysis": {"name": "비빔밥", "calories": 600.0}},
+    {"id": "b", "date": "2024-01-05", "time": "18:00", "analysis": None, "status": meal_analysis.PENDING},
+]
+
+async def _records():
+    for record in MEALS:
+        yield dict(record)
+
+def _encode(encode) -> str:
+    async def run():
+        records = export._with_defaults(_records(), export.MEAL_DEFAULTS)
+        return b"".join([chunk async for chunk in encode(records, ["id", "analysis.name", "analysis.calories", "status"])])
+    return asyncio.run(run()).decode("utf-8")
+
+def test_ndjson_nests_dotted_columns():
+    lines = [json.loads(line) for line in _encode(export_stream.encode_ndjson).splitlines()]
+    assert lines == [
+        {"id": "a", "analysis": {"name": "비빔밥", "calories": 600.0}, "status": meal_analysis.COMPLETE},
+        {"id": "b", "analysis": {"name": None, "calories": None}, "status": meal_analysis.PENDING},
+    ]
+
+def test_csv_keeps_dotted_header_and_same_defaults():
+    rows = list(csv.reader(io.StringIO(_encode(export_stream.encode_csv).lstrip("﻿"))))
+    assert rows == [
+        ["id", "analysis.name", "analysis.calories", "status"],
+        ["a", "비빔밥", "600.0", meal_analysis.COMPLETE],
+        ["b", "", "", meal_analysis.PENDING],
+    ]
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.services import firebase_auth_service as auth_service
+from app.services import firestore_repository as repo
+
+@pytest.fixture
+def fake_firebase(monkeypatch):
+    """토큰 "token-<uid>" 를 uid 로 검증하고, 사용자 조회는 users dict 에서 읽음"""
+    users = {"u1": {"nickname": "이전"}}
+    verified_on = []
+
+    def verify(token):
+        verified_on.append(threading.current_thread())
+        return {"uid": token.removeprefix("token-"), "exp": time.time() + 3600}
+
+    async def get_user(user_id):
+        return dict(users[user_id]) if user_id in users else None
+
+    monkeypatch.setattr(auth_service, "verify_firebase_token", verify)
+    monkeypatch.setattr(repo, "get_user", get_user)
+    auth_service._identity_cache.clear()
+    yield users, verified_on
+    auth_service._identity_cache.clear()
+
+def test_verification_runs_off_the_event_loop(fake_firebase):
+    _, verified_on = fake_firebase
+    assert asyncio.run(auth_service.verify_user_token("token-u1"))["kakao_id"] == "u1"
+    assert verified_on and verified_on[0] is not threading.main_thread()
+
+def test_profile_read_racing_invalidate_is_not_cached(fake_firebase, monkeypatch):
+    """사용자 조회 중에 invalidate_user 가 호출되면 조회한(이전) 정보를 캐시에 넣지 않음"""
+    users, _ = fake_firebase
+    get_user = repo.get_user
+
+    async def slow_get_user(user_id):
+        user = await get_user(user_id)
+        # 조회가 끝난 직후 프로필이 바뀌고 캐시가 무효화됨
+        users[user_id] = {"nickname": "새 이름"}
+        auth_service.invalidate_user(user_id)
+        return user
+
+    async def scenario():
+        monkeypatch.setattr(repo, "get_user", slow_get_user)
+        assert (await auth_service.verify_user_token("token-u1"))["nickname"] == "이전"
+        monkeypatch.setattr(repo, "get_user", get_user)
+        assert (await auth_service.verify_user_token("token-u1"))["nickname"] == "새 이름"
+        # 두 번째 조회 결과는 캐시됨
+        assert (await auth_service.verify_user_token("token-u1"))["nickname"] == "새 이름"
+        assert len(auth_service._identity_cache) == 1
+    asyncio.run(scenario())
+
+def test_invalidate_user_drops_only_that_user(fake_firebase):
+    users, _ = fake_firebase
+    users["u2"] = {"nickname": "다른 사용자"}
+
+    async def scenario():
+        for token in ("token-u1", "token-u2"):
+            await auth_service.verify_user_token(token)
+        assert auth_service.get_identity_cache_stats()["size"] == 2
+        users["u1"] = {"nickname": "새 이름"}
+        # 캐시가 남아 있으면 이전 정보
+        assert (await auth_service.verify_user_token("token-u1"))["nickname"] == "이전"
+        assert auth_service.invalidate_user("u1") == 1
+        assert (await auth_service.verify_user_token("token-u1"))["nickname"] == "새 이름"
+        assert auth_service.get_identity_cache_stats()["size"] == 2
+    asyncio.run(scenario())
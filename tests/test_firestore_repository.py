@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from app.services import firestore_repository as repo
+from app.services import storage
+from app.services.memory_store import MemoryClient
+
+@pytest.fixture
+def memory_store():
+    client = MemoryClient()
+    storage.use(client)
+    yield client
+    storage.use(None)
+
+def _reading(value, date="2024-01-05"):
+    return {"user_id": "u1", "blood_sugar": value, "meal_type": "아침", "date": date, "time": "08:30"}
+
+async def _day(date="2024-01-05"):
+    rows = await repo.get_daily_rollups("u1", date, date)
+    return rows[0]["blood_sugar"] if rows else None
+
+def test_concurrent_deletes_subtract_once(memory_store):
+    async def scenario():
+        keep = await repo.add_reading(_reading(100))
+        target = await repo.add_reading(_reading(140))
+        results = await asyncio.gather(*(repo.delete_blood_sugar(target) for _ in range(3)), return_exceptions=True)
+        assert sum(not isinstance(r, Exception) for r in results) == 1
+        assert all(isinstance(r, repo.RecordNotFound) for r in results if isinstance(r, Exception))
+        day = await _day()
+        assert (day["count"], day["sum"]) == (1, 100)
+        assert await repo.get_blood_sugar(keep) is not None
+    asyncio.run(scenario())
+
+def test_concurrent_updates_keep_rollups_consistent(memory_store):
+    async def scenario():
+        reading_id = await repo.add_reading(_reading(100))
+        await asyncio.gather(*(
+            repo.update_blood_sugar(reading_id, {"blood_sugar": value, "date": date})
+            for value, date in [(120, "2024-01-05"), (150, "2024-01-06"), (90, "2024-01-05")]
+        ))
+        final = await repo.get_blood_sugar(reading_id)
+        days = {date: await _day(date) for date in ("2024-01-05", "2024-01-06")}
+        assert days[final["date"]]["count"] == 1 and days[final["date"]]["sum"] == final["blood_sugar"]
+        other = days["2024-01-06" if final["date"] == "2024-01-05" else "2024-01-05"]
+        assert other["count"] == 0 and other["sum"] == 0
+    asyncio.run(scenario())
+
+def test_update_checks_owner(memory_store):
+    async def scenario():
+        reading_id = await repo.add_reading(_reading(100))
+        with pytest.raises(PermissionError):
+            await repo.update_blood_sugar(reading_id, {"blood_sugar": 1}, user_id="someone-else")
+        with pytest.raises(repo.RecordNotFound):
+            await repo.delete_blood_sugar("missing", user_id="u1")
+    asyncio.run(scenario())
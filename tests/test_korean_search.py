@@ -0,0 +1,51 @@
+from app.services import korean_search
+from app.services.korean_search import SearchIndex
+
+DOCUMENTS = [
+    ("고구마", "sweet_potato", "식이섬유가 풍부한 뿌리채소"),
+    ("고구마 라떼", "sweet_potato_latte", "달콤한 음료"),
+    ("감자", "potato", "전분이 많은 뿌리채소"),
+    ("닭가슴살", "chicken_breast", "단백질이 풍부한 고기"),
+    ("곡물빵", "grain_bread", "통곡물로 만든 빵"),
+]
+
+def _names(index, results):
+    return [(index.names[doc], match) for doc, _, match in results]
+
+def test_choseong_and_jamo_decomposition():
+    assert korean_search.choseong("고구마") == "ㄱㄱㅁ"
+    assert korean_search.jamo("고구마") == "ㄱㅗㄱㅜㅁㅏ"
+    # 겹받침/이중모음은 자판 입력 순서대로 나눔
+    assert korean_search.jamo("닭") == "ㄷㅏㄹㄱ"
+    assert korean_search.jamo("과") == "ㄱㅗㅏ"
+    assert korean_search.is_choseong_query("ㄱㄱㅁ")
+    assert not korean_search.is_choseong_query("고ㄱ")
+
+def test_choseong_query():
+    index = SearchIndex(DOCUMENTS)
+    assert _names(index, index.search("ㄱㄱㅁ")) == [("고구마", "choseong_prefix"), ("고구마 라떼", "choseong_prefix")]
+    assert _names(index, index.search("ㄱㅅ")) == [("닭가슴살", "choseong")]
+
+def test_partial_syllable_matches_by_jamo():
+    """입력 중인 "곡" 은 "고구" 의 자모와 앞부분이 같으므로 고구마도 찾음"""
+    index = SearchIndex(DOCUMENTS)
+    results = _names(index, index.search("곡"))
+    assert results[0] == ("곡물빵", "prefix")
+    assert ("고구마", "jamo_prefix") in results
+    assert ("닭가슴살", "jamo") not in results
+    assert _names(index, index.search("닭")) == [("닭가슴살", "prefix")]
+
+def test_ranking_prefers_exact_then_prefix_then_shorter():
+    index = SearchIndex(DOCUMENTS)
+    assert _names(index, index.search("고구마")) == [("고구마", "exact"), ("고구마 라떼", "prefix")]
+    assert _names(index, index.search("구마")) == [("고구마", "name"), ("고구마 라떼", "name")]
+    assert _names(index, index.search("potato")) == [("감자", "id"), ("고구마", "id"), ("고구마 라떼", "id")]
+    assert _names(index, index.search("뿌리채소")) == [("감자", "description"), ("고구마", "description")]
+    assert index.search("  ") == []
+    assert len(index.search("ㄱ", limit=2)) == 2
+
+def test_autocomplete():
+    index = SearchIndex(DOCUMENTS)
+    assert _names(index, index.autocomplete("고구")) == [("고구마", "prefix"), ("고구마 라떼", "prefix")]
+    assert _names(index, index.autocomplete("ㄱㅁ")) == [("곡물빵", "choseong_prefix")]
+    assert index.autocomplete("라떼") == []
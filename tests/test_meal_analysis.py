@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.services import firestore_repository as repo
+from app.services import meal_analysis, storage
+from app.services.blob_store import LocalBlobStore
+from app.services.memory_store import MemoryClient
+
+@pytest.fixture
+def memory_store():
+    client = MemoryClient()
+    storage.use(client)
+    yield client
+    storage.use(None)
+
+async def _pending_meal(store):
+    async def chunks():
+        yield b"image"
+    await store.put_stream("meals/u1/a.jpg", chunks())
+    return await repo.add_meal({
+        "user_id": "u1", "date": "2024-01-05", "time": "12:00", "image_key": "meals/u1/a.jpg",
+        "analysis": {"name": None, "calories": None}, "status": meal_analysis.PENDING
+    })
+
+async def _calories():
+    rows = await repo.get_daily_rollups("u1", "2024-01-05", "2024-01-05")
+    return rows[0]["meals"]["count"], rows[0]["meals"]["calories"]
+
+def test_two_workers_analyze_a_meal_once(memory_store, tmp_path):
+    """여러 프로세스가 같은 pending 식단을 꺼내도 분석 결과는 집계에 한 번만 더해짐"""
+    async def analyze(image):
+        await asyncio.sleep(0.01)
+        return {"name": "비빔밥", "calories": 600.0}
+
+    async def scenario():
+        store = LocalBlobStore(str(tmp_path))
+        meal_id = await _pending_meal(store)
+        queues = [meal_analysis.MealAnalysisQueue(analyze, store) for _ in range(3)]
+        results = await asyncio.gather(*(queue.process(meal_id) for queue in queues))
+        assert results.count(meal_analysis.COMPLETE) == 1 and results.count(None) == 2
+        assert await _calories() == (1, 600.0)
+        assert (await repo.get_meal(meal_id))["status"] == meal_analysis.COMPLETE
+    asyncio.run(scenario())
+
+def test_meal_deleted_during_analysis_is_not_written(memory_store, tmp_path):
+    async def scenario():
+        store = LocalBlobStore(str(tmp_path))
+        meal_id = await _pending_meal(store)
+
+        async def analyze(image):
+            await repo.delete_meal(meal_id)
+            return {"name": "비빔밥", "calories": 600.0}
+
+        result = await meal_analysis.MealAnalysisQueue(analyze, store).process(meal_id)
+        assert result is None
+        assert await repo.get_meal(meal_id) is None
+        assert await _calories() == (0, 0)
+    asyncio.run(scenario())
+
+def test_failed_result_write_marks_meal_failed(memory_store, tmp_path, monkeypatch):
+    """결과 기록이 쓰기 충돌로 실패해도 analyzing 으로 남지 않고 failed 로 기록됨"""
+    async def analyze(image):
+        return {"name": "비빔밥", "calories": 600.0}
+
+    update_meal = repo.update_meal
+
+    async def conflicting_update(meal_id, data, **kwargs):
+        if data.get("status") == meal_analysis.COMPLETE:
+            raise repo.WriteConflict("동시 수정")
+        return await update_meal(meal_id, data, **kwargs)
+
+    monkeypatch.setattr(repo, "update_meal", conflicting_update)
+
+    async def scenario():
+        store = LocalBlobStore(str(tmp_path))
+        meal_id = await _pending_meal(store)
+        queue = meal_analysis.MealAnalysisQueue(analyze, store)
+        assert await queue.process(meal_id) == meal_analysis.FAILED
+        meal = await repo.get_meal(meal_id)
+        assert meal["status"] == meal_analysis.FAILED
+        assert "분석 결과 저장 실패" in meal["analysis_error"]
+        assert await _calories() == (1, 0)
+        assert queue.failed == 1
+    asyncio.run(scenario())
+
+def test_stale_claim_is_taken_over(memory_store, tmp_path):
+    """claim_timeout 이 지난 analyzing 식단은 resume_pending 이 다시 넣고 다른 작업이 맡음"""
+    async def analyze(image):
+        return {"name": "비빔밥", "calories": 600.0}
+
+    async def scenario():
+        store = LocalBlobStore(str(tmp_path))
+        meal_id = await _pending_meal(store)
+        await repo.update_meal(meal_id, {
+            "status": meal_analysis.ANALYZING, "analysis_claim": "dead-worker",
+            "analysis_claimed_at": datetime.now(timezone.utc) - timedelta(seconds=60)
+        })
+        fresh = meal_analysis.MealAnalysisQueue(analyze, store, claim_timeout=120)
+        assert await fresh.resume_pending() == 0
+
+        queue = meal_analysis.MealAnalysisQueue(analyze, store, claim_timeout=30)
+        assert await queue.resume_pending() == 1
+        # 이미 큐에 있는 식단은 다시 넣지 않음
+        assert await queue.resume_pending() == 0
+        assert await queue.process(meal_id) == meal_analysis.COMPLETE
+        assert await _calories() == (1, 600.0)
+    asyncio.run(scenario())
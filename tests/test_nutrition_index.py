@@ -0,0 +1,98 @@
+import json
+import os
+import pytest
+from app.scripts import build_nutrition_table
+from app.services import nutrition_index
+from app.services.nutrition_index import NUMERIC_COLUMNS, NutritionIndex
+
+ROWS = [
+    ("김치찌개", 120, 8, 9),
+    ("돼지고기 김치찌개", 180, 9, 14),
+    ("김치", 30, 5, 2),
+    ("배추김치(생것)", 25, 4, ""),
+    ("고구마", 130, 31, 1),
+    ("군고구마", 150, 35, 1),
+    ("김치", 99, 99, 99),
+]
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "nutrition.csv"
+    header = ["식품명", NUMERIC_COLUMNS["energy_kcal"], NUMERIC_COLUMNS["carbohydrate_g"], NUMERIC_COLUMNS["protein_g"]]
+    lines = [",".join(header)] + [",".join(str(v) for v in row) for row in ROWS]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+@pytest.fixture
+def index(csv_path):
+    return NutritionIndex.from_csv(csv_path)
+
+def _lookup(index, name):
+    match = index.lookup(name)
+    return (index.names[match[0]], match[1]) if match else None
+
+def test_lookup_order(index):
+    # 같은 이름이 여러 번 있으면 파일에서 먼저 나온 행
+    assert _lookup(index, "김치") == ("김치", "exact")
+    assert index.record(index.exact("김치"))["energy_kcal"] == 30.0
+    assert _lookup(index, "배추 김치 (생것)") == ("배추김치(생것)", "normalized")
+    # 포함 검색은 짧은 이름 우선
+    assert _lookup(index, "치찌") == ("김치찌개", "substring")
+    assert _lookup(index, "고구") == ("고구마", "substring")
+    # 조각이 절반 이상 겹치면 유사 검색
+    assert _lookup(index, "김치찌게") == ("김치찌개", "fuzzy")
+    assert _lookup(index, "햄버거") is None
+    assert _lookup(index, " ()") is None
+
+def test_record_marks_missing_values(index):
+    record = index.record(index.exact("배추김치(생것)"))
+    assert record["food_name"] == "배추김치(생것)"
+    assert record["protein_g"] is None
+    assert record["sugars_g"] is None
+
+def test_search_ranking(index):
+    results = [(index.names[row], match) for row, match, _ in index.search("김치", limit=4)]
+    assert results == [("김치", "exact"), ("김치", "exact"), ("김치찌개", "substring"), ("배추김치(생것)", "substring")]
+    assert [index.names[row] for row, _, _ in index.search("고구마")] == ["고구마", "군고구마"]
+
+def test_map_labels(index):
+    table = nutrition_index.map_labels(index, ["고구마", "없는음식"])
+    assert table["고구마"]["match"] == "exact"
+    assert table["고구마"]["source"] == "nutrition.csv"
+    assert table["없는음식"] is None
+
+def test_compiled_table_round_trip(index, csv_path, tmp_path):
+    """.npy 로 저장한 테이블을 mmap 으로 열어도 CSV 로 만든 인덱스와 같은 결과"""
+    table = str(tmp_path / "table")
+    build_nutrition_table.build([csv_path], table)
+    loaded = NutritionIndex.load(table)
+    assert not loaded.values.flags.writeable
+    assert len(loaded) == len(index)
+    assert loaded.source_names == ["nutrition.csv"]
+    for name in ["김치", "배추 김치 (생것)", "치찌", "김치찌게", "햄버거"]:
+        assert loaded.lookup(name) == index.lookup(name)
+    assert loaded.search("김치") == index.search("김치")
+    assert loaded.record(loaded.exact("고구마")) == index.record(index.exact("고구마"))
+
+def test_open_index_prefers_fresh_table(csv_path, tmp_path):
+    table = str(tmp_path / "table")
+    # 컴파일된 테이블이 없으면 CSV 로 메모리에서 생성 (쓰기 가능한 배열)
+    assert nutrition_index.open_index(table, csv_path).values.flags.writeable
+    build_nutrition_table.build([csv_path], table)
+    # 테이블이 CSV 보다 최신이면 읽기 전용 mmap
+    assert not nutrition_index.open_index(table, csv_path).values.flags.writeable
+    # CSV 가 더 최신이면 CSV 로 다시 만듦
+    meta = os.path.join(table, "meta.json")
+    os.utime(meta, (0, 0))
+    assert nutrition_index.open_index(table, csv_path).values.flags.writeable
+    with pytest.raises(FileNotFoundError):
+        nutrition_index.open_index(str(tmp_path / "missing"), str(tmp_path / "missing.csv"))
+
+def test_unknown_format_version_is_rejected(index, tmp_path):
+    table = tmp_path / "table"
+    index.save(str(table))
+    meta = json.loads((table / "meta.json").read_text(encoding="utf-8"))
+    meta["format_version"] = nutrition_index.FORMAT_VERSION + 1
+    (table / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    with pytest.raises(ValueError):
+        NutritionIndex.load(str(table))
@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.routes import blood_sugar, meals
+from app.services import firestore_repository as repo
+from app.services import storage
+from app.services.memory_store import MemoryClient
+
+@pytest.fixture
+def memory_store():
+    client = MemoryClient()
+    storage.use(client)
+    yield client
+    storage.use(None)
+
+def _reading(value, date, time, user_id="u1"):
+    return {"user_id": user_id, "blood_sugar": value, "meal_type": "아침", "date": date, "time": time}
+
+def test_cursor_round_trip():
+    for doc_id in ["abc", "AbC-123_x", "한글문서"]:
+        cursor = repo.encode_cursor(doc_id)
+        assert "=" not in cursor
+        assert repo.decode_cursor(cursor) == doc_id
+
+@pytest.mark.parametrize("cursor", ["", "!!!", repo.encode_cursor("a/b"), "gA"])
+def test_malformed_cursor(cursor):
+    with pytest.raises(ValueError):
+        repo.decode_cursor(cursor)
+
+def test_pages_cover_every_record_once(memory_store):
+    """최신순으로 limit 개씩 이어 읽으면 모든 기록이 한 번씩 나오고 마지막 페이지의 next_cursor 는 None"""
+    async def scenario():
+        for i in range(7):
+            await repo.add_reading(_reading(100 + i, f"2024-01-0{1 + i // 3}", f"0{i}:00"))
+        await repo.add_reading(_reading(999, "2024-01-09", "09:00", user_id="u2"))
+
+        values, cursor, pages = [], None, 0
+        while True:
+            docs, cursor = await repo.page_blood_sugar_for_user("u1", 3, cursor=cursor)
+            values += [d["blood_sugar"] for d in docs]
+            pages += 1
+            if cursor is None:
+                break
+        assert values == [106, 105, 104, 103, 102, 101, 100]
+        assert pages == 3
+
+        # 정확히 limit 개가 남은 마지막 페이지도 next_cursor 없음
+        docs, cursor = await repo.page_blood_sugar_for_user("u1", 7)
+        assert len(docs) == 7 and cursor is None
+    asyncio.run(scenario())
+
+def test_foreign_or_garbage_cursor_is_rejected(memory_store):
+    async def scenario():
+        other = await repo.add_reading(_reading(999, "2024-01-09", "09:00", user_id="u2"))
+        for cursor in ["garbage", repo.encode_cursor(other), repo.encode_cursor("missing")]:
+            with pytest.raises(ValueError):
+                await repo.page_blood_sugar_for_user("u1", 3, cursor=cursor)
+    asyncio.run(scenario())
+
+def test_routes_return_400_for_garbage_cursor(memory_store):
+    async def scenario():
+        with pytest.raises(HTTPException) as e:
+            await blood_sugar.get_blood_sugar_list(limit=10, cursor="garbage", user_id="u1")
+        assert e.value.status_code == 400
+        with pytest.raises(HTTPException) as e:
+            await meals.get_meal_history(limit=10, cursor="garbage", user_id="u1")
+        assert e.value.status_code == 400
+    asyncio.run(scenario())
@@ -0,0 +1,57 @@
+import gzip
+import json
+import pytest
+from starlette.requests import Request
+from app.services import precompiled
+from app.services.precompiled import PrecompiledResponse
+
+BODY = json.dumps([{"name": f"음식 {i}", "gi_index": i} for i in range(50)], ensure_ascii=False).encode("utf-8")
+
+def _request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+@pytest.fixture
+def response(monkeypatch):
+    # brotli 는 선택 사항이므로 gzip 변형만 있는 경우로 고정
+    monkeypatch.setattr(precompiled, "brotli", None)
+    return PrecompiledResponse(BODY)
+
+def test_encoding_selection(response):
+    plain = response.respond(_request())
+    assert plain.body == BODY and "content-encoding" not in plain.headers
+
+    gzipped = response.respond(_request(accept_encoding="gzip, deflate"))
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(gzipped.body) == BODY
+
+    # 없는 변형(br)은 건너뛰고, q=0 은 거부
+    assert response.respond(_request(accept_encoding="br")).body == BODY
+    assert response.respond(_request(accept_encoding="br, gzip;q=0.5")).headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in response.respond(_request(accept_encoding="gzip;q=0")).headers
+    assert response.respond(_request(accept_encoding="*")).headers["content-encoding"] == "gzip"
+
+    etags = {r.headers["etag"] for r in (plain, gzipped)}
+    assert len(etags) == 2
+    assert all(r.headers["vary"] == "Accept-Encoding" for r in (plain, gzipped))
+
+def test_not_modified_for_any_variant_etag(response):
+    gzip_etag = response.respond(_request(accept_encoding="gzip")).headers["etag"]
+    for if_none_match in [gzip_etag, f"W/{gzip_etag}", f'"stale", {gzip_etag}', "*"]:
+        result = response.respond(_request(if_none_match=if_none_match))
+        assert result.status_code == 304 and result.body == b""
+        assert result.headers["etag"] == gzip_etag.replace("-gzip", "")
+    assert response.respond(_request(if_none_match='"stale"')).status_code == 200
+
+def test_small_body_is_not_compressed():
+    small = PrecompiledResponse(b'{"ok": true}')
+    assert list(small.variants) == ["identity"]
+    assert "content-encoding" not in small.respond(_request(accept_encoding="gzip")).headers
+
+def test_brotli_preferred_when_installed():
+    brotli = pytest.importorskip("brotli")
+    response = PrecompiledResponse(BODY)
+    chosen = response.respond(_request(accept_encoding="gzip, br"))
+    assert chosen.headers["content-encoding"] == "br"
+    assert brotli.decompress(chosen.body) == BODY
+    assert response.respond(_request(accept_encoding="br;q=0.5, gzip;q=0.8")).headers["content-encoding"] == "gzip"
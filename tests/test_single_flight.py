@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from app.services.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flights = SingleFlight()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            return {"user_id": "u1"}
+
+        results = await asyncio.gather(*(flights.do("k", work) for _ in range(5)))
+        assert len(runs) == 1
+        assert all(result is results[0] for result in results)
+        assert flights.stats() == {"calls": 5, "executions": 1, "coalesced": 4, "inflight": 0}
+
+        # 끝난 뒤 들어온 호출과 다른 키는 새로 실행
+        await flights.do("k", work)
+        await flights.do("other", work)
+        assert len(runs) == 3
+    asyncio.run(scenario())
+
+def test_error_reaches_every_waiter_and_is_not_kept():
+    async def scenario():
+        flights = SingleFlight()
+        attempts = []
+
+        async def failing():
+            attempts.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("카카오 인증 실패")
+
+        results = await asyncio.gather(*(flights.do("k", failing) for _ in range(3)), return_exceptions=True)
+        assert len(attempts) == 1
+        assert all(isinstance(r, RuntimeError) and str(r) == "카카오 인증 실패" for r in results)
+
+        with pytest.raises(RuntimeError):
+            await flights.do("k", failing)
+        assert len(attempts) == 2
+    asyncio.run(scenario())
+
+def test_cancelled_caller_does_not_cancel_others():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        first = asyncio.ensure_future(flights.do("k", work))
+        second = asyncio.ensure_future(flights.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        assert await second == "done"
+        assert first.cancelled()
+    asyncio.run(scenario())
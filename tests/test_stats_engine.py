@@ -0,0 +1,52 @@
+from app.services import stats_engine
+
+def test_unpadded_and_invalid_dates():
+    """0을 채우지 않은 날짜는 같은 날로 집계하고, 해석할 수 없는 날짜는 날짜 없는 기록으로 취급"""
+    records = [
+        {"blood_sugar": 100, "meal_type": "아침", "date": "2024-01-05", "time": "08:30"},
+        {"blood_sugar": 140, "meal_type": "점심", "date": "2024-1-5", "time": "12:30"},
+        {"blood_sugar": 120, "meal_type": "저녁", "date": "2024-01-06", "time": "19:00"},
+        {"blood_sugar": 90, "meal_type": "기상직후", "date": "not-a-date", "time": "07:00"},
+    ]
+    cols = stats_engine.ReadingColumns.from_records(records)
+    summary = stats_engine.summarize(cols)
+
+    assert summary["count"] == 4
+    assert summary["daily"] == [
+        {"date": "2024-01-05", "count": 2, "average": 120.0},
+        {"date": "2024-01-06", "count": 1, "average": 120.0},
+    ]
+    assert stats_engine.unique_day_count(cols) == 2
+    # 날짜 없는 기록은 가장 오래된 것으로 취급
+    assert list(stats_engine.latest_indices(cols, 4)) == [2, 1, 0, 3]
+
+def test_nutrition_from_records_and_rollups_agree():
+    """식단 기록을 바로 집계한 값과 일간 집계 문서로 집계한 값이 같음"""
+    meals = [
+        {"date": "2024-01-05", "analysis": {"calories": 500, "carbs": 70, "protein": 20, "fat": 10}},
+        {"date": "2024-01-05", "analysis": {"calories": 300, "carbs": 40, "protein": None}},
+        {"date": "2024-01-07", "analysis": {"calories": 200, "carbs": 30, "protein": 5, "fat": 5}},
+        {"date": None, "analysis": {"calories": 100}},
+    ]
+    from_records = stats_engine.nutrition_summary(stats_engine.MealColumns.from_records(meals))
+    assert from_records["count"] == 4
+    assert from_records["totals"] == {"calories": 1100.0, "carbs": 140.0, "protein": 25.0, "fat": 15.0}
+    assert from_records["daily"] == [
+        {"date": "2024-01-05", "count": 2, "calories": 800.0, "carbs": 110.0, "protein": 20.0, "fat": 10.0},
+        {"date": "2024-01-07", "count": 1, "calories": 200.0, "carbs": 30.0, "protein": 5.0, "fat": 5.0},
+    ]
+
+    daily_rollups = [
+        {"date": "2024-01-05", "meals": {"count": 2, "calories": 800, "carbs": 110, "protein": 20, "fat": 10}},
+        {"date": "2024-01-06", "meals": {"count": 0, "calories": 1e-12}},
+        {"date": "2024-01-07", "meals": {"count": 1, "calories": 200, "carbs": 30, "protein": 5, "fat": 5}},
+        {"date": "2024-01-08"},
+    ]
+    from_rollups = stats_engine.nutrition_summary(stats_engine.MealColumns.from_rollups(daily_rollups))
+    assert from_rollups["count"] == 3
+    assert from_rollups["totals"] == {"calories": 1000.0, "carbs": 140.0, "protein": 25.0, "fat": 15.0}
+    assert from_rollups["daily"] == from_records["daily"]
+
+def test_empty_nutrition():
+    summary = stats_engine.nutrition_summary(stats_engine.MealColumns.from_rollups([]))
+    assert summary == {"count": 0, "totals": {"calories": 0.0, "carbs": 0.0, "protein": 0.0, "fat": 0.0}, "daily": []}
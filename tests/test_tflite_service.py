@@ -0,0 +1,71 @@
+import io
+import numpy as np
+import pytest
+from app.services import tflite_service
+from app.services.tflite_service import TFLiteModel, padded_batch_sizes
+
+class FakeInterpreter:
+    """입력 (N, 2, 2, 3) 의 이미지별 합계를 클래스 2개 확률처럼 돌려주는 인터프리터"""
+    created = 0
+
+    def __init__(self, model_path, num_threads=None):
+        FakeInterpreter.created += 1
+        self.shape = np.array([1, 2, 2, 3])
+        self.allocations = 0
+
+    def get_input_details(self):
+        return [{"index": 0, "shape": self.shape.copy(), "dtype": np.float32, "quantization": (0.0, 0)}]
+
+    def get_output_details(self):
+        return [{"index": 1, "shape": np.array([self.shape[0], 2]), "dtype": np.float32, "quantization": (0.0, 0)}]
+
+    def resize_tensor_input(self, index, shape):
+        self.shape = np.array(shape)
+
+    def allocate_tensors(self):
+        self.allocations += 1
+
+    def set_tensor(self, index, value):
+        assert value.shape == tuple(self.shape)
+        self.input = value.copy()
+
+    def invoke(self):
+        total = self.input.reshape(len(self.input), -1).sum(axis=1)
+        self.output = np.stack([total, -total], axis=1)
+
+    def get_tensor(self, index):
+        return self.output
+
+@pytest.fixture
+def model(monkeypatch):
+    monkeypatch.setitem(tflite_service._interpreter_classes, "auto", ("fake", FakeInterpreter))
+    monkeypatch.setattr(tflite_service, "load_class_names", lambda path: ["a", "b"])
+    FakeInterpreter.created = 0
+    return TFLiteModel("model.tflite", max_batch=8)
+
+def test_padded_batch_sizes():
+    assert padded_batch_sizes(8) == [1, 2, 4, 8]
+    assert padded_batch_sizes(6) == [1, 2, 4, 6]
+    assert padded_batch_sizes(1) == [1]
+
+def test_batches_are_padded_and_interpreters_reused(model):
+    batches = [np.random.rand(n, 2, 2, 3).astype(np.float32) for n in (3, 1, 4, 5, 3, 2, 7, 11)]
+    for batch in batches:
+        expected = batch.reshape(len(batch), -1).sum(axis=1)
+        np.testing.assert_allclose(model.infer_batch(batch)[:, 0], expected, rtol=1e-5)
+    # 크기 1, 2, 4, 8 용 인터프리터가 한 번씩만 만들어지고 다시 할당되지 않음
+    assert sorted(model._runners) == [1, 2, 4, 8]
+    assert FakeInterpreter.created == 4
+    assert all(runner[0].allocations == 1 for runner in model._runners.values())
+
+def test_infer_images_skips_broken_images(model):
+    from PIL import Image
+    def png(value):
+        out = io.BytesIO()
+        Image.new("RGB", (2, 2), (value, value, value)).save(out, format="PNG")
+        return out.getvalue()
+    outputs = model.infer_images([png(255), b"broken", png(0)])
+    assert isinstance(outputs[1], Exception)
+    assert outputs[0][0] == pytest.approx(12.0)
+    assert outputs[2][0] == pytest.approx(0.0)
+    assert sorted(model._runners) == [1, 2]
@@ -0,0 +1,59 @@
+import time
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from app.services.token_verifier import ISSUER_PREFIX, GoogleKeyStore, KeyUnavailable, TokenVerifier
+
+PROJECT = "demo-project"
+
+@pytest.fixture(scope="module")
+def private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+@pytest.fixture
+def verifier(private_key):
+    store = GoogleKeyStore()
+    store._keys = {"k1": private_key.public_key()}
+    return TokenVerifier(store, clock_skew=10)
+
+def _token(private_key, kid="k1", **overrides):
+    now = int(time.time())
+    claims = {"aud": PROJECT, "iss": ISSUER_PREFIX + PROJECT, "sub": "u1", "iat": now, "exp": now + 3600, **overrides}
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+def test_valid_token_is_verified_and_cached(verifier, private_key):
+    token = _token(private_key)
+    assert verifier.verify(token, PROJECT)["uid"] == "u1"
+    # 키가 사라져도 캐시된 클레임으로 응답
+    verifier.store._keys = {}
+    assert verifier.verify(token, PROJECT)["uid"] == "u1"
+    assert verifier.stats()["claims_cache"]["hits"] == 1
+
+def test_unknown_kid_requests_refresh(verifier, private_key):
+    refreshes = []
+    verifier.store.request_refresh = lambda: refreshes.append(1)
+    with pytest.raises(KeyUnavailable):
+        verifier.verify(_token(private_key, kid="rotated"), PROJECT)
+    assert refreshes == [1]
+
+def test_expired_token_is_rejected(verifier, private_key):
+    now = int(time.time())
+    with pytest.raises(jwt.ExpiredSignatureError):
+        verifier.verify(_token(private_key, iat=now - 7200, exp=now - 60), PROJECT)
+    # clock_skew 안쪽이면 허용
+    assert verifier.verify(_token(private_key, iat=now - 7200, exp=now - 5), PROJECT)["uid"] == "u1"
+
+def test_audience_and_issuer_mismatch_are_rejected(verifier, private_key):
+    with pytest.raises(jwt.InvalidAudienceError):
+        verifier.verify(_token(private_key, aud="other-project"), PROJECT)
+    with pytest.raises(jwt.InvalidIssuerError):
+        verifier.verify(_token(private_key, iss=ISSUER_PREFIX + "other-project"), PROJECT)
+
+def test_signature_from_other_key_is_rejected(verifier):
+    other = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with pytest.raises(jwt.InvalidSignatureError):
+        verifier.verify(_token(other), PROJECT)
+
+def test_missing_subject_is_rejected(verifier, private_key):
+    with pytest.raises(jwt.InvalidTokenError):
+        verifier.verify(_token(private_key, sub=""), PROJECT)